@@ -1,7 +1,8 @@
 # AI Service API - GPU Server
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request, Response
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Literal, Optional
+import logging
 import os
 from dotenv import load_dotenv
 
@@ -10,15 +11,38 @@ load_dotenv()
 
 # from inference.db_conn_movie_reco_v1 import HybridRecommender
 from inference.db_conn_movie_reco_v2 import HybridRecommender
+from inference.data_sources import DatabaseConnection, FileDataSource
+from inference.history_store import UserHistoryStore
+from inference.request_log import configure_logging, start_request
+from wire_format import MEDIA_TYPE, accepts_binary, encode_recommendations
+import metrics
+
+# LOG_LEVEL / LOG_DEBUG_SAMPLE_RATE
+configure_logging()
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="MovieSir AI Service")
 
+@app.middleware("http")
+async def request_context(request: Request, call_next):
+    """backend가 보낸 X-Request-ID로 로그 correlation (없으면 생성)"""
+    request_id = start_request(request.headers.get("X-Request-ID"))
+    response = await call_next(request)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
 # 모델 로드 (서버 시작 시 한 번만)
 recommender = None
+# user_id → 시청 기록 (backend가 user_movie_ids 대신 user_id만 보낼 때 사용)
+history_store = None
+
+# true면 모든 응답에 구간별 시간(stage_timings) 포함 (요청별로는 debug=true)
+DEBUG_TIMINGS = os.getenv("AI_DEBUG_TIMINGS", "false").lower() == "true"
 
 @app.on_event("startup")
 async def load_model():
-    global recommender
+    global recommender, history_store
     try:
         db_config = {
             'host': os.getenv("DATABASE_HOST", "localhost"),
@@ -27,55 +51,151 @@ async def load_model():
             'user': os.getenv("DATABASE_USER", "moviesir"),  # ✅ 수정: movigation → moviesir
             'password': os.getenv("DATABASE_PASSWORD", "")
         }
+        # ANN 후보 생성 설정 (ANN_INDEX_TYPE=none 이면 brute force)
+        ann_index_type = os.getenv("ANN_INDEX_TYPE", "hnsw").lower()
+        # AI_CATALOG_SNAPSHOT: 로컬 스냅샷 디렉토리 (지정하면 DB 대신 파일에서 로드)
+        snapshot_path = os.getenv("AI_CATALOG_SNAPSHOT")
         recommender = HybridRecommender(
+            data_source=FileDataSource(snapshot_path) if snapshot_path else None,
             db_config=db_config,
             lightgcn_model_path="training/lightgcn_model/best_model.pt",
-            lightgcn_data_path="training/lightgcn_data"
+            lightgcn_data_path="training/lightgcn_data",
+            ann_index_type=None if ann_index_type == "none" else ann_index_type,
+            ann_candidates=int(os.getenv("ANN_CANDIDATES", 2000)),
+            ann_search_effort=int(os.getenv("ANN_SEARCH_EFFORT", 64)),
+            sbert_precision=os.getenv("SBERT_PRECISION", "float32")
         )
         print("✅ AI Model loaded successfully")
+
+        # 시청 기록 저장소 (스냅샷 모드에서도 기록은 DB에서 조회)
+        if os.getenv("AI_HISTORY_STORE", "true").lower() == "true":
+            history_store = UserHistoryStore(
+                DatabaseConnection(**db_config),
+                max_users=int(os.getenv("AI_HISTORY_MAX_USERS", 100000)),
+                ttl_seconds=float(os.getenv("AI_HISTORY_TTL_SECONDS", 600)),
+                refresh_interval=float(os.getenv("AI_HISTORY_REFRESH_SECONDS", 5))
+            )
+            history_store.start()
     except Exception as e:
         print(f"❌ Failed to load AI model: {e}")
         raise e
 
+    # warm-up 실패는 서비스 중단 사유가 아님 (/ready만 503 유지)
+    if os.getenv("AI_WARMUP", "true").lower() == "true":
+        try:
+            recommender.warm_up()
+        except Exception as e:
+            print(f"⚠️  Warm-up failed: {e}")
+    else:
+        recommender.ready = True
+
+@app.on_event("shutdown")
+def shutdown():
+    if history_store is not None:
+        history_store.stop()
+
 @app.get("/")
 def health():
     return {"message": "ok", "service": "ai"}
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy", "model_loaded": recommender is not None}
+    return {
+        "status": "healthy",
+        "model_loaded": recommender is not None,
+        "ready": recommender is not None and recommender.ready
+    }
+
+@app.get("/ready")
+def ready_check(response: Response):
+    """readiness probe: 모델 로드 + warm-up 완료 후에만 200"""
+    if recommender is None or not recommender.ready:
+        response.status_code = 503
+        return {
+            "ready": False,
+            "load_timings": recommender.load_timings if recommender is not None else {}
+        }
+    return {"ready": True, "load_timings": recommender.load_timings}
 
 class RecommendRequest(BaseModel):
-    user_movie_ids: List[int]
+    # 둘 중 하나: user_movie_ids (직접 전달) 또는 user_id (AI Service가 시청 기록 조회)
+    user_movie_ids: Optional[List[int]] = None
+    user_id: Optional[str] = None
     available_time: int = 180
     top_k: int = 20
     preferred_genres: Optional[List[str]] = None
     preferred_otts: Optional[List[str]] = None
+    genre_expansion_boost: float = HybridRecommender.GENRE_EXPANSION_BOOST
+    # 'ids': tmdb_id + 점수만 반환 (메타데이터는 호출 측 DB에서 조회), 'full': 메타데이터 포함
+    projection: Literal['full', 'ids'] = 'full'
+    # 응답에 구간별 시간(stage_timings) 포함
+    debug: bool = False
 
 class RecommendResponse(BaseModel):
     track_a: dict
     track_b: dict
     elapsed_time: float
+    stage_timings: Optional[dict] = None
+
+def resolve_user_movie_ids(request: RecommendRequest) -> List[int]:
+    """
+    추천 입력 영화: 요청에 있으면 그대로, 없으면 user_id로 시청 기록 조회
+    - 기록이 없으면 빈 리스트 → 추천기의 cold-start 프로필 사용 (요청에 빈 리스트를 보낸 경우와 동일)
+    """
+    if request.user_movie_ids is not None:
+        return request.user_movie_ids
+    if request.user_id is None:
+        raise HTTPException(status_code=422, detail="user_movie_ids 또는 user_id가 필요합니다")
+    if history_store is None:
+        raise HTTPException(status_code=503, detail="History store not enabled")
+
+    try:
+        user_movie_ids = history_store.get(request.user_id)
+    except Exception as e:
+        # 5xx → backend에서 재시도/circuit breaker/fallback 처리
+        raise HTTPException(status_code=503, detail=f"History lookup failed: {e}")
+    if not user_movie_ids:
+        logger.info("No watch history for user %s → cold-start profile", request.user_id)
+    return user_movie_ids
+
+@app.get("/metrics")
+def prometheus_metrics():
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
 
 @app.post("/recommend", response_model=RecommendResponse)
-def recommend(request: RecommendRequest):
+def recommend(request: RecommendRequest, accept: Optional[str] = Header(None)):
     if recommender is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
 
+    # Accept: application/x-moviesir-reco 이면 바이너리 응답 (ID + 점수만 담으므로 projection='ids')
+    binary = accepts_binary(accept)
+
+    user_movie_ids = resolve_user_movie_ids(request)
+
     try:
         recommendation_type, result = recommender.recommend(
-            user_movie_ids=request.user_movie_ids,
+            user_movie_ids=user_movie_ids,
             available_time=request.available_time,
             top_k=request.top_k,
             preferred_genres=request.preferred_genres,
-            preferred_otts=request.preferred_otts
+            preferred_otts=request.preferred_otts,
+            genre_expansion_boost=request.genre_expansion_boost,
+            projection='ids' if binary else request.projection
         )
+        metrics.observe_recommendation(recommendation_type, result)
+
+        if binary:
+            return Response(
+                content=encode_recommendations(recommendation_type, result),
+                media_type=MEDIA_TYPE
+            )
 
         recommendations = result.get("recommendations", {})
         return RecommendResponse(
             track_a=recommendations.get("track_a", {}),
             track_b=recommendations.get("track_b", {}),
-            elapsed_time=result.get("elapsed_time", 0)
+            elapsed_time=result.get("elapsed_time", 0),
+            stage_timings=result.get("stage_timings") if request.debug or DEBUG_TIMINGS else None
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
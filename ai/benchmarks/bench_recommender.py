@@ -0,0 +1,299 @@
+import argparse
+import contextlib
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from inference.ann_index import faiss
+from inference.data_sources import InMemoryDataSource
+from inference.db_conn_movie_reco_v2 import HybridRecommender
+
+"""
+HybridRecommender 오프라인 벤치마크 (합성 카탈로그)
+
+- DB / 학습 산출물 없이 InMemoryDataSource로 추천기 생성
+- 카탈로그 크기별 (기본 10k / 100k / 1M), 추천 모드(single / combination) × 필터 선택도별
+  처리량(qps)과 p50/p95/p99 지연, 구간별(stage_timings) 평균을 JSON으로 출력
+- 커밋 간 비교용: 결과에 git commit / numpy / faiss 버전 포함
+
+사용법 (ai/ 디렉토리에서):
+    python -m benchmarks.bench_recommender --sizes 10000 100000 --output bench.json
+
+주의: 1M × 1024차원 float32 SBERT 행렬만 4GB (+ LightGCN 1GB)
+"""
+
+GENRES = [
+    'Action', 'Adventure', 'Animation', 'Comedy', 'Crime', 'Documentary', 'Drama', 'Family',
+    'Fantasy', 'History', 'Horror', 'Music', 'Mystery', 'Romance', 'Science Fiction',
+    'Thriller', 'War', 'Western'
+]
+# 장르 등장 빈도 (Drama/Comedy가 흔하고 Western/War가 드묾)
+GENRE_WEIGHTS = np.array([8, 5, 3, 9, 5, 2, 12, 3, 4, 2, 5, 1, 3, 6, 4, 7, 1, 1], dtype='float64')
+OTTS = ['Netflix', 'Disney Plus', 'Watcha', 'wavve', 'TVING', 'Coupang Play', 'Apple TV', 'Amazon Prime Video']
+OTT_WEIGHTS = np.array([10, 5, 6, 5, 6, 3, 2, 3], dtype='float64')
+
+# (이름, 선호 장르, 선호 OTT) - 선택도가 넓은 것부터 좁은 순
+FILTER_SCENARIOS = [
+    ('none', None, None),
+    ('genre_broad', ['Drama', 'Comedy', 'Thriller'], None),
+    ('genre_narrow', ['Western'], None),
+    ('genre_ott', ['Action'], ['Watcha']),
+]
+MODES = [('single', 120), ('combination', 480)]
+
+
+def synthetic_catalog(
+    n: int,
+    sbert_dim: int = 1024,
+    gcn_dim: int = 256,
+    n_clusters: int = 64,
+    lightgcn_coverage: float = 0.95,
+    seed: int = 0,
+    chunk_rows: int = 65536
+) -> InMemoryDataSource:
+    """
+    합성 카탈로그 생성
+    - 임베딩: 클러스터 중심 + 잡음 (ANN 성능이 실제 분포와 비슷하도록)
+    - 장르: 클러스터별 주 장르 + 빈도 가중 무작위
+    - 런타임/개봉연도/OTT: 일부 결측 포함
+
+    Args:
+        n: 영화 수
+        sbert_dim / gcn_dim: 임베딩 차원
+        n_clusters: 임베딩 클러스터 수
+        lightgcn_coverage: LightGCN에도 있는 영화 비율 (나머지는 SBERT 전용)
+        seed: 난수 시드
+        chunk_rows: 임베딩 생성 블록 크기 (임시 메모리 상한)
+    """
+    rng = np.random.default_rng(seed)
+    movie_ids = np.arange(1, n + 1, dtype=np.int64) * 7  # tmdb_id처럼 띄엄띄엄
+    clusters = rng.integers(0, n_clusters, size=n)
+
+    def clustered(dim: int, rows: np.ndarray) -> np.ndarray:
+        centers = rng.standard_normal((n_clusters, dim), dtype=np.float32)
+        out = np.empty((len(rows), dim), dtype=np.float32)
+        for start in range(0, len(rows), chunk_rows):
+            block = rows[start:start + chunk_rows]
+            out[start:start + len(block)] = (
+                centers[clusters[block]]
+                + 0.8 * rng.standard_normal((len(block), dim), dtype=np.float32)
+            )
+        return out
+
+    sbert_embeddings = clustered(sbert_dim, np.arange(n))
+
+    gcn_rows = np.flatnonzero(rng.random(n) < lightgcn_coverage)
+    gcn_rows = rng.permutation(gcn_rows)  # LightGCN 행 순서는 SBERT와 다름
+    lightgcn_item_embeddings = clustered(gcn_dim, gcn_rows)
+    lightgcn_movie_to_idx = {int(movie_ids[row]): i for i, row in enumerate(gcn_rows)}
+
+    genre_p = GENRE_WEIGHTS / GENRE_WEIGHTS.sum()
+    primary_genre = rng.choice(len(GENRES), size=n_clusters, p=genre_p)
+    genre_counts = rng.integers(0, 4, size=n)
+    runtimes = np.clip(rng.normal(105, 25, size=n), 40, 240).astype(int)
+    runtimes[rng.random(n) < 0.03] = 0
+    years = 2024 - np.minimum(rng.exponential(12, size=n), 64).astype(int)
+    has_year = rng.random(n) >= 0.05
+
+    ott_p = OTT_WEIGHTS / OTT_WEIGHTS.sum()
+    ott_counts = rng.choice(4, size=n, p=[0.35, 0.35, 0.2, 0.1])
+
+    metadata_map = {}
+    movie_ott_map = {}
+    for i in range(n):
+        mid = int(movie_ids[i])
+        genres = set()
+        if genre_counts[i] > 0:
+            if rng.random() < 0.6:
+                genres.add(GENRES[primary_genre[clusters[i]]])
+            for g in rng.choice(len(GENRES), size=genre_counts[i], p=genre_p):
+                if len(genres) < genre_counts[i]:
+                    genres.add(GENRES[g])
+
+        metadata_map[mid] = {
+            'movie_id': i + 1,
+            'tmdb_id': mid,
+            'title': f'Movie {mid}',
+            'runtime': int(runtimes[i]),
+            'genres': sorted(genres),
+            'overview': '',
+            'poster_path': None,
+            'release_date': f'{years[i]}-01-01' if has_year[i] else '',
+            'vote_average': 0,
+            'popularity': 0
+        }
+
+        if ott_counts[i] > 0:
+            picks = rng.choice(len(OTTS), size=ott_counts[i], replace=False, p=ott_p)
+            movie_ott_map[mid] = [OTTS[j] for j in picks]
+
+    return InMemoryDataSource(
+        metadata_map=metadata_map,
+        sbert_movie_ids=movie_ids.tolist(),
+        sbert_embeddings=sbert_embeddings,
+        lightgcn_movie_to_idx=lightgcn_movie_to_idx,
+        lightgcn_item_embeddings=lightgcn_item_embeddings,
+        movie_ott_map=movie_ott_map,
+        ott_id_to_name={i: name for i, name in enumerate(OTTS)}
+    )
+
+
+def _percentiles(samples_ms: list) -> dict:
+    values = np.asarray(samples_ms)
+    return {
+        'p50_ms': float(np.percentile(values, 50)),
+        'p95_ms': float(np.percentile(values, 95)),
+        'p99_ms': float(np.percentile(values, 99)),
+        'mean_ms': float(values.mean())
+    }
+
+
+def run_scenario(
+    recommender: HybridRecommender,
+    users: list,
+    mode: str,
+    available_time: int,
+    genres,
+    otts,
+    warmup: int
+) -> dict:
+    """한 시나리오(모드 × 필터)를 users 순서대로 실행하고 지연 통계 반환"""
+    selectivity = recommender.filter_selectivity(available_time, genres, otts)
+
+    for user in users[:warmup]:
+        recommender.recommend(user, available_time, preferred_genres=genres, preferred_otts=otts, projection='ids')
+
+    latencies_ms = []
+    stage_totals = {}
+    empty_results = 0
+    started = time.perf_counter()
+
+    for user in users:
+        t0 = time.perf_counter()
+        _, result = recommender.recommend(
+            user, available_time, preferred_genres=genres, preferred_otts=otts, projection='ids'
+        )
+        latencies_ms.append((time.perf_counter() - t0) * 1000)
+
+        for stage, seconds in result['stage_timings'].items():
+            stage_totals[stage] = stage_totals.get(stage, 0.0) + seconds
+
+        track_a = result['recommendations']['track_a']
+        if not (track_a.get('movies') or track_a.get('combination')):
+            empty_results += 1
+
+    wall = time.perf_counter() - started
+
+    return {
+        'mode': mode,
+        'filter': {'genres': genres, 'otts': otts},
+        'selectivity': selectivity,
+        'queries': len(users),
+        'throughput_qps': len(users) / wall if wall > 0 else 0.0,
+        **_percentiles(latencies_ms),
+        'stage_mean_ms': {stage: total * 1000 / len(users) for stage, total in stage_totals.items()},
+        'empty_track_a': empty_results
+    }
+
+
+def benchmark_catalog(size: int, args) -> dict:
+    """카탈로그 하나를 만들어 모든 시나리오 실행"""
+    print(f"[bench] generating catalog: {size:,} movies", file=sys.stderr)
+    t0 = time.perf_counter()
+    source = synthetic_catalog(size, args.sbert_dim, args.gcn_dim, seed=args.seed)
+    generate_seconds = time.perf_counter() - t0
+
+    # 초기화 출력은 stderr로 (stdout은 JSON 전용)
+    with contextlib.redirect_stdout(sys.stderr):
+        t0 = time.perf_counter()
+        recommender = HybridRecommender(
+            data_source=source,
+            ann_index_type=None if args.ann_index == 'none' else args.ann_index,
+            ann_candidates=args.ann_candidates,
+            ann_search_effort=args.ann_search_effort,
+            sbert_precision=args.sbert_precision
+        )
+        build_seconds = time.perf_counter() - t0
+    del source
+
+    # 사용자: 같은 클러스터에서 뽑은 영화 5편 (SBERT/LightGCN 공통 영화)
+    rng = np.random.default_rng(args.seed + 1)
+    common = np.asarray(recommender.common_movie_ids)
+    users = [rng.choice(common, size=5, replace=False).tolist() for _ in range(args.queries)]
+
+    scenarios = []
+    for mode, available_time in MODES:
+        for name, genres, otts in FILTER_SCENARIOS:
+            print(f"[bench] {size:,} {mode} {name}", file=sys.stderr)
+            recommender.recommendation_history = []
+            result = run_scenario(recommender, users, mode, available_time, genres, otts, args.warmup)
+            result['scenario'] = name
+            scenarios.append(result)
+
+    report = {
+        'catalog_size': size,
+        'common_movies': recommender.num_common,
+        'generate_seconds': generate_seconds,
+        'build_seconds': build_seconds,
+        'load_timings': recommender.load_timings,
+        'memory_bytes': recommender.memory_report(),
+        'scenarios': scenarios
+    }
+    recommender.close()
+    return report
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=Path(__file__).resolve().parent, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return 'unknown'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HybridRecommender synthetic benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--sbert-dim', type=int, default=1024)
+    parser.add_argument('--gcn-dim', type=int, default=256)
+    parser.add_argument('--ann-index', choices=['hnsw', 'ivf', 'none'], default='hnsw')
+    parser.add_argument('--ann-candidates', type=int, default=2000)
+    parser.add_argument('--ann-search-effort', type=int, default=64)
+    parser.add_argument('--sbert-precision', choices=['float32', 'float16', 'int8'], default='float32')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=str, default=None, help="JSON 저장 경로 (없으면 stdout)")
+    args = parser.parse_args(argv)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'faiss': getattr(faiss, '__version__', None) if faiss is not None else None,
+            'config': {k: v for k, v in vars(args).items() if k != 'output'}
+        },
+        'results': [benchmark_catalog(size, args) for size in args.sizes]
+    }
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(output)
+        print(f"[bench] saved: {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+import numpy as np
+from math import ceil, sqrt
+from typing import Optional
+
+"""
+SBERT 벡터용 ANN(근사 최근접 이웃) 후보 생성 인덱스
+- FAISS IVF / HNSW (CPU 전용)
+- search_effort: recall ↔ latency 조절값
+    - IVF: nprobe (탐색할 클러스터 수)
+    - HNSW: efSearch (탐색 후보 큐 크기)
+- precision: 인덱스 내부 벡터 저장 정밀도 (float16/int8은 ScalarQuantizer 사용)
+- allowed 마스크(필터 결과)를 IDSelectorBitmap으로 검색 중에 적용
+    → 반환되는 후보는 모두 필터 조건을 만족 (단, k개보다 적을 수 있음)
+    - HNSW는 필터에 걸린 노드도 탐색 큐를 차지하므로 efSearch를 k / 선택도로 키움
+      (선택도가 낮으면 탐색량이 커지므로 호출 측에서 brute force 전환 기준으로 사용)
+- faiss가 설치되지 않은 환경에서는 available=False → 호출 측에서 brute force 사용
+"""
+
+try:
+    import faiss
+except ImportError:  # faiss-cpu 미설치 환경
+    faiss = None
+
+
+class ANNIndex:
+    """정규화된 SBERT 행렬 위의 내적(코사인) ANN 인덱스"""
+
+    INDEX_TYPES = ('ivf', 'hnsw')
+    PRECISIONS = ('float32', 'float16', 'int8')
+
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        index_type: str = 'hnsw',
+        search_effort: int = 64,
+        nlist: Optional[int] = None,
+        hnsw_m: int = 32,
+        precision: str = 'float32'
+    ):
+        """
+        Args:
+            vectors: (N, D) 정규화된 임베딩 행렬 (행 번호 = 반환되는 position)
+            index_type: 'ivf' 또는 'hnsw'
+            search_effort: IVF nprobe / HNSW efSearch
+            nlist: IVF 클러스터 수 (기본: sqrt(N))
+            hnsw_m: HNSW 그래프 이웃 수
+            precision: 인덱스 내부 저장 정밀도 ('float32' / 'float16' / 'int8')
+        """
+        if index_type not in self.INDEX_TYPES:
+            raise ValueError(f"지원하지 않는 ANN 인덱스 타입: {index_type}")
+        if precision not in self.PRECISIONS:
+            raise ValueError(f"지원하지 않는 정밀도: {precision}")
+
+        self.index_type = index_type
+        self.index = None
+        self.ntotal = len(vectors)
+        self.available = faiss is not None and self.ntotal > 0
+
+        if not self.available:
+            print("  ⚠️  faiss를 사용할 수 없어 ANN 인덱스를 생성하지 않습니다 (brute force 사용)")
+            return
+
+        vectors = np.ascontiguousarray(vectors, dtype='float32')
+        dim = vectors.shape[1]
+        qtype = {
+            'float16': faiss.ScalarQuantizer.QT_fp16,
+            'int8': faiss.ScalarQuantizer.QT_8bit
+        }.get(precision)
+
+        if index_type == 'ivf':
+            nlist = nlist or int(sqrt(self.ntotal))
+            # k-means 학습에 클러스터당 최소 39개 포인트 필요
+            nlist = max(1, min(nlist, self.ntotal // 39))
+            quantizer = faiss.IndexFlatIP(dim)
+            if qtype is None:
+                index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
+            else:
+                index = faiss.IndexIVFScalarQuantizer(
+                    quantizer, dim, nlist, qtype, faiss.METRIC_INNER_PRODUCT
+                )
+
+            # 학습은 클러스터당 최대 64개 샘플이면 충분
+            n_train = min(self.ntotal, nlist * 64)
+            if n_train < self.ntotal:
+                rng = np.random.default_rng(0)
+                train_rows = np.sort(rng.choice(self.ntotal, size=n_train, replace=False))
+                index.train(vectors[train_rows])
+            else:
+                index.train(vectors)
+        else:
+            if qtype is None:
+                index = faiss.IndexHNSWFlat(dim, hnsw_m, faiss.METRIC_INNER_PRODUCT)
+            else:
+                index = faiss.IndexHNSWSQ(dim, qtype, hnsw_m, faiss.METRIC_INNER_PRODUCT)
+                index.train(vectors)
+            index.hnsw.efConstruction = max(40, 2 * hnsw_m)
+
+        index.add(vectors)
+        self.index = index
+        self.set_search_effort(search_effort)
+
+        print(f"  ANN index built: {index_type.upper()}/{precision} ({self.ntotal:,} vectors, effort={search_effort})")
+
+    @property
+    def nbytes(self) -> int:
+        """인덱스 상주 메모리 추정치 (bytes)"""
+        if self.index is None:
+            return 0
+
+        if self.index_type == 'ivf':
+            # 코드 + id(int64) + 클러스터 중심
+            return self.ntotal * (self.index.code_size + 8) + self.index.nlist * self.index.d * 4
+
+        # 저장 벡터 + 그래프 이웃(int32) + 레벨(int32) + 오프셋(int64)
+        hnsw = self.index.hnsw
+        return (
+            self.ntotal * self.index.storage.sa_code_size()
+            + hnsw.neighbors.size() * 4
+            + hnsw.levels.size() * 4
+            + hnsw.offsets.size() * 8
+        )
+
+    def set_search_effort(self, search_effort: int):
+        """recall ↔ latency 조절 (클수록 recall ↑, latency ↑)"""
+        self.search_effort = max(1, int(search_effort))
+        if self.index is None:
+            return
+
+        if self.index_type == 'ivf':
+            self.index.nprobe = min(self.search_effort, self.index.nlist)
+        else:
+            self.index.hnsw.efSearch = self.search_effort
+
+    def _search_params(self, allowed: np.ndarray, k: int):
+        """allowed 마스크를 검색 중에 적용하는 SearchParameters 생성"""
+        # bitmap은 검색이 끝날 때까지 살아 있어야 하므로 함께 반환
+        bitmap = np.packbits(allowed.astype(bool), bitorder='little')
+        selector = faiss.IDSelectorBitmap(self.ntotal, faiss.swig_ptr(bitmap))
+
+        if self.index_type == 'ivf':
+            params = faiss.SearchParametersIVF(sel=selector, nprobe=self.index.nprobe)
+        else:
+            # 필터 통과 노드만 결과가 되므로 탐색 큐를 1/선택도만큼 확장
+            # (파라미터로 넘기면 efSearch가 k보다 작아도 보정되지 않음)
+            selectivity = max(int(np.count_nonzero(allowed)), 1) / self.ntotal
+            ef_search = min(max(self.search_effort, k, int(ceil(k / selectivity))), self.ntotal)
+            params = faiss.SearchParametersHNSW(sel=selector, efSearch=ef_search)
+        return params, (bitmap, selector)
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        allowed: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        query와 내적이 큰 상위 k개 position 반환 (근사)
+
+        Args:
+            query: (D,) 쿼리 벡터
+            k: 반환할 후보 수
+            allowed: (N,) bool 마스크 - True인 position만 결과에 포함
+
+        Returns:
+            position 배열 (int64, 점수 내림차순)
+        """
+        if self.index is None:
+            raise RuntimeError("ANN 인덱스가 생성되지 않았습니다")
+
+        k = min(int(k), self.ntotal)
+        query = np.ascontiguousarray(query, dtype='float32').reshape(1, -1)
+
+        if allowed is None:
+            _, positions = self.index.search(query, k)
+        else:
+            params, _keepalive = self._search_params(allowed, k)
+            _, positions = self.index.search(query, k, params=params)
+
+        positions = positions[0]
+        return positions[positions >= 0]
@@ -0,0 +1,542 @@
+import argparse
+import os
+import pickle
+import uuid
+import numpy as np
+from psycopg2.extras import RealDictCursor
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow 미설치 환경 (FileDataSource 사용 불가)
+    pa = None
+    pq = None
+
+try:
+    import torch
+except ImportError:  # torch 미설치 환경 (LightGCN 체크포인트 대신 스냅샷 사용)
+    torch = None
+
+try:
+    from inference.db_pool import CONNECTION_ERRORS, ConnectionPool, pool_options_from_env
+except ImportError:  # 스크립트로 직접 실행하는 경우
+    from db_pool import CONNECTION_ERRORS, ConnectionPool, pool_options_from_env
+
+"""
+HybridRecommender 카탈로그 데이터 소스
+- 추천 엔진이 DB/파일 구현에 묶이지 않도록 로드 단계를 인터페이스로 분리
+- PostgresDataSource: 운영 DB (movies / movie_vectors / ott_providers / movie_ott_map) + LightGCN 체크포인트
+- FileDataSource: 로컬 스냅샷 디렉토리 (Parquet 메타데이터 + NPY 임베딩, export_snapshot()으로 생성)
+- InMemoryDataSource: 이미 메모리에 있는 데이터 (벤치마크, 테스트)
+
+반환 형식 (HybridRecommender 속성과 동일):
+- load_metadata(): {tmdb_id: {'movie_id', 'tmdb_id', 'title', 'runtime', 'genres', 'overview',
+                              'poster_path', 'release_date', 'vote_average', 'popularity'}}
+- load_sbert(): (tmdb_id 리스트, (N, D) float32 임베딩) - 행 순서 = 리스트 순서
+- load_ott(): ({provider_id: provider_name}, OTT 이름 리스트, {tmdb_id: [provider_name, ...]})
+- load_lightgcn(): ({tmdb_id: 행 번호}, (M, D) float32 아이템 임베딩)
+
+스냅샷 디렉토리 구성:
+- metadata.parquet: tmdb_id, movie_id, title, runtime, genres(list), overview, poster_path,
+                    release_date, vote_average, popularity
+- ott_providers.parquet: provider_id, provider_name (표시 순서)
+- movie_ott.parquet: tmdb_id, provider_name
+- sbert_ids.npy / sbert_embeddings.npy, lightgcn_ids.npy / lightgcn_embeddings.npy
+
+스냅샷 생성 (DB → 파일, ai/ 디렉토리에서):
+    python -m inference.data_sources --out snapshots/catalog
+"""
+
+DEFAULT_CHUNK_SIZE = 10000
+
+METADATA_COLUMNS = [
+    'movie_id', 'tmdb_id', 'title', 'runtime', 'genres', 'overview',
+    'poster_path', 'release_date', 'vote_average', 'popularity'
+]
+
+
+def _metadata_entry(
+    movie_id, tmdb_id, title, runtime, genres, overview,
+    poster_path, release_date, vote_average, popularity
+) -> dict:
+    """DB/Parquet 행 (METADATA_COLUMNS 순서) → metadata_map 값 (결측값은 기본값으로)"""
+    return {
+        'movie_id': movie_id,
+        'tmdb_id': tmdb_id,
+        'title': title,
+        'runtime': runtime or 0,
+        'genres': list(genres or []),  # VARCHAR[] → Python list
+        'overview': overview or '',
+        'poster_path': poster_path,
+        'release_date': str(release_date) if release_date else '',
+        'vote_average': vote_average or 0,
+        'popularity': popularity or 0
+    }
+
+
+def _parse_embeddings(values: list, dim: int) -> np.ndarray:
+    """
+    pgvector 값 한 청크 → (len(values), dim) float32
+    - 문자열 '[0.1, 0.2, ...]' (어댑터 미등록): 청크 전체를 한 번에 파싱
+    - 리스트/배열 (어댑터 등록): 그대로 쌓기
+    """
+    if isinstance(values[0], str):
+        flat = np.fromstring(','.join(v.strip('[]') for v in values), sep=',', dtype='float32')
+        return flat.reshape(len(values), dim)
+    return np.asarray(values, dtype='float32')
+
+
+def _embedding_dim(value) -> int:
+    if isinstance(value, str):
+        return value.count(',') + 1
+    return len(value)
+
+
+def load_lightgcn_artifacts(
+    model_path: str,
+    data_path: str,
+    device: str = 'cpu',
+    id_key: str = 'tmdb2id'
+) -> Tuple[Dict[int, int], np.ndarray]:
+    """
+    학습된 LightGCN 매핑(id_mappings.pkl) + 체크포인트에서 아이템 임베딩 로드
+
+    Args:
+        model_path: 체크포인트 경로 (best_model.pt)
+        data_path: id_mappings.pkl이 있는 폴더
+        device: torch.load map_location
+        id_key: 매핑 키 ('tmdb2id' = TMDB 기준, 'item2id' = MovieLens 기준)
+    """
+    if torch is None:
+        raise RuntimeError("LightGCN 체크포인트를 읽으려면 torch가 필요합니다 (또는 FileDataSource 스냅샷 사용)")
+
+    with open(Path(data_path) / 'id_mappings.pkl', 'rb') as f:
+        mappings = pickle.load(f)
+    movie_to_idx = mappings[id_key]
+
+    print(f"Loading LightGCN model from {model_path}")
+    checkpoint = torch.load(model_path, map_location=device)
+    if 'model_state_dict' in checkpoint:
+        item_embeddings = checkpoint['model_state_dict']['item_embedding.weight']
+    elif 'item_embeddings' in checkpoint:
+        item_embeddings = checkpoint['item_embeddings']
+    else:
+        item_embeddings = checkpoint['item_embedding.weight']
+
+    return movie_to_idx, item_embeddings.cpu().numpy()
+
+
+class DatabaseConnection:
+    """PostgreSQL 접근 (ConnectionPool 위에서 쿼리 단위로 연결 대여)"""
+
+    def __init__(self, host: str, port: int, database: str, user: str, password: str, **pool_options):
+        """
+        Args:
+            host / port / database / user / password: 연결 정보
+            pool_options: ConnectionPool 설정 (지정하지 않은 값은 AI_DB_POOL_* 환경 변수 → 기본값)
+        """
+        self.connection_params = {
+            'host': host,
+            'port': port,
+            'database': database,
+            'user': user,
+            'password': password
+        }
+        self.pool = ConnectionPool(self.connection_params, **{**pool_options_from_env(), **pool_options})
+
+    def close(self):
+        """풀 종료"""
+        self.pool.close()
+
+    def execute_query(self, query: str, params: tuple = None) -> List[dict]:
+        """
+        쿼리 실행 및 결과 반환 (읽기 전용 쿼리용)
+        - 대여한 연결이 끊겨 있었으면 폐기하고 새 연결로 한 번 더 시도
+        """
+        for attempt in range(2):
+            try:
+                with self.pool.connection() as conn:
+                    with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                        cursor.execute(query, params)
+                        return cursor.fetchall()
+            except CONNECTION_ERRORS:
+                if attempt == 1:
+                    raise
+
+    def stream_query(
+        self,
+        query: str,
+        params: tuple = None,
+        itersize: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[List[tuple]]:
+        """
+        서버 측(named) 커서로 결과를 itersize 행씩 스트리밍 (튜플 행)
+        - 클라이언트에는 한 번에 itersize 행만 존재 (fetchall/RealDictCursor 대비 시작 시 피크 메모리 제한)
+        - 스트리밍 동안 연결 하나를 점유, 끝나면 커서를 닫고 트랜잭션 종료 후 반납
+        """
+        with self.pool.connection() as conn:
+            try:
+                with conn.cursor(name=f"stream_{uuid.uuid4().hex[:12]}") as cursor:
+                    cursor.itersize = itersize
+                    cursor.execute(query, params)
+                    while True:
+                        rows = cursor.fetchmany(itersize)
+                        if not rows:
+                            break
+                        yield rows
+            finally:
+                if not conn.closed:
+                    conn.rollback()  # 읽기 전용 트랜잭션 종료
+
+
+class CatalogDataSource:
+    """카탈로그 데이터 소스 인터페이스"""
+
+    def load_metadata(self) -> Dict[int, dict]:
+        raise NotImplementedError
+
+    def load_sbert(self) -> Tuple[List[int], np.ndarray]:
+        raise NotImplementedError
+
+    def load_ott(self) -> Tuple[Dict[int, str], List[str], Dict[int, List[str]]]:
+        raise NotImplementedError
+
+    def load_lightgcn(self) -> Tuple[Dict[int, int], np.ndarray]:
+        raise NotImplementedError
+
+    def close(self):
+        """리소스 정리 (연결이 없는 소스는 아무것도 하지 않음)"""
+        pass
+
+
+class PostgresDataSource(CatalogDataSource):
+    """운영 DB 데이터 소스 (LightGCN은 학습 산출물 파일에서)"""
+
+    def __init__(
+        self,
+        db_config: dict,
+        lightgcn_model_path: str,
+        lightgcn_data_path: str,
+        device: str = 'cpu',
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ):
+        """
+        Args:
+            db_config: PostgreSQL 연결 설정 (host, port, database, user, password)
+            lightgcn_model_path: LightGCN 체크포인트 경로
+            lightgcn_data_path: LightGCN 매핑 데이터 폴더
+            device: LightGCN 체크포인트 로드 장치
+            chunk_size: 서버 측 커서 itersize (한 번에 받아 변환할 행 수)
+        """
+        self.db = DatabaseConnection(**db_config)
+        self.lightgcn_model_path = lightgcn_model_path
+        self.lightgcn_data_path = lightgcn_data_path
+        self.device = device
+        self.chunk_size = chunk_size
+
+    def load_metadata(self) -> Dict[int, dict]:
+        print("Loading metadata from database...")
+
+        query = """
+            SELECT
+                movie_id,
+                tmdb_id,
+                title,
+                runtime,
+                genres,
+                overview,
+                poster_path,
+                release_date,
+                vote_average,
+                popularity
+            FROM movies
+        """
+
+        metadata_map = {}
+        for rows in self.db.stream_query(query, itersize=self.chunk_size):
+            for row in rows:
+                metadata_map[row[1]] = _metadata_entry(*row)
+        return metadata_map
+
+    def load_sbert(self) -> Tuple[List[int], np.ndarray]:
+        print("Loading SBERT embeddings from database...")
+
+        count_query = """
+            SELECT COUNT(*)
+            FROM movie_vectors mv
+            JOIN movies m ON mv.movie_id = m.movie_id
+        """
+        query = """
+            SELECT
+                m.tmdb_id,
+                mv.embedding
+            FROM movie_vectors mv
+            JOIN movies m ON mv.movie_id = m.movie_id
+            ORDER BY mv.movie_id
+        """
+
+        # 최종 행렬을 미리 할당하고 청크 단위로 채움 (중간 리스트/행렬 사본 없음)
+        expected = self.db.execute_query(count_query)[0]['count']
+        movie_ids = []
+        embeddings = None
+        filled = 0
+
+        for rows in self.db.stream_query(query, itersize=self.chunk_size):
+            if embeddings is None:
+                embeddings = np.empty((expected, _embedding_dim(rows[0][1])), dtype='float32')
+            if filled + len(rows) > len(embeddings):
+                # COUNT 이후 추가된 행 (드묾) → 버퍼 확장
+                grown = np.empty((max(filled + len(rows), len(embeddings) * 2), embeddings.shape[1]), dtype='float32')
+                grown[:filled] = embeddings[:filled]
+                embeddings = grown
+
+            embeddings[filled:filled + len(rows)] = _parse_embeddings([row[1] for row in rows], embeddings.shape[1])
+            movie_ids.extend(row[0] for row in rows)
+            filled += len(rows)
+
+        if embeddings is None:
+            return [], np.zeros((0, 0), dtype='float32')
+        return movie_ids, embeddings[:filled]
+
+    def load_ott(self) -> Tuple[Dict[int, str], List[str], Dict[int, List[str]]]:
+        print("Loading OTT data from database...")
+
+        # OTT 제공자 목록
+        ott_query = """
+            SELECT provider_id, provider_name
+            FROM ott_providers
+            ORDER BY display_priority, provider_name
+        """
+        ott_rows = self.db.execute_query(ott_query)
+        ott_id_to_name = {row['provider_id']: row['provider_name'] for row in ott_rows}
+        all_otts = [row['provider_name'] for row in ott_rows]
+
+        # 영화-OTT 매핑
+        map_query = """
+            SELECT
+                m.tmdb_id,
+                op.provider_name
+            FROM movie_ott_map mom
+            JOIN movies m ON mom.movie_id = m.movie_id
+            JOIN ott_providers op ON mom.provider_id = op.provider_id
+        """
+        movie_ott_map = {}
+        for rows in self.db.stream_query(map_query, itersize=self.chunk_size):
+            for tmdb_id, provider_name in rows:
+                movie_ott_map.setdefault(tmdb_id, []).append(provider_name)
+
+        print(f"  Available OTTs: {all_otts}")
+        return ott_id_to_name, all_otts, movie_ott_map
+
+    def load_lightgcn(self) -> Tuple[Dict[int, int], np.ndarray]:
+        return load_lightgcn_artifacts(self.lightgcn_model_path, self.lightgcn_data_path, self.device)
+
+    def close(self):
+        self.db.close()
+
+
+class FileDataSource(CatalogDataSource):
+    """로컬 스냅샷 디렉토리 데이터 소스 (Parquet + NPY)"""
+
+    def __init__(self, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, mmap: bool = True):
+        """
+        Args:
+            path: export_snapshot()으로 만든 디렉토리
+            chunk_size: Parquet 레코드 배치 크기
+            mmap: 임베딩 NPY를 메모리 매핑으로 열기 (정렬 단계에서 필요한 행만 복사)
+        """
+        if pq is None:
+            raise RuntimeError("FileDataSource를 사용하려면 pyarrow가 필요합니다")
+        self.path = Path(path)
+        if not self.path.is_dir():
+            raise FileNotFoundError(f"스냅샷 디렉토리가 없습니다: {self.path}")
+        self.chunk_size = chunk_size
+        self.mmap_mode = 'r' if mmap else None
+
+    def _iter_rows(self, name: str) -> Iterator[dict]:
+        """Parquet 파일을 레코드 배치 단위로 읽어 행(dict) 반환"""
+        parquet = pq.ParquetFile(self.path / name)
+        for batch in parquet.iter_batches(batch_size=self.chunk_size):
+            columns = batch.to_pydict()  # 컬럼 단위 변환이 행 단위(to_pylist)보다 빠름
+            names = list(columns)
+            for values in zip(*columns.values()):
+                yield dict(zip(names, values))
+
+    def _load_embeddings(self, prefix: str) -> Tuple[np.ndarray, np.ndarray]:
+        ids = np.load(self.path / f'{prefix}_ids.npy')
+        embeddings = np.load(self.path / f'{prefix}_embeddings.npy', mmap_mode=self.mmap_mode)
+        return ids, embeddings
+
+    def load_metadata(self) -> Dict[int, dict]:
+        print(f"Loading metadata from {self.path}...")
+        return {
+            row['tmdb_id']: _metadata_entry(**row)
+            for row in self._iter_rows('metadata.parquet')
+        }
+
+    def load_sbert(self) -> Tuple[List[int], np.ndarray]:
+        ids, embeddings = self._load_embeddings('sbert')
+        return ids.tolist(), embeddings
+
+    def load_ott(self) -> Tuple[Dict[int, str], List[str], Dict[int, List[str]]]:
+        ott_id_to_name = {
+            row['provider_id']: row['provider_name'] for row in self._iter_rows('ott_providers.parquet')
+        }
+        movie_ott_map = {}
+        for row in self._iter_rows('movie_ott.parquet'):
+            movie_ott_map.setdefault(row['tmdb_id'], []).append(row['provider_name'])
+        return ott_id_to_name, list(ott_id_to_name.values()), movie_ott_map
+
+    def load_lightgcn(self) -> Tuple[Dict[int, int], np.ndarray]:
+        ids, embeddings = self._load_embeddings('lightgcn')
+        return {mid: idx for idx, mid in enumerate(ids.tolist())}, embeddings
+
+
+class InMemoryDataSource(CatalogDataSource):
+    """메모리에 있는 카탈로그를 그대로 넘겨주는 데이터 소스"""
+
+    def __init__(
+        self,
+        metadata_map: Dict[int, dict],
+        sbert_movie_ids: List[int],
+        sbert_embeddings: np.ndarray,
+        lightgcn_movie_to_idx: Dict[int, int],
+        lightgcn_item_embeddings: np.ndarray,
+        movie_ott_map: Dict[int, List[str]] = None,
+        ott_id_to_name: Dict[int, str] = None
+    ):
+        """
+        Args:
+            metadata_map: tmdb_id → 메타데이터
+            sbert_movie_ids: SBERT 행 순서의 tmdb_id
+            sbert_embeddings: (N, D) SBERT 임베딩
+            lightgcn_movie_to_idx: tmdb_id → LightGCN 행 번호
+            lightgcn_item_embeddings: (M, D) LightGCN 아이템 임베딩
+            movie_ott_map: tmdb_id → 제공 OTT 이름 리스트
+            ott_id_to_name: provider_id → OTT 이름 (없으면 movie_ott_map에서 생성)
+        """
+        self.metadata_map = metadata_map
+        self.sbert_movie_ids = list(sbert_movie_ids)
+        self.sbert_embeddings = sbert_embeddings
+        self.lightgcn_movie_to_idx = lightgcn_movie_to_idx
+        self.lightgcn_item_embeddings = lightgcn_item_embeddings
+        self.movie_ott_map = movie_ott_map or {}
+
+        if ott_id_to_name is None:
+            names = sorted({name for names in self.movie_ott_map.values() for name in names})
+            ott_id_to_name = {i: name for i, name in enumerate(names)}
+        self.ott_id_to_name = ott_id_to_name
+
+    def load_metadata(self) -> Dict[int, dict]:
+        return self.metadata_map
+
+    def load_sbert(self) -> Tuple[List[int], np.ndarray]:
+        return self.sbert_movie_ids, self.sbert_embeddings
+
+    def load_ott(self) -> Tuple[Dict[int, str], List[str], Dict[int, List[str]]]:
+        return self.ott_id_to_name, list(self.ott_id_to_name.values()), self.movie_ott_map
+
+    def load_lightgcn(self) -> Tuple[Dict[int, int], np.ndarray]:
+        return self.lightgcn_movie_to_idx, self.lightgcn_item_embeddings
+
+
+def _write_parquet(path: Path, schema, rows: Iterator[dict], chunk_size: int):
+    """행(dict)을 chunk_size 단위 레코드 배치로 Parquet에 기록"""
+    with pq.ParquetWriter(path, schema) as writer:
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                writer.write_batch(pa.RecordBatch.from_pylist(chunk, schema=schema))
+                chunk = []
+        if chunk:
+            writer.write_batch(pa.RecordBatch.from_pylist(chunk, schema=schema))
+
+
+def export_snapshot(source: CatalogDataSource, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Path:
+    """
+    임의의 데이터 소스를 FileDataSource 스냅샷 디렉토리로 저장
+
+    Returns:
+        스냅샷 디렉토리 경로
+    """
+    if pq is None:
+        raise RuntimeError("스냅샷을 만들려면 pyarrow가 필요합니다")
+
+    out = Path(path)
+    out.mkdir(parents=True, exist_ok=True)
+
+    metadata_schema = pa.schema([
+        ('movie_id', pa.int64()),
+        ('tmdb_id', pa.int64()),
+        ('title', pa.string()),
+        ('runtime', pa.int32()),
+        ('genres', pa.list_(pa.string())),
+        ('overview', pa.string()),
+        ('poster_path', pa.string()),
+        ('release_date', pa.string()),
+        ('vote_average', pa.float64()),
+        ('popularity', pa.float64())
+    ])
+    metadata_rows = (
+        {**{col: meta.get(col) for col in METADATA_COLUMNS}, 'tmdb_id': tmdb_id}
+        for tmdb_id, meta in source.load_metadata().items()
+    )
+    _write_parquet(out / 'metadata.parquet', metadata_schema, metadata_rows, chunk_size)
+
+    ott_id_to_name, _, movie_ott_map = source.load_ott()
+    _write_parquet(
+        out / 'ott_providers.parquet',
+        pa.schema([('provider_id', pa.int64()), ('provider_name', pa.string())]),
+        ({'provider_id': pid, 'provider_name': name} for pid, name in ott_id_to_name.items()),
+        chunk_size
+    )
+    _write_parquet(
+        out / 'movie_ott.parquet',
+        pa.schema([('tmdb_id', pa.int64()), ('provider_name', pa.string())]),
+        (
+            {'tmdb_id': tmdb_id, 'provider_name': name}
+            for tmdb_id, names in movie_ott_map.items() for name in names
+        ),
+        chunk_size
+    )
+
+    sbert_ids, sbert_embeddings = source.load_sbert()
+    np.save(out / 'sbert_ids.npy', np.asarray(sbert_ids, dtype=np.int64))
+    np.save(out / 'sbert_embeddings.npy', np.ascontiguousarray(sbert_embeddings, dtype=np.float32))
+
+    lightgcn_movie_to_idx, lightgcn_embeddings = source.load_lightgcn()
+    # 스냅샷은 행 순서 = id 순서로 저장 (매핑 dict 대신 id 배열)
+    lightgcn_ids = sorted(lightgcn_movie_to_idx, key=lightgcn_movie_to_idx.get)
+    rows = np.asarray([lightgcn_movie_to_idx[mid] for mid in lightgcn_ids], dtype=np.int64)
+    np.save(out / 'lightgcn_ids.npy', np.asarray(lightgcn_ids, dtype=np.int64))
+    np.save(out / 'lightgcn_embeddings.npy', np.ascontiguousarray(lightgcn_embeddings[rows], dtype=np.float32))
+
+    print(f"Snapshot saved: {out}")
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PostgreSQL 카탈로그 → 로컬 스냅샷 (Parquet + NPY)")
+    parser.add_argument('--out', required=True, help="스냅샷 디렉토리")
+    parser.add_argument('--lightgcn-model-path', default="training/lightgcn_model/best_model.pt")
+    parser.add_argument('--lightgcn-data-path', default="training/lightgcn_data")
+    args = parser.parse_args()
+
+    source = PostgresDataSource(
+        db_config={
+            'host': os.getenv("DATABASE_HOST", "localhost"),
+            'port': int(os.getenv("DATABASE_PORT", 5432)),
+            'database': os.getenv("DATABASE_NAME", "moviesir"),
+            'user': os.getenv("DATABASE_USER", "moviesir"),
+            'password': os.getenv("DATABASE_PASSWORD", "")
+        },
+        lightgcn_model_path=args.lightgcn_model_path,
+        lightgcn_data_path=args.lightgcn_data_path
+    )
+    try:
+        export_snapshot(source, args.out)
+    finally:
+        source.close()
@@ -1,17 +1,28 @@
 import torch
-import pickle
 import numpy as np
-import psycopg2
-from psycopg2.extras import RealDictCursor
-from pathlib import Path
-from sklearn.preprocessing import MinMaxScaler
 from typing import List, Optional, Tuple
-from itertools import combinations
+from itertools import combinations, islice
+from contextlib import contextmanager
 from math import comb
 import time
+import sys
+import logging
 from dotenv import load_dotenv
 import os
 
+try:
+    from inference.ann_index import ANNIndex
+    from inference.embedding_store import EmbeddingStore, measure_ranking_drift, sample_profile_queries
+    from inference.stage_timer import StageTimer
+    from inference.data_sources import CatalogDataSource, PostgresDataSource
+    from inference.request_log import configure_logging, debug_enabled
+except ImportError:  # 스크립트로 직접 실행하는 경우
+    from ann_index import ANNIndex
+    from embedding_store import EmbeddingStore, measure_ranking_drift, sample_profile_queries
+    from stage_timer import StageTimer
+    from data_sources import CatalogDataSource, PostgresDataSource
+    from request_log import configure_logging, debug_enabled
+
 """
 Hybrid Recommender with PostgreSQL Database
 - SBERT (70%) + LightGCN (30%)
@@ -19,6 +30,8 @@ Hybrid Recommender with PostgreSQL Database
 - 420분 미만: 단일 영화 추천 (Track A, B)
 - 420분 이상: 영화 조합 추천 (Track A, B 모두 조합)
 
+데이터 로드: data_sources (PostgreSQL / 로컬 스냅샷 / 메모리)
+
 DB 테이블:
 - movies: 영화 메타데이터
 - movie_vectors: SBERT 임베딩
@@ -26,48 +39,66 @@ DB 테이블:
 - movie_ott_map: 영화-OTT 연결
 """
 
+logger = logging.getLogger(__name__)
 
-class DatabaseConnection:
-    """PostgreSQL 연결 관리"""
-    
-    def __init__(self, host: str, port: int, database: str, user: str, password: str):
-        self.connection_params = {
-            'host': host,
-            'port': port,
-            'database': database,
-            'user': user,
-            'password': password
-        }
-        self.conn = None
-    
-    def connect(self):
-        """DB 연결"""
-        if self.conn is None or self.conn.closed:
-            self.conn = psycopg2.connect(**self.connection_params)
-        return self.conn
-    
-    def close(self):
-        """DB 연결 종료"""
-        if self.conn and not self.conn.closed:
-            self.conn.close()
+
+def _deep_sizeof(obj, seen: Optional[set] = None) -> int:
+    """dict/list/str 등 파이썬 객체의 대략적인 전체 크기 (bytes)"""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
     
-    def execute_query(self, query: str, params: tuple = None) -> List[dict]:
-        """쿼리 실행 및 결과 반환"""
-        conn = self.connect()
-        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-            cursor.execute(query, params)
-            return cursor.fetchall()
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_sizeof(k, seen) + _deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(_deep_sizeof(item, seen) for item in obj)
+    elif isinstance(obj, np.ndarray):
+        size = obj.nbytes
+    return size
+
+
+def _min_max_normalize(scores: np.ndarray) -> np.ndarray:
+    """min-max 정규화 (값이 모두 같으면 0)"""
+    min_score = scores.min()
+    score_range = scores.max() - min_score
+    if score_range == 0:
+        return np.zeros_like(scores)
+    return (scores - min_score) / score_range
 
 
 class HybridRecommender:
+    # Track B (장르 확장) 블렌딩 가중치
+    TRACK_B_SBERT_WEIGHT = 0.4
+    TRACK_B_LIGHTGCN_WEIGHT = 0.6
+    GENRE_EXPANSION_BOOST = 1.3
+    # Track A/B 공통 개봉연도 필터
+    MIN_RELEASE_YEAR = 2000
+    # 응답 투영: 'full' = 메타데이터 포함, 'ids' = tmdb_id + 점수만
+    PROJECTIONS = ('full', 'ids')
+    # ANN 사용 최소 필터 통과 비율 (인덱스 타입별 기본값)
+    # - HNSW: 필터에 걸린 노드도 그래프 탐색 비용을 차지 → 선택도가 낮으면 efSearch가 k / 선택도로 커져
+    #   필터 결과 전체를 정확히 계산하는 편이 더 빠르고 정확함
+    # - IVF: 필터가 클러스터 스캔에 적용되므로 낮은 선택도에서도 결과가 채워짐
+    ANN_MIN_SELECTIVITY = {'hnsw': 0.3, 'ivf': 0.02}
+
     def __init__(
         self,
-        db_config: dict,
-        lightgcn_model_path: str,
-        lightgcn_data_path: str,
+        db_config: Optional[dict] = None,
+        lightgcn_model_path: Optional[str] = None,
+        lightgcn_data_path: Optional[str] = None,
         sbert_weight: float = 0.7,
         lightgcn_weight: float = 0.3,
-        device: str = None
+        device: str = None,
+        ann_index_type: Optional[str] = 'hnsw',
+        ann_candidates: int = 2000,
+        ann_search_effort: int = 64,
+        ann_min_selectivity: Optional[float] = None,
+        sbert_precision: str = 'float32',
+        drift_sample_queries: int = 64,
+        data_source: Optional[CatalogDataSource] = None
     ):
         """
         Args:
@@ -84,92 +115,202 @@ class HybridRecommender:
             sbert_weight: SBERT 가중치 (기본 0.7)
             lightgcn_weight: LightGCN 가중치 (기본 0.3)
             device: 연산 장치 (cuda/cpu)
+            ann_index_type: SBERT 후보 생성용 ANN 인덱스 ('hnsw' / 'ivf', None이면 brute force)
+            ann_candidates: ANN으로 가져올 후보 수 (이 후보만 정확히 재계산)
+            ann_search_effort: recall ↔ latency 조절값 (HNSW efSearch / IVF nprobe)
+            ann_min_selectivity: 필터 통과 비율이 이보다 낮으면 brute force 사용
+                (None이면 인덱스 타입별 기본값 ANN_MIN_SELECTIVITY)
+            sbert_precision: 점수 계산용 SBERT 행렬 정밀도 ('float32' / 'float16' / 'int8')
+            drift_sample_queries: float32 대비 순위 변화 측정에 쓸 샘플 쿼리 수 (무작위 영화 평균 프로필)
+            data_source: 카탈로그 데이터 소스 (지정하면 db_config / LightGCN 경로 대신 사용)
         """
         self.device = device or ('cuda' if torch.cuda.is_available() else 'cpu')
         self.sbert_weight = sbert_weight
         self.lightgcn_weight = lightgcn_weight
+        self.ann_candidates = ann_candidates
+        self.ann_min_selectivity = (
+            ann_min_selectivity if ann_min_selectivity is not None
+            else self.ANN_MIN_SELECTIVITY.get(ann_index_type or '', 0.0)
+        )
         
-        # DB 연결
-        self.db = DatabaseConnection(**db_config)
+        # 준비 상태 (warm_up() 완료 후 True) + 단계별 로드 시간 (초)
+        self.ready = False
+        self.load_timings = {}
         
-        print("Initializing Hybrid Recommender (DB Mode)...")
+        if data_source is None:
+            # 운영 모드: DB (메타데이터/SBERT/OTT) + 학습 산출물 파일 (LightGCN)
+            data_source = PostgresDataSource(
+                db_config, lightgcn_model_path, lightgcn_data_path, device=self.device
+            )
+        self.data_source = data_source
         
-        # 1. 데이터 로드 (DB에서)
-        self._load_metadata_from_db()
-        self._load_sbert_data_from_db()
-        self._load_ott_data_from_db()
+        print(f"Initializing Hybrid Recommender ({type(data_source).__name__})...")
         
-        # 2. LightGCN 로드 (파일에서 - 학습된 모델)
-        self._load_lightgcn_data(lightgcn_data_path)
-        self._load_lightgcn_model(lightgcn_model_path)
+        # 1~2. 데이터 로드
+        self._load_from_source(data_source)
         
         # 3. Pre-alignment
+        # 모델별 연속 버퍼 1개: [공통 영화 | 해당 모델에만 있는 영화]
+        # - 앞쪽 num_common 행: 점수 계산 (common_movie_ids position과 동일)
+        # - 전체 행: 사용자 프로필용 조회 (*_movie_to_idx 인덱스 맵)
         print("Pre-aligning models for fast inference...")
+        alignment_start = time.perf_counter()
         
         common_ids = set(self.sbert_movie_to_idx.keys()) & set(self.lightgcn_movie_to_idx.keys())
         self.common_movie_ids = sorted(list(common_ids))
+        self.num_common = len(self.common_movie_ids)
         
-        self.target_sbert_matrix = []
-        self.target_lightgcn_matrix = []
+        sbert_order, self.sbert_movie_to_idx = self._aligned_row_order(self.sbert_movie_to_idx)
+        lightgcn_order, self.lightgcn_movie_to_idx = self._aligned_row_order(self.lightgcn_movie_to_idx)
         
-        for mid in self.common_movie_ids:
-            s_idx = self.sbert_movie_to_idx[mid]
-            self.target_sbert_matrix.append(self.sbert_embeddings[s_idx])
-            
-            l_idx = self.lightgcn_movie_to_idx[mid]
-            self.target_lightgcn_matrix.append(self.lightgcn_item_embeddings[l_idx])
+        # 정규화된 SBERT 한 벌만 남기고 원본은 해제
+        sbert_aligned = np.asarray(self.sbert_embeddings[sbert_order], dtype='float32')
+        del self.sbert_embeddings, self.sbert_movie_ids
+        sbert_aligned /= np.linalg.norm(sbert_aligned, axis=1, keepdims=True) + 1e-10
         
-        self.target_sbert_matrix = np.array(self.target_sbert_matrix)
-        self.target_lightgcn_matrix = np.array(self.target_lightgcn_matrix)
+        lightgcn_aligned = np.asarray(self.lightgcn_item_embeddings[lightgcn_order], dtype='float32')
+        del self.lightgcn_item_embeddings
         
-        self.target_sbert_norm = self.target_sbert_matrix / (
-            np.linalg.norm(self.target_sbert_matrix, axis=1, keepdims=True) + 1e-10
-        )
+        self.sbert_store = EmbeddingStore(sbert_aligned, precision=sbert_precision, normalize=False)
+        self.lightgcn_store = EmbeddingStore(lightgcn_aligned, normalize=False)
+        del lightgcn_aligned
+        
+        # 점수 계산 대상 (float32 기준, ANN 인덱스/순위 변화 측정에 사용)
+        target_sbert_norm = sbert_aligned[:self.num_common]
         
         print(f"Pre-alignment complete. Target movies: {len(self.common_movie_ids)}")
         
-        self.scaler = MinMaxScaler()
+        # float32 대비 순위 변화 측정 (양자화한 경우에만)
+        self.sbert_precision_report = None
+        if sbert_precision != 'float32' and len(target_sbert_norm) > 0:
+            # 실제 요청처럼 여러 영화 평균(_user_profile)으로 쿼리 생성
+            drift_queries, drift_rows = sample_profile_queries(target_sbert_norm, drift_sample_queries)
+            self.sbert_precision_report = measure_ranking_drift(
+                target_sbert_norm, self.sbert_store, drift_queries, k=50, exclude_rows=drift_rows
+            )
+            report = self.sbert_precision_report
+            print(f"  SBERT precision: {sbert_precision} "
+                  f"({report['nbytes'] / 1e6:.1f}MB / float32 {report['reference_nbytes'] / 1e6:.1f}MB)")
+            print(f"  Ranking drift vs float32: recall@{report['k']}={report['recall_at_k']:.4f}, "
+                  f"top1={report['top1_agreement']:.4f}, max_abs_error={report['max_abs_error']:.5f}")
+        
+        self.load_timings['alignment'] = time.perf_counter() - alignment_start
+        
+        # 4. 필터용 컬럼형 카탈로그 (common_movie_ids 순서)
+        with self._load_stage('filter_catalog'):
+            self._build_filter_catalog()
+        
+        # 5. SBERT ANN 인덱스 (후보 생성용)
+        self.ann_index = None
+        if ann_index_type:
+            print("Building SBERT ANN index...")
+            with self._load_stage('ann_index'):
+                ann_index = ANNIndex(
+                    target_sbert_norm,
+                    index_type=ann_index_type,
+                    search_effort=ann_search_effort,
+                    precision=sbert_precision
+                )
+            if ann_index.available:
+                self.ann_index = ann_index
+        del target_sbert_norm, sbert_aligned
+        
         self.recommendation_history = []
+        
+        embedding_bytes = self.sbert_store.nbytes + self.lightgcn_store.nbytes
+        print(f"  Resident embedding memory: {embedding_bytes / 1e6:.1f}MB (see memory_report())")
+
+    @contextmanager
+    def _load_stage(self, name: str):
+        """초기화 단계 소요 시간을 load_timings에 기록"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.load_timings[name] = time.perf_counter() - start
 
-    def _load_metadata_from_db(self):
-        """DB에서 영화 메타데이터 로드"""
-        print("Loading metadata from database...")
-        
-        query = """
-            SELECT 
-                movie_id,
-                tmdb_id,
-                title,
-                runtime,
-                genres,
-                overview,
-                poster_path,
-                release_date,
-                vote_average,
-                popularity
-            FROM movies
+    def warm_up(self) -> dict:
         """
+        첫 요청 지연 제거용 warm-up
+        - 모든 임베딩 행/ANN 인덱스/필터 카탈로그를 한 번씩 접근 (page fault, BLAS 스레드 초기화)
+        - 단일/조합 추천을 합성 사용자로 한 번씩 실행 (첫 호출 비용)
+        - 추천 기록(recommendation_history)은 실행 전 상태로 복원
         
-        rows = self.db.execute_query(query)
-        
-        # metadata_map 구성 (tmdb_id를 키로)
-        self.metadata_map = {}
-        for row in rows:
-            tmdb_id = row['tmdb_id']
-            self.metadata_map[tmdb_id] = {
-                'movie_id': row['movie_id'],
-                'tmdb_id': tmdb_id,
-                'title': row['title'],
-                'runtime': row['runtime'] or 0,
-                'genres': row['genres'] or [],  # VARCHAR[] → Python list
-                'overview': row['overview'] or '',
-                'poster_path': row['poster_path'],
-                'release_date': str(row['release_date']) if row['release_date'] else '',
-                'vote_average': row['vote_average'] or 0,
-                'popularity': row['popularity'] or 0
-            }
+        Returns:
+            load_timings (warm_up 포함)
+        """
+        print("Warming up recommender...")
+        start = time.perf_counter()
+        
+        # 행렬 전체 접근 (공통 영화 이외의 조회용 행 포함)
+        probe = self.sbert_store.vectors(np.arange(min(5, len(self.sbert_store)))).mean(axis=0)
+        self.sbert_store.dot(probe)
+        gcn_probe = self.lightgcn_store.vectors(np.arange(min(5, len(self.lightgcn_store)))).mean(axis=0)
+        self.lightgcn_store.dot(gcn_probe)
+        if self.ann_index is not None:
+            self.ann_index.search(probe, self.ann_candidates)
+        
+        # 합성 사용자로 단일/조합 추천 실행 (기록은 복원)
+        sample_user = self.common_movie_ids[:3]
+        saved_history = list(self.recommendation_history)
+        try:
+            for available_time in (120, 480):
+                self.recommend(sample_user, available_time=available_time, projection='ids')
+        finally:
+            self.recommendation_history = saved_history
+        
+        self.load_timings['warm_up'] = time.perf_counter() - start
+        self.ready = True
+        
+        timings = ', '.join(f"{name}={seconds:.2f}s" for name, seconds in self.load_timings.items())
+        print(f"✅ Recommender ready ({timings})")
+        return self.load_timings
+
+    def _aligned_row_order(self, movie_to_idx: dict) -> Tuple[np.ndarray, dict]:
+        """
+        공통 영화가 앞쪽에 오도록 행 순서 재배치
+        
+        Returns:
+            (기존 행 번호 배열 - 새 순서, tmdb_id → 새 행 번호)
+        """
+        common_set = set(self.common_movie_ids)
+        order = [movie_to_idx[mid] for mid in self.common_movie_ids]
+        order.extend(idx for mid, idx in movie_to_idx.items() if mid not in common_set)
+        
+        new_row = {old: new for new, old in enumerate(order)}
+        # 기존 키 순서 유지 (프로필 fallback이 같은 영화를 쓰도록)
+        aligned_map = {mid: new_row[idx] for mid, idx in movie_to_idx.items()}
+        return np.array(order, dtype=np.int64), aligned_map
+
+    def memory_report(self) -> dict:
+        """구조별 상주 메모리 (bytes)"""
+        report = {
+            'sbert_store': self.sbert_store.nbytes,
+            'lightgcn_store': self.lightgcn_store.nbytes,
+            'ann_index': self.ann_index.nbytes if self.ann_index is not None else 0,
+            'filter_catalog': sum(arr.nbytes for arr in (
+                self.common_movie_id_array,
+                self.catalog_runtime,
+                self.catalog_year,
+                self.catalog_genre_mask,
+                self.catalog_ott_mask,
+                self.catalog_has_meta
+            )),
+            'id_maps': (
+                _deep_sizeof(self.sbert_movie_to_idx)
+                + _deep_sizeof(self.lightgcn_movie_to_idx)
+                + _deep_sizeof(self.common_movie_ids)
+            ),
+            'metadata_map': _deep_sizeof(self.metadata_map),
+            'movie_ott_map': _deep_sizeof(self.movie_ott_map)
+        }
+        report['total'] = sum(report.values())
+        return report
+
+    def _set_metadata(self, metadata_map: dict):
+        """metadata_map 설정 + 장르 리스트 추출"""
+        self.metadata_map = metadata_map
         
-        # 장르 리스트 추출
         all_genres = set()
         for movie_data in self.metadata_map.values():
             genres = movie_data.get('genres', [])
@@ -181,182 +322,290 @@ class HybridRecommender:
         print(f"  Metadata loaded: {len(self.metadata_map):,} movies")
         print(f"  Available genres: {len(self.all_genres)}")
 
-    def _load_sbert_data_from_db(self):
-        """DB에서 SBERT 임베딩 로드"""
-        print("Loading SBERT embeddings from database...")
-        
-        query = """
-            SELECT 
-                mv.movie_id,
-                m.tmdb_id,
-                mv.embedding
-            FROM movie_vectors mv
-            JOIN movies m ON mv.movie_id = m.movie_id
-            ORDER BY mv.movie_id
+    def _load_from_source(self, source: CatalogDataSource):
+        """데이터 소스에서 메타데이터 / SBERT / OTT / LightGCN 로드"""
+        with self._load_stage('metadata'):
+            self._set_metadata(source.load_metadata())
+        
+        with self._load_stage('sbert'):
+            self.sbert_movie_ids, self.sbert_embeddings = source.load_sbert()
+            self.sbert_movie_to_idx = {mid: idx for idx, mid in enumerate(self.sbert_movie_ids)}
+            print(f"  SBERT movies: {len(self.sbert_movie_ids):,}")
+        
+        with self._load_stage('ott'):
+            self.ott_id_to_name, self.all_otts, self.movie_ott_map = source.load_ott()
+            print(f"  OTT data loaded: {len(self.movie_ott_map):,} movies")
+        
+        with self._load_stage('lightgcn'):
+            self.lightgcn_movie_to_idx, self.lightgcn_item_embeddings = source.load_lightgcn()
+            print(f"  LightGCN movies: {len(self.lightgcn_movie_to_idx):,}")
+
+    def _get_movie_runtime(self, movie_id: int) -> int:
+        """영화 런타임 반환 (분)"""
+        meta = self.metadata_map.get(movie_id, {})
+        runtime = meta.get('runtime', 0)
+        try:
+            return int(float(runtime)) if runtime else 0
+        except:
+            return 0
+
+    def _build_filter_catalog(self):
         """
-        
-        rows = self.db.execute_query(query)
-        
-        self.sbert_movie_ids = []
-        embeddings = []
-        
-        for row in rows:
-            tmdb_id = row['tmdb_id']
-            # pgvector는 문자열로 반환될 수 있음 → numpy 배열로 변환
-            embedding = row['embedding']
-            if isinstance(embedding, str):
-                # '[0.1, 0.2, ...]' 형태 파싱
-                embedding = np.fromstring(embedding.strip('[]'), sep=',', dtype='float32')
-            elif isinstance(embedding, list):
-                embedding = np.array(embedding, dtype='float32')
-            else:
-                embedding = np.array(embedding, dtype='float32')
+        필터용 컬럼형 카탈로그 생성 (common_movie_ids position 기준)
+        - 장르/OTT: uint64 비트마스크 (비트 = all_genres / all_otts 순서)
+        - 런타임/개봉 연도: 정수 배열 (알 수 없으면 0)
+        """
+        self.genre_bits = {genre: np.uint64(1 << i) for i, genre in enumerate(self.all_genres)}
+        
+        ott_names = list(self.all_otts)
+        for providers in self.movie_ott_map.values():
+            ott_names.extend(p for p in providers if p not in ott_names)
+        self.ott_bits = {ott: np.uint64(1 << i) for i, ott in enumerate(ott_names)}
+        
+        if len(self.genre_bits) > 64 or len(self.ott_bits) > 64:
+            raise ValueError("장르/OTT 비트마스크는 최대 64개까지 지원합니다")
+        
+        n = len(self.common_movie_ids)
+        self.common_movie_id_array = np.array(self.common_movie_ids, dtype=np.int64)
+        self.catalog_runtime = np.zeros(n, dtype=np.int32)
+        self.catalog_year = np.zeros(n, dtype=np.int32)
+        self.catalog_genre_mask = np.zeros(n, dtype=np.uint64)
+        self.catalog_ott_mask = np.zeros(n, dtype=np.uint64)
+        self.catalog_has_meta = np.zeros(n, dtype=bool)
+        
+        for i, mid in enumerate(self.common_movie_ids):
+            meta = self.metadata_map.get(mid)
+            if not meta:
+                continue
+            self.catalog_has_meta[i] = True
+            self.catalog_runtime[i] = self._get_movie_runtime(mid)
             
-            self.sbert_movie_ids.append(tmdb_id)
-            embeddings.append(embedding)
-        
-        self.sbert_embeddings = np.array(embeddings, dtype='float32')
-        self.sbert_movie_to_idx = {mid: idx for idx, mid in enumerate(self.sbert_movie_ids)}
+            release_date = meta.get('release_date', '')
+            try:
+                self.catalog_year[i] = int(release_date[:4]) if release_date else 0
+            except ValueError:
+                self.catalog_year[i] = 0
+            
+            self.catalog_genre_mask[i] = self._bitmask(meta.get('genres', []), self.genre_bits)
+            self.catalog_ott_mask[i] = self._bitmask(self.movie_ott_map.get(mid, []), self.ott_bits)
         
-        print(f"  SBERT movies: {len(self.sbert_movie_ids):,}")
+        print(f"  Filter catalog built: {len(self.genre_bits)} genre bits, {len(self.ott_bits)} OTT bits")
+
+    @staticmethod
+    def _bitmask(names: Optional[List[str]], bits: dict) -> np.uint64:
+        """이름 리스트 → 비트마스크 (모르는 이름은 무시)"""
+        mask = np.uint64(0)
+        for name in names or []:
+            mask |= bits.get(name, np.uint64(0))
+        return mask
 
-    def _load_ott_data_from_db(self):
-        """DB에서 OTT 데이터 로드"""
-        print("Loading OTT data from database...")
-        
-        # OTT 제공자 목록
-        ott_query = """
-            SELECT provider_id, provider_name
-            FROM ott_providers
-            ORDER BY display_priority, provider_name
+    def _filter_mask(
+        self,
+        preferred_genres: Optional[List[str]] = None,
+        max_runtime: Optional[int] = None,
+        min_year: Optional[int] = None,
+        preferred_otts: Optional[List[str]] = None
+    ) -> np.ndarray:
         """
-        ott_rows = self.db.execute_query(ott_query)
-        
-        self.ott_id_to_name = {row['provider_id']: row['provider_name'] for row in ott_rows}
-        self.all_otts = [row['provider_name'] for row in ott_rows]
-        
-        # 영화-OTT 매핑
-        map_query = """
-            SELECT 
-                m.tmdb_id,
-                op.provider_name
-            FROM movie_ott_map mom
-            JOIN movies m ON mom.movie_id = m.movie_id
-            JOIN ott_providers op ON mom.provider_id = op.provider_id
+        필터 조건을 만족하는 position 마스크 (장르, 런타임, 연도, OTT)
+        
+        Returns:
+            (len(common_movie_ids),) bool 배열
         """
-        map_rows = self.db.execute_query(map_query)
+        mask = self.catalog_has_meta.copy()
         
-        self.movie_ott_map = {}
-        for row in map_rows:
-            tmdb_id = row['tmdb_id']
-            provider_name = row['provider_name']
-            
-            if tmdb_id not in self.movie_ott_map:
-                self.movie_ott_map[tmdb_id] = []
-            self.movie_ott_map[tmdb_id].append(provider_name)
+        # 1. 런타임 필터링
+        if max_runtime is not None:
+            mask &= (self.catalog_runtime > 0) & (self.catalog_runtime <= max_runtime)
         
-        print(f"  OTT data loaded: {len(self.movie_ott_map):,} movies")
-        print(f"  Available OTTs: {self.all_otts}")
-
-    def _load_lightgcn_data(self, data_path: str):
-        """LightGCN 매핑 데이터 로드 (파일)"""
-        data_path = Path(data_path)
-        with open(data_path / 'id_mappings.pkl', 'rb') as f:
-            mappings = pickle.load(f)
+        # 2. 연도 필터링 (개봉일 없으면 제외)
+        if min_year is not None:
+            mask &= (self.catalog_year > 0) & (self.catalog_year >= min_year)
+        
+        # 3. 장르 필터링 (선호 장르 중 하나라도 포함)
+        if preferred_genres:
+            preferred_mask = self._bitmask(preferred_genres, self.genre_bits)
+            mask &= (self.catalog_genre_mask & preferred_mask) != 0
         
-        self.lightgcn_movie_to_idx = mappings['tmdb2id']
-        self.lightgcn_idx_to_movie = mappings['id2tmdb']
+        # 4. OTT 필터링 (선택 OTT 중 하나라도 제공)
+        if preferred_otts:
+            preferred_mask = self._bitmask(preferred_otts, self.ott_bits)
+            mask &= (self.catalog_ott_mask & preferred_mask) != 0
         
-        print(f"  LightGCN movies: {len(self.lightgcn_movie_to_idx):,}")
+        return mask
 
-    def _load_lightgcn_model(self, model_path: str):
-        """LightGCN 모델 로드 (파일)"""
-        print(f"Loading LightGCN model from {model_path}")
-        checkpoint = torch.load(model_path, map_location=self.device)
-        
-        if isinstance(checkpoint, dict):
-            if 'model_state_dict' in checkpoint:
-                self.lightgcn_item_embeddings = checkpoint['model_state_dict']['item_embedding.weight'].cpu().numpy()
-            elif 'item_embeddings' in checkpoint:
-                self.lightgcn_item_embeddings = checkpoint['item_embeddings'].cpu().numpy()
-            else:
-                self.lightgcn_item_embeddings = checkpoint['item_embedding.weight'].cpu().numpy()
+    def filter_selectivity(
+        self,
+        available_time: int,
+        preferred_genres: Optional[List[str]] = None,
+        preferred_otts: Optional[List[str]] = None
+    ) -> float:
+        """
+        recommend()의 Track A 필터를 통과하는 영화 비율 (0~1, 벤치마크/진단용)
+        - 런타임 필터: single 모드에서만 available_time 이하 (recommend()와 동일)
+        """
+        recommendation_type = 'combination' if available_time >= 420 else 'single'
+        max_runtime = None if recommendation_type == 'combination' else available_time
+        mask = self._filter_mask(preferred_genres, max_runtime, self.MIN_RELEASE_YEAR, preferred_otts)
+        return float(mask.mean()) if len(mask) else 0.0
 
-    def _get_movie_runtime(self, movie_id: int) -> int:
-        """영화 런타임 반환 (분)"""
-        meta = self.metadata_map.get(movie_id, {})
-        runtime = meta.get('runtime', 0)
-        try:
-            return int(float(runtime)) if runtime else 0
-        except:
-            return 0
+    def _use_ann(self, n_filtered: int) -> bool:
+        """ANN 후보 생성 사용 여부 (필터가 강하면 brute force가 충분히 빠름)"""
+        if self.ann_index is None:
+            return False
+        
+        # 필터 후 영화가 후보 수보다 적으면 전부 정확히 계산
+        if n_filtered <= self.ann_candidates:
+            return False
+        
+        # 필터 통과 비율이 매우 낮으면 필터링된 그래프 탐색보다 brute force가 빠름
+        return n_filtered / len(self.common_movie_ids) >= self.ann_min_selectivity
 
-    def _apply_filters(
+    def _filtered_candidates(
         self,
-        movie_ids: List[int],
+        user_sbert_profile: np.ndarray,
         preferred_genres: Optional[List[str]] = None,
         max_runtime: Optional[int] = None,
         min_year: Optional[int] = None,
-        preferred_otts: Optional[List[str]] = None
+        preferred_otts: Optional[List[str]] = None,
+        timer: Optional[StageTimer] = None
     ) -> Tuple[List[int], List[int]]:
         """
-        필터링 적용 (장르, 런타임, 연도, OTT)
+        필터를 만족하는 후보 생성
+        - 필터 마스크를 ANN 검색에 직접 적용 → 반환 후보는 모두 필터 통과
+        - 필터 통과 영화가 적으면 필터 결과 전체 (brute force)
+        - ANN이 후보를 다 채우지 못하면 (필터 때문에 탐색이 일찍 끝난 경우) 필터 결과 전체
         
         Returns:
             (filtered_ids, filtered_indices)
         """
-        filtered_indices = []
-        filtered_ids = []
-        
-        for i, movie_id in enumerate(movie_ids):
-            meta = self.metadata_map.get(movie_id, {})
-            if not meta:
-                continue
-            
-            # 1. 런타임 필터링
-            if max_runtime is not None:
-                runtime = meta.get('runtime', 0)
-                try:
-                    runtime = float(runtime) if runtime else 0
-                except:
-                    runtime = 0
-                
-                if runtime <= 0 or runtime > max_runtime:
-                    continue
-            
-            # 2. 연도 필터링
-            if min_year is not None:
-                release_date = meta.get('release_date', '')
-                if release_date:
-                    try:
-                        year = int(release_date[:4])
-                        if year < min_year:
-                            continue
-                    except:
-                        continue
+        timer = timer or StageTimer()
+        
+        with timer.stage('filter'):
+            mask = self._filter_mask(preferred_genres, max_runtime, min_year, preferred_otts)
+            n_filtered = int(np.count_nonzero(mask))
+        
+        with timer.stage('candidate_search'):
+            filtered_indices = None
+            if self._use_ann(n_filtered):
+                ann_indices = self.ann_index.search(user_sbert_profile, self.ann_candidates, allowed=mask)
+                if len(ann_indices) >= min(self.ann_candidates, n_filtered):
+                    filtered_indices = np.sort(ann_indices)
                 else:
-                    continue
-            
-            # 3. 장르 필터링 (DB는 이미 배열)
-            if preferred_genres:
-                genres = meta.get('genres', [])
-                if not genres:
-                    continue
-                
-                # 선호 장르와 교집합 확인
-                if not any(g in genres for g in preferred_genres):
-                    continue
+                    logger.debug("ANN 후보 부족 (%d/%d, 필터 통과 %d) → brute force",
+                                 len(ann_indices), self.ann_candidates, n_filtered)
+            if filtered_indices is None:
+                filtered_indices = np.flatnonzero(mask)
+        
+        return self.common_movie_id_array[filtered_indices].tolist(), filtered_indices.tolist()
+
+    def _user_profile(
+        self,
+        store: EmbeddingStore,
+        movie_to_idx: dict,
+        user_movie_ids: List[int]
+    ) -> np.ndarray:
+        """사용자 영화 임베딩 평균 (float32)"""
+        rows = [movie_to_idx[mid] for mid in user_movie_ids if mid in movie_to_idx]
+        
+        if not rows:
+            # 사용자 영화가 인덱스에 없으면 인덱스 내 영화 사용
+            rows = list(islice(movie_to_idx.values(), 5))
+        
+        return store.vectors(rows).mean(axis=0)
+
+    def _score_positions(
+        self,
+        store: EmbeddingStore,
+        vector: np.ndarray,
+        positions: np.ndarray
+    ) -> np.ndarray:
+        """
+        positions 행만 점수 계산 (float32 누적)
+        
+        Returns:
+            (len(positions),) 점수 배열
+        """
+        if len(positions) * 2 >= self.num_common:
+            # 대부분을 계산해야 하면 gather 복사 없이 전체 matmul
+            return store.dot(vector, limit=self.num_common)[positions]
+        
+        return store.dot(vector, positions)
+
+    def _fused_track_scores(
+        self,
+        user_sbert_profile: np.ndarray,
+        user_gcn_profile: np.ndarray,
+        filtered_indices_a: List[int],
+        filtered_indices_b: List[int],
+        expansion_genres: Optional[List[str]] = None,
+        expansion_boost: float = GENRE_EXPANSION_BOOST,
+        timer: Optional[StageTimer] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Track A/B 최종 점수를 한 번에 계산
+        - SBERT/LightGCN 원점수는 두 트랙 후보의 합집합에 대해 한 번만 계산
+        - min-max 정규화 통계도 합집합 기준으로 공유
+        - Track B 장르 확장 가중치는 장르 비트마스크로 한 번에 적용
+          ((genre_mask & preferred_mask) == 0 → expansion_boost 곱)
+        
+        Returns:
+            (final_scores_a, final_scores_b) - 각각 filtered_indices 순서
+        """
+        timer = timer or StageTimer()
+        
+        union_positions = np.union1d(filtered_indices_a, filtered_indices_b).astype(np.int64)
+        if len(union_positions) == 0:
+            return np.zeros(0, dtype='float32'), np.zeros(0, dtype='float32')
+        
+        with timer.stage('sbert_matmul'):
+            sbert_scores = self._score_positions(self.sbert_store, user_sbert_profile, union_positions)
+        with timer.stage('lightgcn_matmul'):
+            lightgcn_scores = self._score_positions(self.lightgcn_store, user_gcn_profile, union_positions)
+        
+        with timer.stage('normalize'):
+            norm_sbert = _min_max_normalize(sbert_scores)
+            norm_lightgcn = _min_max_normalize(lightgcn_scores)
             
-            # 4. OTT 필터링
-            if preferred_otts:
-                movie_otts = self.movie_ott_map.get(movie_id, [])
-                if not any(ott in movie_otts for ott in preferred_otts):
-                    continue
+            pos_a = np.searchsorted(union_positions, filtered_indices_a)
+            pos_b = np.searchsorted(union_positions, filtered_indices_b)
             
-            filtered_indices.append(i)
-            filtered_ids.append(movie_id)
+            final_scores_a = self.sbert_weight * norm_sbert[pos_a] + self.lightgcn_weight * norm_lightgcn[pos_a]
+            final_scores_b = (
+                self.TRACK_B_SBERT_WEIGHT * norm_sbert[pos_b]
+                + self.TRACK_B_LIGHTGCN_WEIGHT * norm_lightgcn[pos_b]
+            )
+        
+        # 장르 확장: 선호 장르가 하나도 없는 (장르 정보가 있는) 영화 가중
+        if expansion_genres and expansion_boost != 1.0:
+            with timer.stage('genre_boost'):
+                preferred_mask = self._bitmask(expansion_genres, self.genre_bits)
+                genre_mask_b = self.catalog_genre_mask[filtered_indices_b]
+                expansion = (genre_mask_b != 0) & ((genre_mask_b & preferred_mask) == 0)
+                final_scores_b *= np.where(expansion, np.float32(expansion_boost), np.float32(1.0))
+        
+        return final_scores_a, final_scores_b
+
+    def _exclude_ids(self, final_scores: np.ndarray, filtered_indices: List[int], exclude_ids) -> None:
+        """exclude_ids에 포함된 영화 점수를 -inf로 (in-place, 한 번에)"""
+        if len(final_scores) == 0 or not exclude_ids:
+            return
         
-        return filtered_ids, filtered_indices
+        movie_ids = self.common_movie_id_array[filtered_indices]
+        final_scores[np.isin(movie_ids, np.fromiter(exclude_ids, dtype=np.int64))] = -np.inf
+
+    @staticmethod
+    def _sample_top(final_scores: np.ndarray, valid_indices: np.ndarray) -> np.ndarray:
+        """
+        상위 후보에서 랜덤 선택
+        - 50개 이상: 상위 50개 중 25개 / 30개 이상: 상위 30개 중 20개 / 20개 이상: 상위 20개 중 15개
+        - 그보다 적으면 있는 만큼만 반환 (강제로 채우지 않음)
+        """
+        for pool_size, sample_size in ((50, 25), (30, 20), (20, 15)):
+            if len(valid_indices) >= pool_size:
+                order = np.argsort(-final_scores[valid_indices], kind='stable')[:pool_size]
+                return np.random.choice(valid_indices[order], size=sample_size, replace=False)
+        return valid_indices
 
     def _find_movie_combinations(
         self,
@@ -366,9 +615,7 @@ class HybridRecommender:
         top_k: int = 1
     ) -> List[dict]:
         """시간에 맞는 영화 조합 찾기"""
-        print(f"\nFinding movie combinations...")
-        print(f"  Available time: {available_time} min")
-        print(f"  Candidate movies: {len(movie_ids)}")
+        logger.debug("Finding movie combinations: available_time=%d, candidates=%d", available_time, len(movie_ids))
         
         movie_data = []
         for i, mid in enumerate(movie_ids):
@@ -381,10 +628,10 @@ class HybridRecommender:
                 })
         
         if not movie_data:
-            print("  No valid movies for combination")
+            logger.debug("No valid movies for combination")
             return []
         
-        print(f"  Valid movies after runtime filter: {len(movie_data)}")
+        logger.debug("Valid movies after runtime filter: %d", len(movie_data))
         
         movie_data.sort(key=lambda x: x['score'], reverse=True)
         
@@ -399,7 +646,7 @@ class HybridRecommender:
                 break
         
         movie_data = movie_data[:max_candidates]
-        print(f"  Using top {len(movie_data)} candidates")
+        logger.debug("Using top %d candidates", len(movie_data))
         
         valid_combinations = []
         time_tolerance = 30
@@ -422,7 +669,7 @@ class HybridRecommender:
             if len(valid_combinations) >= 1:
                 break
         
-        print(f"  Found {len(valid_combinations)} valid combination(s)")
+        logger.debug("Found %d valid combination(s)", len(valid_combinations))
         
         if not valid_combinations:
             return []
@@ -437,62 +684,57 @@ class HybridRecommender:
         top_k: int = 20,
         exclude_seen: bool = True,
         preferred_genres: Optional[List[str]] = None,
-        preferred_otts: Optional[List[str]] = None
+        preferred_otts: Optional[List[str]] = None,
+        genre_expansion_boost: float = GENRE_EXPANSION_BOOST,
+        projection: str = 'full'
     ) -> Tuple[str, dict]:
-        """하이브리드 추천"""
-        print(f"\nStarting hybrid recommendation...")
-        print(f"Available time: {available_time} min")
+        """
+        하이브리드 추천
         
-        start_time = time.time()
+        Args:
+            genre_expansion_boost: Track B에서 선호 장르가 없는 영화에 곱할 가중치 (단일 추천)
+            projection: 'full' (제목/줄거리 등 메타데이터 포함) 또는 'ids' (tmdb_id + 점수만)
+        """
+        if projection not in self.PROJECTIONS:
+            raise ValueError(f"지원하지 않는 projection: {projection}")
         
-        # 1. 사용자 프로필 생성
-        user_sbert_vecs = []
-        for mid in user_movie_ids:
-            if mid in self.sbert_movie_to_idx:
-                user_sbert_vecs.append(self.sbert_embeddings[self.sbert_movie_to_idx[mid]])
-
-        if not user_sbert_vecs:
-            # 사용자 영화가 인덱스에 없으면 인덱스 내 영화 사용
-            random_ids = list(self.sbert_movie_to_idx.keys())[:100]
-            for mid in random_ids[:5]:
-                if mid in self.sbert_movie_to_idx:
-                    user_sbert_vecs.append(self.sbert_embeddings[self.sbert_movie_to_idx[mid]])
-        
-        user_sbert_profile = np.mean(user_sbert_vecs, axis=0)
-        user_sbert_profile = user_sbert_profile / (np.linalg.norm(user_sbert_profile) + 1e-10)
-        
-        user_gcn_vecs = []
-        for mid in user_movie_ids:
-            if mid in self.lightgcn_movie_to_idx:
-                user_gcn_vecs.append(self.lightgcn_item_embeddings[self.lightgcn_movie_to_idx[mid]])
-
-        if not user_gcn_vecs:
-            # 사용자 영화가 인덱스에 없으면 인덱스 내 영화 사용
-            random_ids = list(self.lightgcn_movie_to_idx.keys())[:100]
-            for mid in random_ids[:5]:
-                if mid in self.lightgcn_movie_to_idx:
-                    user_gcn_vecs.append(self.lightgcn_item_embeddings[self.lightgcn_movie_to_idx[mid]])
+        logger.debug("Starting hybrid recommendation: available_time=%d", available_time)
         
-        user_gcn_profile = np.mean(user_gcn_vecs, axis=0)
+        start_time = time.time()
+        timer = StageTimer()
         
-        # 2. 전체 점수 계산
-        sbert_scores = self.target_sbert_norm @ user_sbert_profile
-        lightgcn_scores = self.target_lightgcn_matrix @ user_gcn_profile
+        # 1. 사용자 프로필 생성 (인덱스 맵으로 공유 버퍼에서 조회)
+        with timer.stage('profile'):
+            user_sbert_profile = self._user_profile(self.sbert_store, self.sbert_movie_to_idx, user_movie_ids)
+            user_sbert_profile = user_sbert_profile / (np.linalg.norm(user_sbert_profile) + 1e-10)
+            
+            user_gcn_profile = self._user_profile(self.lightgcn_store, self.lightgcn_movie_to_idx, user_movie_ids)
         
-        # 3. 추천 타입 결정
+        # 2. 추천 타입 결정
         recommendation_type = 'combination' if available_time >= 420 else 'single'
         max_runtime = None if recommendation_type == 'combination' else available_time
         
-        # 4. Track A 필터링 (장르 + 연도 + OTT 적용)
-        filtered_ids_a, filtered_indices_a = self._apply_filters(
-            self.common_movie_ids, preferred_genres, max_runtime,
-            min_year=2000, preferred_otts=preferred_otts
+        # 3. Track A 후보 (장르 + 연도 + OTT 필터를 ANN 검색에 적용)
+        filtered_ids_a, filtered_indices_a = self._filtered_candidates(
+            user_sbert_profile, preferred_genres, max_runtime,
+            min_year=self.MIN_RELEASE_YEAR, preferred_otts=preferred_otts, timer=timer
+        )
+        
+        # 4. Track B 후보 (장르 무시, OTT 무시, 연도만 적용)
+        filtered_ids_b, filtered_indices_b = self._filtered_candidates(
+            user_sbert_profile, None, max_runtime,
+            min_year=self.MIN_RELEASE_YEAR, preferred_otts=None,  # ✅ OTT 필터링 제거
+            timer=timer
         )
         
-        # 5. Track B 필터링 (장르 무시, OTT 무시, 연도만 적용)
-        filtered_ids_b, filtered_indices_b = self._apply_filters(
-            self.common_movie_ids, None, max_runtime,
-            min_year=2000, preferred_otts=None  # ✅ OTT 필터링 제거
+        # 5. 후보에 대해서만 정확한 점수 계산 + 두 트랙 블렌딩 (한 번에)
+        # Track B 장르 확장 가중치는 단일 추천에만 적용
+        final_scores_a, final_scores_b = self._fused_track_scores(
+            user_sbert_profile, user_gcn_profile,
+            filtered_indices_a, filtered_indices_b,
+            expansion_genres=preferred_genres if recommendation_type == 'single' else None,
+            expansion_boost=genre_expansion_boost,
+            timer=timer
         )
         
         if recommendation_type == 'single':
@@ -500,35 +742,20 @@ class HybridRecommender:
             
             # Track A
             if filtered_ids_a:
-                print(f"\n{'='*80}")
-                print(f"[Track A] 필터링 후 영화 수: {len(filtered_ids_a)}")
-                print(f"[Track A] 사용자 선택 장르: {preferred_genres}")
-                print(f"{'='*80}\n")
-                
-                filtered_sbert_a = sbert_scores[filtered_indices_a]
-                filtered_lightgcn_a = lightgcn_scores[filtered_indices_a]
-                
-                norm_sbert_a = self.scaler.fit_transform(filtered_sbert_a.reshape(-1, 1)).squeeze()
-                norm_lightgcn_a = self.scaler.fit_transform(filtered_lightgcn_a.reshape(-1, 1)).squeeze()
+                logger.debug("[Track A] 필터링 후 영화 수: %d, 사용자 선택 장르: %s", len(filtered_ids_a), preferred_genres)
                 
-                final_scores_a = self.sbert_weight * norm_sbert_a + self.lightgcn_weight * norm_lightgcn_a
-                
-                if exclude_seen:
-                    for i, mid in enumerate(filtered_ids_a):
-                        if mid in user_movie_ids:
-                            final_scores_a[i] = -np.inf
-                
-                for i, mid in enumerate(filtered_ids_a):
-                    if mid in self.recommendation_history[-50:]:
-                        final_scores_a[i] = -np.inf
-                
-                valid_indices_a = [i for i, score in enumerate(final_scores_a) if score != -np.inf]
+                with timer.stage('exclusion'):
+                    excluded_a = set(self.recommendation_history[-50:])
+                    if exclude_seen:
+                        excluded_a.update(user_movie_ids)
+                    self._exclude_ids(final_scores_a, filtered_indices_a, excluded_a)
+                    
+                    valid_indices_a = np.flatnonzero(final_scores_a != -np.inf)
                 
-                print(f"[Track A] 유효한 영화 수 (시청 기록 제외 후): {len(valid_indices_a)}")
+                logger.debug("[Track A] 유효한 영화 수 (시청 기록 제외 후): %d", len(valid_indices_a))
                 
-                # 장르 검증 로깅
-                if preferred_genres and len(valid_indices_a) > 0:
-                    print(f"\n[Track A] 장르 검증 시작...")
+                # 장르 검증 (메타데이터 재조회 비용 → DEBUG가 켜진 샘플 요청에서만)
+                if preferred_genres and len(valid_indices_a) > 0 and debug_enabled(logger):
                     genre_mismatch_count = 0
                     for idx in valid_indices_a[:10]:  # 처음 10개만 검증
                         mid = filtered_ids_a[idx]
@@ -537,93 +764,55 @@ class HybridRecommender:
                         has_match = any(g in movie_genres for g in preferred_genres)
                         if not has_match:
                             genre_mismatch_count += 1
-                            print(f"  ⚠️  영화 {mid} ({meta.get('title', 'Unknown')}): 장르 불일치!")
-                            print(f"      영화 장르: {movie_genres}")
-                            print(f"      요청 장르: {preferred_genres}")
+                            logger.warning(
+                                "[Track A] 장르 불일치: 영화 %s (%s), 영화 장르=%s, 요청 장르=%s",
+                                mid, meta.get('title', 'Unknown'), movie_genres, preferred_genres
+                            )
                     
                     if genre_mismatch_count > 0:
-                        print(f"\n[Track A] ❌ 장르 불일치 영화 발견: {genre_mismatch_count}개")
+                        logger.warning("[Track A] 장르 불일치 영화 발견: %d개", genre_mismatch_count)
                     else:
-                        print(f"\n[Track A] ✅ 장르 필터링 정상 작동")
+                        logger.debug("[Track A] 장르 필터링 정상 작동")
                 
                 # 랜덤 선택 (영화가 부족하면 있는 만큼만 반환)
-                if len(valid_indices_a) >= 50:
-                    top_50_indices_a = sorted(valid_indices_a, key=lambda i: final_scores_a[i], reverse=True)[:50]
-                    selected_indices_a = np.random.choice(top_50_indices_a, size=min(25, len(top_50_indices_a)), replace=False)
-                elif len(valid_indices_a) >= 30:
-                    top_30_indices_a = sorted(valid_indices_a, key=lambda i: final_scores_a[i], reverse=True)[:30]
-                    selected_indices_a = np.random.choice(top_30_indices_a, size=min(20, len(top_30_indices_a)), replace=False)
-                elif len(valid_indices_a) >= 20:
-                    top_20_indices_a = sorted(valid_indices_a, key=lambda i: final_scores_a[i], reverse=True)[:20]
-                    selected_indices_a = np.random.choice(top_20_indices_a, size=min(15, len(top_20_indices_a)), replace=False)
-                else:
-                    # 영화가 부족하면 있는 만큼만 반환 (강제로 채우지 않음)
-                    selected_indices_a = valid_indices_a
+                with timer.stage('sampling'):
+                    selected_indices_a = self._sample_top(final_scores_a, valid_indices_a)
                 
-                print(f"[Track A] 최종 선택된 영화 수: {len(selected_indices_a)}\n")
+                logger.debug("[Track A] 최종 선택된 영화 수: %d", len(selected_indices_a))
                 
-                track_a = self._build_recommendations(filtered_ids_a, final_scores_a, selected_indices_a)
-                
-                for rec in track_a:
-                    self.recommendation_history.append(rec['tmdb_id'])
+                with timer.stage('result_build'):
+                    selected_ids_a = [filtered_ids_a[idx] for idx in selected_indices_a]
+                    self.recommendation_history.extend(selected_ids_a)
+                    
+                    track_a = self._build_recommendations(
+                        selected_ids_a, final_scores_a[selected_indices_a], projection
+                    )
             else:
+                selected_ids_a = []
                 track_a = []
             
             # Track B
             if filtered_ids_b:
-                filtered_sbert_b = sbert_scores[filtered_indices_b]
-                filtered_lightgcn_b = lightgcn_scores[filtered_indices_b]
-                
-                norm_sbert_b = self.scaler.fit_transform(filtered_sbert_b.reshape(-1, 1)).squeeze()
-                norm_lightgcn_b = self.scaler.fit_transform(filtered_lightgcn_b.reshape(-1, 1)).squeeze()
-                
-                final_scores_b = 0.4 * norm_sbert_b + 0.6 * norm_lightgcn_b
-                
-                if exclude_seen:
-                    for i, mid in enumerate(filtered_ids_b):
-                        if mid in user_movie_ids:
-                            final_scores_b[i] = -np.inf
-                
-                track_a_ids = [m['tmdb_id'] for m in track_a]
-                for i, mid in enumerate(filtered_ids_b):
-                    if mid in track_a_ids:
-                        final_scores_b[i] = -np.inf
-                
-                for i, mid in enumerate(filtered_ids_b):
-                    if mid in self.recommendation_history[-50:]:
-                        final_scores_b[i] = -np.inf
-
-                track_a_genres = set()
-                if preferred_genres:
-                    track_a_genres.update(preferred_genres)
-                
-                for i, mid in enumerate(filtered_ids_b):
-                    if final_scores_b[i] == -np.inf:
-                        continue
-                    
-                    meta = self.metadata_map.get(mid, {})
-                    genres = meta.get('genres', [])
+                # 시청 기록 + Track A 결과 + 최근 추천 제외 (한 번에)
+                with timer.stage('exclusion'):
+                    excluded_b = set(self.recommendation_history[-50:])
+                    excluded_b.update(selected_ids_a)
+                    if exclude_seen:
+                        excluded_b.update(user_movie_ids)
+                    self._exclude_ids(final_scores_b, filtered_indices_b, excluded_b)
                     
-                    if track_a_genres and genres and not any(g in track_a_genres for g in genres):
-                        final_scores_b[i] *= 1.3
-                
-                valid_indices = [i for i, score in enumerate(final_scores_b) if score != -np.inf]
-                if len(valid_indices) >= 50:
-                    top_50_indices = sorted(valid_indices, key=lambda i: final_scores_b[i], reverse=True)[:50]
-                    selected_indices = np.random.choice(top_50_indices, size=min(25, len(top_50_indices)), replace=False)
-                elif len(valid_indices) >= 30:
-                    top_30_indices = sorted(valid_indices, key=lambda i: final_scores_b[i], reverse=True)[:30]
-                    selected_indices = np.random.choice(top_30_indices, size=min(20, len(top_30_indices)), replace=False)
-                elif len(valid_indices) >= 20:
-                    top_20_indices = sorted(valid_indices, key=lambda i: final_scores_b[i], reverse=True)[:20]
-                    selected_indices = np.random.choice(top_20_indices, size=min(15, len(top_20_indices)), replace=False)
-                else:
-                    selected_indices = valid_indices
+                    valid_indices = np.flatnonzero(final_scores_b != -np.inf)
                 
-                track_b = self._build_recommendations(filtered_ids_b, final_scores_b, selected_indices)
+                with timer.stage('sampling'):
+                    selected_indices = self._sample_top(final_scores_b, valid_indices)
                 
-                for rec in track_b:
-                    self.recommendation_history.append(rec['tmdb_id'])
+                with timer.stage('result_build'):
+                    selected_ids_b = [filtered_ids_b[idx] for idx in selected_indices]
+                    self.recommendation_history.extend(selected_ids_b)
+                    
+                    track_b = self._build_recommendations(
+                        selected_ids_b, final_scores_b[selected_indices], projection
+                    )
             else:
                 track_b = []
             
@@ -638,9 +827,14 @@ class HybridRecommender:
                         'movies': track_b
                     }
                 },
-                'elapsed_time': time.time() - start_time
+                'elapsed_time': time.time() - start_time,
+                'stage_timings': timer.as_dict()
             }
             
+            logger.info(
+                "recommend type=single track_a=%d track_b=%d elapsed=%.3fs",
+                len(track_a), len(track_b), result['elapsed_time']
+            )
             return recommendation_type, result
         
         else:
@@ -648,100 +842,47 @@ class HybridRecommender:
             
             # Track A
             if filtered_ids_a:
-                filtered_sbert_a = sbert_scores[filtered_indices_a]
-                filtered_lightgcn_a = lightgcn_scores[filtered_indices_a]
-                
-                norm_sbert_a = self.scaler.fit_transform(filtered_sbert_a.reshape(-1, 1)).squeeze()
-                norm_lightgcn_a = self.scaler.fit_transform(filtered_lightgcn_a.reshape(-1, 1)).squeeze()
-                
-                final_scores_a = self.sbert_weight * norm_sbert_a + self.lightgcn_weight * norm_lightgcn_a
-                
                 if exclude_seen:
-                    for i, mid in enumerate(filtered_ids_a):
-                        if mid in user_movie_ids:
-                            final_scores_a[i] = -np.inf
+                    with timer.stage('exclusion'):
+                        self._exclude_ids(final_scores_a, filtered_indices_a, user_movie_ids)
                 
-                combination_a = self._find_movie_combinations(
-                    filtered_ids_a, final_scores_a, available_time, top_k=1
-                )
+                with timer.stage('combination_search'):
+                    combination_a = self._find_movie_combinations(
+                        filtered_ids_a, final_scores_a, available_time, top_k=1
+                    )
                 
                 if combination_a:
-                    combo = combination_a[0]
-                    combo_movies = []
-                    for mid in combo['movies']:
-                        meta = self.metadata_map.get(mid, {})
-                        combo_movies.append({
-                            'tmdb_id': mid,
-                            'title': meta.get('title', 'Unknown'),
-                            'runtime': meta.get('runtime', 0),
-                            'genres': meta.get('genres', []),
-                            'overview': meta.get('overview', ''),
-                            'release_date': meta.get('release_date', '')
-                        })
-                    
-                    track_a_combo = {
-                        'combination_score': combo['avg_score'],
-                        'total_runtime': combo['total_runtime'],
-                        'movies': combo_movies
-                    }
+                    combo_a = combination_a[0]
+                    with timer.stage('result_build'):
+                        track_a_combo = self._build_combination(combo_a, projection)
                 else:
+                    combo_a = None
                     track_a_combo = None
             else:
+                combo_a = None
                 track_a_combo = None
             
             # Track B
             if filtered_ids_b:
-                filtered_sbert_b = sbert_scores[filtered_indices_b]
-                filtered_lightgcn_b = lightgcn_scores[filtered_indices_b]
-                
-                norm_sbert_b = self.scaler.fit_transform(filtered_sbert_b.reshape(-1, 1)).squeeze()
-                norm_lightgcn_b = self.scaler.fit_transform(filtered_lightgcn_b.reshape(-1, 1)).squeeze()
-                
-                final_scores_b = 0.4 * norm_sbert_b + 0.6 * norm_lightgcn_b
-                
-                if exclude_seen:
-                    for i, mid in enumerate(filtered_ids_b):
-                        if mid in user_movie_ids:
-                            final_scores_b[i] = -np.inf
-                
-                exclude_ids = []
-                if track_a_combo:
-                    exclude_ids = [m['tmdb_id'] for m in track_a_combo['movies']]
-                
-                for i, mid in enumerate(filtered_ids_b):
-                    if mid in exclude_ids:
-                        final_scores_b[i] = -np.inf
-                
-                for i, mid in enumerate(filtered_ids_b):
-                    if mid in self.recommendation_history[-50:]:
-                        final_scores_b[i] = -np.inf
+                # 시청 기록 + Track A 조합 + 최근 추천 제외 (한 번에)
+                with timer.stage('exclusion'):
+                    excluded_b = set(self.recommendation_history[-50:])
+                    if combo_a:
+                        excluded_b.update(combo_a['movies'])
+                    if exclude_seen:
+                        excluded_b.update(user_movie_ids)
+                    self._exclude_ids(final_scores_b, filtered_indices_b, excluded_b)
 
-                combination_b = self._find_movie_combinations(
-                    filtered_ids_b, final_scores_b, available_time, top_k=1
-                )
+                with timer.stage('combination_search'):
+                    combination_b = self._find_movie_combinations(
+                        filtered_ids_b, final_scores_b, available_time, top_k=1
+                    )
                 
                 if combination_b:
-                    combo = combination_b[0]
-                    combo_movies = []
-                    for mid in combo['movies']:
-                        meta = self.metadata_map.get(mid, {})
-                        combo_movies.append({
-                            'tmdb_id': mid,
-                            'title': meta.get('title', 'Unknown'),
-                            'runtime': meta.get('runtime', 0),
-                            'genres': meta.get('genres', []),
-                            'overview': meta.get('overview', ''),
-                            'release_date': meta.get('release_date', '')
-                        })
-                    
-                    track_b_combo = {
-                        'combination_score': combo['avg_score'],
-                        'total_runtime': combo['total_runtime'],
-                        'movies': combo_movies
-                    }
-                    
-                    for movie in combo_movies:
-                        self.recommendation_history.append(movie['tmdb_id'])
+                    combo_b = combination_b[0]
+                    with timer.stage('result_build'):
+                        self.recommendation_history.extend(combo_b['movies'])
+                        track_b_combo = self._build_combination(combo_b, projection)
                 else:
                     track_b_combo = None
             else:
@@ -758,35 +899,62 @@ class HybridRecommender:
                         'combination': track_b_combo
                     }
                 },
-                'elapsed_time': time.time() - start_time
+                'elapsed_time': time.time() - start_time,
+                'stage_timings': timer.as_dict()
             }
             
+            logger.info(
+                "recommend type=combination track_a=%s track_b=%s elapsed=%.3fs",
+                track_a_combo is not None, track_b_combo is not None, result['elapsed_time']
+            )
             return recommendation_type, result
 
-    def _build_recommendations(self, movie_ids, scores, indices):
-        """추천 결과 생성"""
+    def _movie_fields(self, mid: int) -> dict:
+        """projection='full'일 때만 붙이는 메타데이터 필드"""
+        meta = self.metadata_map.get(mid, {})
+        
+        # genres는 이미 리스트
+        return {
+            'title': meta.get('title', 'Unknown'),
+            'overview': meta.get('overview', ''),
+            'runtime': meta.get('runtime', 0),
+            'genres': meta.get('genres', []),
+            'release_date': meta.get('release_date', '')
+        }
+
+    def _build_recommendations(self, movie_ids: List[int], scores: np.ndarray, projection: str = 'full') -> List[dict]:
+        """
+        추천 결과 생성 (선택된 영화만, 마지막 단계에서 materialize)
+        
+        Args:
+            movie_ids: 선택된 영화 ID
+            scores: movie_ids와 같은 순서의 점수
+            projection: 'ids'이면 메타데이터(줄거리 등)를 복사하지 않음
+        """
         recommendations = []
-        for idx in indices:
-            mid = movie_ids[idx]
-            meta = self.metadata_map.get(mid, {})
-            
-            # genres는 이미 리스트
-            genres = meta.get('genres', [])
-            
-            recommendations.append({
-                'tmdb_id': mid,
-                'hybrid_score': float(scores[idx]),
-                'title': meta.get('title', 'Unknown'),
-                'overview': meta.get('overview', ''),
-                'runtime': meta.get('runtime', 0),
-                'genres': genres,
-                'release_date': meta.get('release_date', '')
-            })
+        for mid, score in zip(movie_ids, scores.tolist()):
+            rec = {'tmdb_id': mid, 'hybrid_score': score}
+            if projection == 'full':
+                rec.update(self._movie_fields(mid))
+            recommendations.append(rec)
         return recommendations
 
+    def _build_combination(self, combo: dict, projection: str = 'full') -> dict:
+        """_find_movie_combinations 결과 한 건을 응답 형태로 변환"""
+        if projection == 'full':
+            movies = [{'tmdb_id': mid, **self._movie_fields(mid)} for mid in combo['movies']]
+        else:
+            movies = [{'tmdb_id': mid} for mid in combo['movies']]
+        
+        return {
+            'combination_score': float(combo['avg_score']),
+            'total_runtime': combo['total_runtime'],
+            'movies': movies
+        }
+
     def close(self):
         """리소스 정리"""
-        self.db.close()
+        self.data_source.close()
 
 
 # ============================================================
@@ -1048,6 +1216,7 @@ def print_results(rec_type: str, result: dict):
 # 실행
 # ============================================================
 if __name__ == "__main__":
+    configure_logging()
 
     db_host = os.getenv("DATABASE_HOST")
     db_port = os.getenv("DATABASE_PORT")
@@ -0,0 +1,268 @@
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional
+
+import psycopg2
+from psycopg2 import extensions
+
+"""
+AI Service용 스레드 안전 PostgreSQL 커넥션 풀
+- 최대 maxconn개 연결을 공유 → 요청 스레드와 백그라운드 갱신 작업이 한 연결에 직렬화되지 않음
+  (풀이 가득 차면 acquire_timeout까지 대기 후 PoolTimeoutError)
+- 대여 시 상태 점검: 닫힌 연결 폐기, health_check_interval 이상 쉰 연결은 SELECT 1로 확인
+- 재활용: max_idle_seconds 이상 쉬었거나 max_lifetime_seconds를 넘긴 연결은 닫고 새로 연결
+- 재연결: 연결 실패 시 지수 백오프(full jitter)로 connect_attempts회까지 재시도
+- TCP keepalive로 방화벽/NAT에 끊긴 연결을 조기 감지
+
+환경 변수 (pool_options_from_env):
+- AI_DB_POOL_MIN / AI_DB_POOL_MAX: 최소(미리 여는) / 최대 연결 수 (기본 1 / 4)
+- AI_DB_POOL_ACQUIRE_TIMEOUT: 대여 대기 상한 (초, 기본 10)
+- AI_DB_POOL_MAX_IDLE: 유휴 연결 재활용 기준 (초, 기본 300)
+- AI_DB_POOL_MAX_LIFETIME: 연결 최대 수명 (초, 기본 1800)
+- AI_DB_POOL_HEALTH_CHECK: 대여 시 ping 기준 유휴 시간 (초, 기본 30)
+- AI_DB_CONNECT_ATTEMPTS: 연결 시도 횟수 (기본 5)
+"""
+
+logger = logging.getLogger(__name__)
+
+# 연결 자체가 끊긴 경우의 오류 (쿼리 오류와 구분)
+CONNECTION_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+KEEPALIVE_OPTIONS = {
+    'keepalives': 1,
+    'keepalives_idle': 30,
+    'keepalives_interval': 10,
+    'keepalives_count': 3
+}
+
+
+class PoolTimeoutError(Exception):
+    """acquire_timeout 안에 연결을 빌리지 못함"""
+
+
+def pool_options_from_env() -> dict:
+    """환경 변수에서 풀 설정 읽기 (지정된 값만)"""
+    env_map = {
+        'AI_DB_POOL_MIN': ('minconn', int),
+        'AI_DB_POOL_MAX': ('maxconn', int),
+        'AI_DB_POOL_ACQUIRE_TIMEOUT': ('acquire_timeout', float),
+        'AI_DB_POOL_MAX_IDLE': ('max_idle_seconds', float),
+        'AI_DB_POOL_MAX_LIFETIME': ('max_lifetime_seconds', float),
+        'AI_DB_POOL_HEALTH_CHECK': ('health_check_interval', float),
+        'AI_DB_CONNECT_ATTEMPTS': ('connect_attempts', int)
+    }
+    options = {}
+    for env_name, (option, cast) in env_map.items():
+        value = os.getenv(env_name)
+        if value:
+            options[option] = cast(value)
+    return options
+
+
+class _PooledConnection:
+    """풀 내부 연결 + 생성/마지막 사용 시각"""
+
+    __slots__ = ('conn', 'created_at', 'last_used')
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class ConnectionPool:
+    """psycopg2 연결 풀 (스레드 안전)"""
+
+    def __init__(
+        self,
+        connection_params: dict,
+        minconn: int = 1,
+        maxconn: int = 4,
+        acquire_timeout: float = 10.0,
+        max_idle_seconds: float = 300.0,
+        max_lifetime_seconds: float = 1800.0,
+        health_check_interval: float = 30.0,
+        connect_attempts: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 10.0
+    ):
+        """
+        Args:
+            connection_params: psycopg2.connect 인자 (host, port, database, user, password)
+            minconn: 처음 대여할 때 미리 여는 연결 수
+            maxconn: 동시에 열 수 있는 최대 연결 수
+            acquire_timeout: 풀이 가득 찼을 때 대기 상한 (초)
+            max_idle_seconds: 이보다 오래 쉰 연결은 재활용
+            max_lifetime_seconds: 이보다 오래된 연결은 재활용
+            health_check_interval: 이보다 오래 쉰 연결은 대여 전에 SELECT 1로 확인
+            connect_attempts: 연결 실패 시 최대 시도 횟수
+            backoff_base / backoff_max: 재연결 대기 (full jitter 지수 백오프, 초)
+        """
+        self.connection_params = {**KEEPALIVE_OPTIONS, **connection_params}
+        self.minconn = max(0, min(minconn, maxconn))
+        self.maxconn = max(1, maxconn)
+        self.acquire_timeout = acquire_timeout
+        self.max_idle_seconds = max_idle_seconds
+        self.max_lifetime_seconds = max_lifetime_seconds
+        self.health_check_interval = health_check_interval
+        self.connect_attempts = max(1, connect_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._idle = deque()
+        self._slots = threading.BoundedSemaphore(self.maxconn)
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._prefilled = False
+        self._closed = False
+
+    # ------------------------------------------------------------
+    # 연결 생성 / 폐기
+    # ------------------------------------------------------------
+    def _connect(self) -> _PooledConnection:
+        """새 연결 (실패 시 지수 백오프 재시도)"""
+        for attempt in range(self.connect_attempts):
+            try:
+                conn = psycopg2.connect(**self.connection_params)
+                with self._lock:
+                    self._opened += 1
+                return _PooledConnection(conn)
+            except CONNECTION_ERRORS as e:
+                if attempt + 1 >= self.connect_attempts:
+                    raise
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+                logger.warning("DB 연결 실패 (%d/%d): %s → %.2fs 후 재시도",
+                               attempt + 1, self.connect_attempts, e, delay)
+                time.sleep(delay)
+
+    def _discard(self, pooled: _PooledConnection):
+        with self._lock:
+            self._opened -= 1
+        try:
+            if not pooled.conn.closed:
+                pooled.conn.close()
+        except Exception:
+            pass
+
+    def _prefill(self):
+        """첫 대여 시 minconn개 미리 연결 (실패해도 대여 경로에서 다시 시도)"""
+        with self._lock:
+            if self._prefilled:
+                return
+            self._prefilled = True
+        for _ in range(self.minconn):
+            try:
+                pooled = self._connect()
+            except CONNECTION_ERRORS:
+                return
+            with self._lock:
+                self._idle.append(pooled)
+
+    # ------------------------------------------------------------
+    # 상태 점검
+    # ------------------------------------------------------------
+    def _is_usable(self, pooled: _PooledConnection) -> bool:
+        """대여 전 점검 (False면 폐기 후 새로 연결)"""
+        conn = pooled.conn
+        if conn.closed:
+            return False
+
+        now = time.monotonic()
+        if now - pooled.created_at >= self.max_lifetime_seconds:
+            logger.debug("DB 연결 수명 초과 → 재활용")
+            return False
+        idle_for = now - pooled.last_used
+        if idle_for >= self.max_idle_seconds:
+            logger.debug("DB 연결 유휴 %.0fs → 재활용", idle_for)
+            return False
+
+        if idle_for >= self.health_check_interval:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                conn.rollback()
+            except CONNECTION_ERRORS:
+                logger.info("DB 연결 health check 실패 → 재연결")
+                return False
+        return True
+
+    # ------------------------------------------------------------
+    # 대여 / 반납
+    # ------------------------------------------------------------
+    def getconn(self, timeout: Optional[float] = None) -> _PooledConnection:
+        """연결 대여 (반드시 putconn으로 반납, 보통은 connection() 사용)"""
+        if self._closed:
+            raise RuntimeError("ConnectionPool is closed")
+
+        timeout = self.acquire_timeout if timeout is None else timeout
+        if not self._slots.acquire(timeout=timeout):
+            raise PoolTimeoutError(f"DB 연결 대기 시간 초과 ({timeout}s, maxconn={self.maxconn})")
+
+        try:
+            self._prefill()
+            while True:
+                with self._lock:
+                    pooled = self._idle.pop() if self._idle else None
+                if pooled is None:
+                    return self._connect()
+                if self._is_usable(pooled):
+                    return pooled
+                self._discard(pooled)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def putconn(self, pooled: _PooledConnection, broken: bool = False):
+        """연결 반납 (broken이거나 트랜잭션 정리가 실패하면 폐기)"""
+        try:
+            if broken or self._closed or pooled.conn.closed:
+                self._discard(pooled)
+                return
+
+            # 열린 트랜잭션이 남아 있으면 정리 (다음 사용자에게 상태가 새지 않도록)
+            if pooled.conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    pooled.conn.rollback()
+                except CONNECTION_ERRORS:
+                    self._discard(pooled)
+                    return
+
+            pooled.last_used = time.monotonic()
+            with self._lock:
+                self._idle.append(pooled)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """
+        연결 대여 컨텍스트 (psycopg2 connection 반환)
+        - 연결 오류로 끝나면 해당 연결은 폐기
+        """
+        pooled = self.getconn(timeout)
+        broken = False
+        try:
+            yield pooled.conn
+        except CONNECTION_ERRORS:
+            broken = True
+            raise
+        finally:
+            self.putconn(pooled, broken=broken)
+
+    def stats(self) -> dict:
+        """풀 상태 (디버그/헬스체크용)"""
+        with self._lock:
+            return {'open': self._opened, 'idle': len(self._idle), 'max': self.maxconn}
+
+    def close(self):
+        """유휴 연결 모두 종료 (대여 중인 연결은 반납 시 종료)"""
+        self._closed = True
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for pooled in idle:
+            self._discard(pooled)
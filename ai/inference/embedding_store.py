@@ -0,0 +1,187 @@
+import numpy as np
+from typing import Optional
+
+"""
+정규화 임베딩 저장소 (정밀도 선택형)
+- float32: 원본 그대로
+- float16: 메모리 1/2
+- int8: 행(row)별 scale로 양자화, 메모리 약 1/4
+- 점수 계산은 항상 float32로 누적 (블록 단위로 역양자화 후 matmul)
+- limit: 앞쪽 행만 점수 계산 (조회용 행을 뒤에 두고 버퍼 하나를 공유)
+"""
+
+
+class EmbeddingStore:
+    """임베딩 행렬 한 벌만 보관하고 내적 점수를 계산하는 저장소"""
+
+    PRECISIONS = ('float32', 'float16', 'int8')
+
+    def __init__(
+        self,
+        matrix: np.ndarray,
+        precision: str = 'float32',
+        normalize: bool = True,
+        block_rows: int = 65536
+    ):
+        """
+        Args:
+            matrix: (N, D) 임베딩 행렬
+            precision: 'float32' / 'float16' / 'int8'
+            normalize: 행 단위 L2 정규화 여부 (코사인 유사도용)
+            block_rows: 역양자화 블록 크기 (임시 float32 메모리 상한)
+        """
+        if precision not in self.PRECISIONS:
+            raise ValueError(f"지원하지 않는 정밀도: {precision}")
+
+        self.precision = precision
+        self.block_rows = block_rows
+        self.scales = None
+
+        vectors = np.asarray(matrix, dtype='float32')
+        if normalize:
+            vectors = vectors / (np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-10)
+
+        if precision == 'float32':
+            self.data = np.ascontiguousarray(vectors)
+        elif precision == 'float16':
+            self.data = vectors.astype(np.float16)
+        else:
+            # 행별 최대 절댓값을 127로 매핑
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            self.scales = scales.astype('float32')
+            self.data = np.round(vectors / self.scales[:, None]).astype(np.int8)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def dim(self) -> int:
+        return self.data.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        scales_nbytes = self.scales.nbytes if self.scales is not None else 0
+        return self.data.nbytes + scales_nbytes
+
+    def vectors(self, rows) -> np.ndarray:
+        """지정한 행을 float32로 반환 (gather)"""
+        block = self.data[rows].astype('float32', copy=False)
+        if self.scales is not None:
+            block *= self.scales[rows][..., None]
+        return block
+
+    def dot(
+        self,
+        query: np.ndarray,
+        rows: Optional[np.ndarray] = None,
+        limit: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        내적 점수 계산 (float32 누적)
+
+        Args:
+            query: (D,) 쿼리 벡터
+            rows: 계산할 행 번호 (None이면 [0, limit) 전체)
+            limit: rows가 None일 때 계산할 앞쪽 행 수 (None이면 N)
+
+        Returns:
+            (len(rows) 또는 limit,) float32 점수
+        """
+        query = np.asarray(query, dtype='float32')
+
+        if rows is not None:
+            return self.vectors(rows) @ query
+
+        n_rows = len(self.data) if limit is None else min(limit, len(self.data))
+        if self.precision == 'float32':
+            return self.data[:n_rows] @ query
+
+        scores = np.empty(n_rows, dtype='float32')
+        for start in range(0, n_rows, self.block_rows):
+            stop = min(start + self.block_rows, n_rows)
+            scores[start:stop] = self.data[start:stop].astype('float32') @ query
+        if self.scales is not None:
+            scores *= self.scales[:n_rows]
+        return scores
+
+
+def sample_profile_queries(
+    reference: np.ndarray,
+    n_queries: int,
+    rows_per_query: int = 5,
+    seed: int = 0
+) -> np.ndarray:
+    """
+    순위 변화 측정용 쿼리 생성 (사용자 프로필과 같은 방식)
+    - 무작위 카탈로그 rows_per_query개의 평균을 정규화
+    - 카탈로그 행을 그대로 쿼리로 쓰면 정확한 top-1이 자기 자신이라 top1_agreement가 항상 1
+      → 쿼리를 만든 행은 추천에서 시청 기록이 빠지는 것처럼 측정에서도 제외 (exclude_rows)
+
+    Returns:
+        (queries, rows) - (n_queries, D) float32 정규화 쿼리, (n_queries, rows_per_query) 사용한 행
+    """
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, len(reference), size=(n_queries, min(rows_per_query, len(reference))))
+    queries = reference[rows].mean(axis=1).astype('float32')
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True) + 1e-10
+    return queries, rows
+
+
+def measure_ranking_drift(
+    reference: np.ndarray,
+    store: EmbeddingStore,
+    queries: np.ndarray,
+    k: int = 50,
+    exclude_rows: Optional[np.ndarray] = None
+) -> dict:
+    """
+    float32 기준 대비 순위 변화 측정
+
+    Args:
+        reference: (N, D) float32 정규화 행렬 (기준, store의 앞쪽 N행과 대응)
+        store: 비교할 저장소
+        queries: (Q, D) 쿼리 벡터 (sample_profile_queries 권장)
+        k: 비교할 상위 개수
+        exclude_rows: (Q, R) 쿼리별로 순위에서 제외할 행 (쿼리를 만든 행)
+
+    Returns:
+        {'precision', 'k', 'recall_at_k', 'top1_agreement',
+         'mean_abs_error', 'max_abs_error', 'nbytes', 'reference_nbytes'}
+    """
+    k = min(k, len(reference))
+    recalls = []
+    top1_matches = []
+    error_sum = 0.0
+    error_max = 0.0
+
+    for i, query in enumerate(queries):
+        exact = reference @ query
+        approx = store.dot(query, limit=len(reference))
+
+        abs_error = np.abs(exact - approx)
+        error_sum += float(abs_error.sum())
+        error_max = max(error_max, float(abs_error.max()))
+
+        if exclude_rows is not None:
+            exact[exclude_rows[i]] = -np.inf
+            approx[exclude_rows[i]] = -np.inf
+
+        exact_top = np.argpartition(-exact, k - 1)[:k]
+        approx_top = np.argpartition(-approx, k - 1)[:k]
+
+        recalls.append(len(np.intersect1d(exact_top, approx_top)) / k)
+        top1_matches.append(np.argmax(exact) == np.argmax(approx))
+
+    n_scores = len(recalls) * len(reference)
+
+    return {
+        'precision': store.precision,
+        'k': k,
+        'recall_at_k': float(np.mean(recalls)) if recalls else 1.0,
+        'top1_agreement': float(np.mean(top1_matches)) if top1_matches else 1.0,
+        'mean_abs_error': error_sum / n_scores if n_scores else 0.0,
+        'max_abs_error': error_max,
+        'nbytes': store.nbytes,
+        'reference_nbytes': reference.nbytes
+    }
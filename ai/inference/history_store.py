@@ -0,0 +1,252 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+try:
+    from inference.data_sources import DatabaseConnection
+except ImportError:  # 스크립트로 직접 실행하는 경우
+    from data_sources import DatabaseConnection
+
+"""
+사용자 시청 기록 저장소 (AI Service 측)
+- backend가 user_id만 보내면 여기서 시청 기록을 찾아 추천 입력으로 사용
+  (backend 요청 경로에서 DB 세션 1개 + 쿼리 2개 제거)
+- 조회 규칙은 backend와 동일: movie_logs 최근 limit개 (watched_at 내림차순), 없으면 온보딩 응답
+- 캐시: 사용자별 LRU (max_users), ttl_seconds가 지나면 DB에서 다시 로드
+- 증분 갱신: 백그라운드 스레드가 refresh_interval마다 movie_logs의 새 행(watched_at > 워터마크)만
+  읽어 캐시된 사용자 기록에 병합 (캐시에 없는 사용자는 다음 조회 때 로드)
+    - 늦게 커밋된 트랜잭션을 놓치지 않도록 워터마크보다 overlap_seconds 앞부터 다시 읽음
+    - 병합은 (movie_id → 최신 watched_at) 기준이라 같은 행을 다시 읽어도 결과가 같음
+    - 인덱스: database/migrations/20261019_watch_history_indexes.sql
+"""
+
+logger = logging.getLogger(__name__)
+
+# movie_logs 최근 limit개, 없으면 온보딩 응답 (onboarding 행은 watched_at NULL)
+# 같은 쿼리 사본: backend/domains/recommendation/history.py WATCH_HISTORY_SQL
+#   (AI Service와 backend는 배포 단위가 달라 한 곳에서 import할 수 없음 → 변경 시 두 곳과
+#    커버링 인덱스 database/migrations/20261019_watch_history_indexes.sql을 함께 수정)
+HISTORY_QUERY = """
+    WITH logs AS (
+        SELECT movie_id, watched_at
+        FROM movie_logs
+        WHERE user_id = %(uid)s
+        ORDER BY watched_at DESC
+        LIMIT %(limit)s
+    )
+    SELECT movie_id, watched_at FROM logs
+    UNION ALL
+    SELECT movie_id, NULL FROM user_onboarding_answers
+    WHERE user_id = %(uid)s AND NOT EXISTS (SELECT 1 FROM logs)
+    ORDER BY watched_at DESC NULLS LAST
+"""
+
+CHANGES_QUERY = """
+    SELECT user_id, movie_id, watched_at
+    FROM movie_logs
+    WHERE watched_at > %s
+    ORDER BY watched_at
+"""
+
+
+class _UserHistory:
+    """사용자 한 명의 기록 (movie_logs 기반이면 movie_id → watched_at)"""
+
+    __slots__ = ('watched', 'onboarding', 'loaded_at')
+
+    def __init__(self, watched: Dict[int, object], onboarding: List[int], loaded_at: Optional[float] = None):
+        self.watched = watched
+        self.onboarding = onboarding
+        self.loaded_at = time.monotonic() if loaded_at is None else loaded_at
+
+    def movie_ids(self, limit: int) -> List[int]:
+        if self.watched:
+            ordered = sorted(self.watched, key=self.watched.get, reverse=True)
+            return ordered[:limit]
+        return list(self.onboarding)
+
+    def merge(self, movie_id: int, watched_at, limit: int):
+        current = self.watched.get(movie_id)
+        if current is None or watched_at > current:
+            self.watched[movie_id] = watched_at
+        # 오래된 항목 정리 (limit의 2배까지만 유지)
+        if len(self.watched) > 2 * limit:
+            keep = sorted(self.watched, key=self.watched.get, reverse=True)[:limit]
+            self.watched = {mid: self.watched[mid] for mid in keep}
+
+
+class _PendingLoad:
+    """진행 중인 DB 로드 (로드 중 refresh가 읽은 행 / invalidate 여부 기록)"""
+
+    __slots__ = ('rows', 'cancelled', 'started_at')
+
+    def __init__(self):
+        self.rows = []
+        self.cancelled = False
+        self.started_at = time.monotonic()
+
+
+class UserHistoryStore:
+    """user_id → 최근 시청 영화 ID (캐시 + 증분 갱신)"""
+
+    def __init__(
+        self,
+        db: DatabaseConnection,
+        limit: int = 50,
+        max_users: int = 100000,
+        ttl_seconds: float = 600.0,
+        refresh_interval: float = 5.0,
+        overlap_seconds: float = 5.0
+    ):
+        """
+        Args:
+            db: 풀 기반 DB 연결 (요청 스레드와 갱신 스레드가 함께 사용)
+            limit: 사용자별 최대 기록 수 (backend 기존 조회와 동일하게 50)
+            max_users: 캐시할 최대 사용자 수 (LRU)
+            ttl_seconds: 캐시 항목 전체 재로드 주기 (삭제/온보딩 변경 반영)
+            refresh_interval: 증분 갱신 주기 (초)
+            overlap_seconds: 증분 갱신 시 워터마크보다 앞서 다시 읽을 구간 (초)
+        """
+        self.db = db
+        self.limit = limit
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self.refresh_interval = refresh_interval
+        self.overlap_seconds = overlap_seconds
+
+        self._cache: "OrderedDict[str, _UserHistory]" = OrderedDict()
+        self._loading: Dict[str, List[_PendingLoad]] = {}
+        self._lock = threading.Lock()
+        self._watermark = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------
+    def get(self, user_id: str) -> List[int]:
+        """사용자 시청 기록 (최신순, 없으면 온보딩 응답, 둘 다 없으면 빈 리스트)"""
+        user_id = str(user_id)
+        with self._lock:
+            history = self._cache.get(user_id)
+            if history is not None and time.monotonic() - history.loaded_at < self.ttl_seconds:
+                self._cache.move_to_end(user_id)
+                return history.movie_ids(self.limit)
+
+        # 로드는 lock 밖에서 실행 → 그동안의 refresh 행은 pending에 모았다가 설치 전에 병합,
+        # 그동안 invalidate되면 캐시에 설치하지 않음
+        pending = _PendingLoad()
+        with self._lock:
+            self._loading.setdefault(user_id, []).append(pending)
+        try:
+            history = self._load(user_id, pending.started_at)
+        except BaseException:
+            with self._lock:
+                self._end_load(user_id, pending)
+            raise
+
+        with self._lock:
+            self._end_load(user_id, pending)
+            for movie_id, watched_at in pending.rows:
+                history.merge(movie_id, watched_at, self.limit)
+            if pending.cancelled:
+                return history.movie_ids(self.limit)
+
+            # 그 사이 더 나중에 시작한 로드가 설치했으면 그 항목 유지
+            current = self._cache.get(user_id)
+            if current is None or current.loaded_at <= history.loaded_at:
+                self._cache[user_id] = history
+                current = history
+            self._cache.move_to_end(user_id)
+            while len(self._cache) > self.max_users:
+                self._cache.popitem(last=False)
+            return current.movie_ids(self.limit)
+
+    def _end_load(self, user_id: str, pending: _PendingLoad):
+        # lock 안에서 호출
+        loads = self._loading[user_id]
+        loads.remove(pending)
+        if not loads:
+            del self._loading[user_id]
+
+    def _load(self, user_id: str, started_at: float) -> _UserHistory:
+        rows = self.db.execute_query(HISTORY_QUERY, {'uid': user_id, 'limit': self.limit})
+        if rows and rows[0]['watched_at'] is not None:
+            watched = {row['movie_id']: row['watched_at'] for row in rows if row['watched_at'] is not None}
+            return _UserHistory(watched, [], started_at)
+        return _UserHistory({}, [row['movie_id'] for row in rows], started_at)
+
+    def invalidate(self, user_id: str):
+        """사용자 캐시 제거 (다음 조회 때 DB에서 다시 로드, 진행 중인 로드 결과도 설치하지 않음)"""
+        user_id = str(user_id)
+        with self._lock:
+            self._cache.pop(user_id, None)
+            for pending in self._loading.get(user_id, ()):
+                pending.cancelled = True
+
+    # ------------------------------------------------------------
+    # 증분 갱신
+    # ------------------------------------------------------------
+    def refresh(self) -> int:
+        """
+        워터마크 이후 movie_logs 변경을 캐시에 병합
+
+        Returns:
+            읽은 행 수
+        """
+        if self._watermark is None:
+            # watched_at은 TIMESTAMP (time zone 없음) → 같은 타입으로 비교
+            self._watermark = self.db.execute_query("SELECT LOCALTIMESTAMP AS now")[0]['now']
+            return 0
+
+        since = self._watermark - timedelta(seconds=self.overlap_seconds)
+        count = 0
+        for rows in self.db.stream_query(CHANGES_QUERY, (since,), itersize=5000):
+            with self._lock:
+                for user_id, movie_id, watched_at in rows:
+                    user_id = str(user_id)
+                    history = self._cache.get(user_id)
+                    if history is not None:
+                        history.merge(movie_id, watched_at, self.limit)
+                    for pending in self._loading.get(user_id, ()):
+                        pending.rows.append((movie_id, watched_at))
+                    if watched_at > self._watermark:
+                        self._watermark = watched_at
+            count += len(rows)
+        return count
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                changed = self.refresh()
+                if changed:
+                    logger.debug("History refresh: %d rows", changed)
+            except Exception as e:
+                logger.warning("History refresh failed: %s", e)
+
+    def start(self):
+        """증분 갱신 스레드 시작 (앱 startup에서 한 번)"""
+        if self._thread is not None:
+            return
+        try:
+            self.refresh()  # 워터마크 초기화
+        except Exception as e:
+            logger.warning("History watermark init failed: %s", e)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="history-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """갱신 스레드 종료 + DB 풀 정리"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.refresh_interval + 1)
+            self._thread = None
+        self.db.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'cached_users': len(self._cache), 'watermark': str(self._watermark)}
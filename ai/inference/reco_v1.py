@@ -7,6 +7,11 @@ from sklearn.preprocessing import MinMaxScaler
 from typing import List, Optional, Tuple
 from itertools import combinations
 
+try:
+    from inference.data_sources import CatalogDataSource
+except ImportError:  # 스크립트로 직접 실행하는 경우
+    from data_sources import CatalogDataSource
+
 """
 
 장르, ott, 시간, 성인요소 필터링
@@ -18,14 +23,15 @@ from itertools import combinations
 class HybridRecommender:
     def __init__(
         self,
-        sbert_embeddings_path: str,
-        lightgcn_model_path: str,
-        lightgcn_data_path: str,
-        metadata_path: str,
-        ott_path: str,
+        sbert_embeddings_path: Optional[str] = None,
+        lightgcn_model_path: Optional[str] = None,
+        lightgcn_data_path: Optional[str] = None,
+        metadata_path: Optional[str] = None,
+        ott_path: Optional[str] = None,
         sbert_weight: float = 0.7,
         lightgcn_weight: float = 0.3,
-        device: str = None
+        device: str = None,
+        data_source: Optional[CatalogDataSource] = None
     ):
         """
         Args:
@@ -37,27 +43,63 @@ class HybridRecommender:
             sbert_weight: SBERT 가중치 (default: 0.7)
             lightgcn_weight: LightGCN 가중치 (default: 0.3)
             device: 연산 디바이스
+            data_source: 카탈로그 데이터 소스 (지정하면 CSV/pkl 경로 대신 사용)
         """
         self.device = device or ('cuda' if torch.cuda.is_available() else 'cpu')
         self.sbert_weight = sbert_weight
         self.lightgcn_weight = lightgcn_weight
         
-        # SBERT 데이터 로드
-        self._load_sbert_data(sbert_embeddings_path)
-        
-        # LightGCN 데이터 및 모델 로드
-        self._load_lightgcn_data(lightgcn_data_path)
-        self._load_lightgcn_model(lightgcn_model_path)
-        
-        # 메타데이터 로드
-        self._load_metadata(metadata_path)
-        
-        # OTT 데이터 로드
-        self._load_ott_data(ott_path)
+        if data_source is not None:
+            self._load_from_source(data_source)
+        else:
+            # SBERT 데이터 로드
+            self._load_sbert_data(sbert_embeddings_path)
+            
+            # LightGCN 데이터 및 모델 로드
+            self._load_lightgcn_data(lightgcn_data_path)
+            self._load_lightgcn_model(lightgcn_model_path)
+            
+            # 메타데이터 로드
+            self._load_metadata(metadata_path)
+            
+            # OTT 데이터 로드
+            self._load_ott_data(ott_path)
         
         # 스케일러 초기화
         self.scaler = MinMaxScaler()
     
+    def _load_from_source(self, source: CatalogDataSource):
+        """데이터 소스에서 로드 (메타데이터는 이 모듈 형식으로 변환: 장르 '|' 문자열, title_ko)"""
+        print(f"Loading catalog from {type(source).__name__}")
+        
+        self.sbert_movie_ids, sbert_embeddings = source.load_sbert()
+        self.sbert_embeddings = np.asarray(sbert_embeddings, dtype='float32')
+        self.sbert_movie_to_idx = {mid: idx for idx, mid in enumerate(self.sbert_movie_ids)}
+        
+        self.lightgcn_movie_to_idx, lightgcn_item_embeddings = source.load_lightgcn()
+        self.lightgcn_item_embeddings = np.asarray(lightgcn_item_embeddings, dtype='float32')
+        self.lightgcn_idx_to_movie = {idx: mid for mid, idx in self.lightgcn_movie_to_idx.items()}
+        self.n_items = len(self.lightgcn_item_embeddings)
+        
+        self.metadata_map = {}
+        all_genres = set()
+        for movie_id, meta in source.load_metadata().items():
+            genres = meta.get('genres') or []
+            all_genres.update(genres)
+            self.metadata_map[movie_id] = {
+                **meta,
+                'title_ko': meta.get('title', 'Unknown Title'),
+                'genres': '|'.join(genres)
+            }
+        self.all_genres = sorted(all_genres)
+        
+        _, _, self.ott_map = source.load_ott()
+        self.all_ott_providers = sorted({p for providers in self.ott_map.values() for p in providers})
+        
+        source.close()
+        print(f"Loaded {len(self.sbert_movie_ids)} SBERT / {len(self.lightgcn_movie_to_idx)} LightGCN / "
+              f"{len(self.metadata_map)} metadata / {len(self.ott_map)} OTT")
+
     def _load_ott_data(self, path: str):
         """OTT 데이터 로드 및 매핑 생성"""
         print(f"Loading OTT data from {path}")
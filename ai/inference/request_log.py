@@ -0,0 +1,70 @@
+import logging
+import os
+import random
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+"""
+요청 단위 로깅 (레벨 + correlation id + debug 샘플링)
+- request_id: X-Request-ID 헤더 값 (없으면 생성), 모든 로그 레코드에 %(request_id)s로 포함
+- debug 샘플링: 요청마다 한 번 결정 → 샘플링되지 않은 요청의 DEBUG 로그는 버림
+- 비싼 진단(장르 검증 등)은 debug_enabled()로 감싸서 비활성 시 아예 실행하지 않음
+
+환경 변수:
+- LOG_LEVEL: 기본 INFO
+- LOG_DEBUG_SAMPLE_RATE: DEBUG 로그를 남길 요청 비율 (0.0 ~ 1.0, 기본 1.0)
+"""
+
+request_id_var: ContextVar[str] = ContextVar('request_id', default='-')
+debug_sampled_var: ContextVar[bool] = ContextVar('debug_sampled', default=True)
+
+LOG_FORMAT = '%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s'
+
+_debug_sample_rate = 1.0
+
+
+class RequestContextFilter(logging.Filter):
+    """레코드에 request_id 추가 + 샘플링되지 않은 요청의 DEBUG 레코드 제거"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        if record.levelno <= logging.DEBUG and not debug_sampled_var.get():
+            return False
+        return True
+
+
+def configure_logging(level: Optional[str] = None, debug_sample_rate: Optional[float] = None):
+    """루트 로거 설정 (프로세스 시작 시 한 번)"""
+    global _debug_sample_rate
+
+    level = (level or os.getenv('LOG_LEVEL', 'INFO')).upper()
+    if debug_sample_rate is None:
+        debug_sample_rate = float(os.getenv('LOG_DEBUG_SAMPLE_RATE', 1.0))
+    _debug_sample_rate = min(max(debug_sample_rate, 0.0), 1.0)
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level)
+
+
+def start_request(request_id: Optional[str] = None) -> str:
+    """
+    요청 컨텍스트 시작 (correlation id 설정 + debug 샘플링 결정)
+
+    Returns:
+        사용된 request_id
+    """
+    request_id = request_id or uuid.uuid4().hex[:16]
+    request_id_var.set(request_id)
+    debug_sampled_var.set(_debug_sample_rate >= 1.0 or random.random() < _debug_sample_rate)
+    return request_id
+
+
+def debug_enabled(logger: logging.Logger) -> bool:
+    """이 요청에서 DEBUG 로그가 실제로 남는지 (비싼 진단 실행 여부 판단용)"""
+    return logger.isEnabledFor(logging.DEBUG) and debug_sampled_var.get()
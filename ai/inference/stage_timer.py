@@ -0,0 +1,30 @@
+import time
+from contextlib import contextmanager
+
+"""
+추천 요청 단위 구간별 시간 측정
+- 요청마다 StageTimer 하나 생성 (스레드 간 공유하지 않음)
+- 같은 이름의 구간이 여러 번 실행되면 합산 (예: Track A/B 필터)
+- 결과는 {stage: seconds} dict → API에서 Prometheus 히스토그램 / debug 응답으로 사용
+"""
+
+
+class StageTimer:
+    """구간 이름별 누적 시간 (초)"""
+
+    def __init__(self):
+        self.timings = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def as_dict(self) -> dict:
+        return dict(self.timings)
@@ -0,0 +1,55 @@
+# AI Service Prometheus 지표
+"""
+추천 요청 구간별 지연 시간 히스토그램
+
+- moviesir_recommend_seconds{rec_type}: recommend() 전체
+- moviesir_recommend_stage_seconds{stage, rec_type}: 구간별 (profile, filter, candidate_search,
+  sbert_matmul, lightgcn_matmul, normalize, genre_boost, exclusion, sampling,
+  combination_search, result_build)
+- prometheus_client가 설치되지 않은 환경에서는 기록/노출 모두 생략 (AVAILABLE=False)
+"""
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, Histogram, generate_latest
+except ImportError:  # prometheus_client 미설치 환경
+    Histogram = None
+
+AVAILABLE = Histogram is not None
+
+# 구간별 시간은 ms 단위부터, 전체는 조합 탐색(수 초)까지 포함
+STAGE_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+TOTAL_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+if AVAILABLE:
+    RECOMMEND_SECONDS = Histogram(
+        "moviesir_recommend_seconds",
+        "HybridRecommender.recommend() 전체 소요 시간",
+        ["rec_type"],
+        buckets=TOTAL_BUCKETS
+    )
+    STAGE_SECONDS = Histogram(
+        "moviesir_recommend_stage_seconds",
+        "HybridRecommender.recommend() 구간별 소요 시간",
+        ["stage", "rec_type"],
+        buckets=STAGE_BUCKETS
+    )
+    CONTENT_TYPE = CONTENT_TYPE_LATEST
+else:
+    CONTENT_TYPE = "text/plain; charset=utf-8"
+
+
+def observe_recommendation(recommendation_type: str, result: dict):
+    """recommend() 결과의 elapsed_time / stage_timings를 히스토그램에 기록"""
+    if not AVAILABLE:
+        return
+
+    RECOMMEND_SECONDS.labels(rec_type=recommendation_type).observe(result.get("elapsed_time", 0.0))
+    for stage, seconds in result.get("stage_timings", {}).items():
+        STAGE_SECONDS.labels(stage=stage, rec_type=recommendation_type).observe(seconds)
+
+
+def render() -> bytes:
+    """Prometheus text exposition"""
+    if not AVAILABLE:
+        return b"# prometheus_client is not installed\n"
+    return generate_latest()
@@ -0,0 +1,70 @@
+# AI Service ↔ Backend 내부 통신용 바이너리 응답 포맷
+"""
+고정 레이아웃 바이너리 추천 응답 (content negotiation)
+
+- Accept 헤더에 MEDIA_TYPE이 있으면 이 포맷으로 응답, 없으면 기존 JSON
+- 레이아웃 (little-endian)
+    header : magic(4s) 'MSRC' | version(uint16) | rec_type(uint16) | count(uint32) | elapsed(float32)
+    record : tmdb_id(int32) | score(float32) | track(uint8)   × count
+- rec_type: 0 = single, 1 = combination
+- track: 0 = track_a, 1 = track_b
+- 조합 추천은 조합에 속한 영화마다 combination_score를 score로 기록
+- 디코더는 backend/domains/recommendation/wire_format.py (배포 단위가 달라 별도 보관)
+  → 레이아웃을 바꾸면 VERSION을 올리고 양쪽을 함께 수정
+"""
+
+import struct
+
+MEDIA_TYPE = "application/x-moviesir-reco"
+MAGIC = b"MSRC"
+VERSION = 1
+
+HEADER = struct.Struct("<4sHHIf")
+RECORD = struct.Struct("<ifB")
+
+REC_TYPES = ('single', 'combination')
+TRACKS = ('track_a', 'track_b')
+
+
+def accepts_binary(accept: str) -> bool:
+    """Accept 헤더에 바이너리 포맷이 포함되어 있는지 확인"""
+    return bool(accept) and MEDIA_TYPE in accept
+
+
+def encode_recommendations(recommendation_type: str, result: dict) -> bytes:
+    """
+    HybridRecommender.recommend() 결과를 바이너리로 인코딩
+
+    Args:
+        recommendation_type: 'single' 또는 'combination'
+        result: recommend()가 반환한 결과 dict
+
+    Returns:
+        header + records 바이트열
+    """
+    recommendations = result.get('recommendations', {})
+    records = []
+
+    for track_code, track_name in enumerate(TRACKS):
+        track = recommendations.get(track_name) or {}
+
+        if recommendation_type == 'single':
+            for movie in track.get('movies', []):
+                records.append((movie['tmdb_id'], movie.get('hybrid_score', 0.0), track_code))
+        else:
+            combination = track.get('combination')
+            if combination:
+                score = combination.get('combination_score', 0.0)
+                for movie in combination['movies']:
+                    records.append((movie['tmdb_id'], score, track_code))
+
+    buffer = bytearray(HEADER.size + RECORD.size * len(records))
+    HEADER.pack_into(
+        buffer, 0,
+        MAGIC, VERSION, REC_TYPES.index(recommendation_type),
+        len(records), result.get('elapsed_time', 0.0)
+    )
+    for i, record in enumerate(records):
+        RECORD.pack_into(buffer, HEADER.size + i * RECORD.size, *record)
+
+    return bytes(buffer)
@@ -1,9 +1,10 @@
 # backend/core/db.py
 
 import os
+from typing import Callable, Hashable, Set
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, object_session, sessionmaker
 
 from sqlalchemy.orm import DeclarativeBase
 
@@ -59,3 +60,45 @@ def get_db():
 def init_db():  # 테스트 환경에서 최초 한 번만 실행.
 
     Base.metadata.create_all(bind=engine)
+
+
+# ======================================================
+# 커밋 후 캐시 무효화
+# ======================================================
+# mapper 이벤트(after_update 등)는 flush 시점에 실행 → 그때 캐시를 지우면 커밋 전에
+# 다른 요청이 이전 값을 다시 캐시할 수 있으므로, 바뀐 키만 모아 두었다가 커밋 후 무효화
+_PENDING_INVALIDATIONS = "pending_cache_invalidations"
+
+
+def invalidate_after_commit(target, invalidate: Callable[[Set[Hashable]], None], key: Hashable):
+    """
+    mapper 이벤트에서 호출: target이 속한 세션이 커밋되면 invalidate({key, ...}) 실행 (롤백되면 버림)
+
+    Args:
+        target: flush 중인 ORM 객체
+        invalidate: 무효화 함수 (같은 함수의 키는 모아서 한 번에 호출)
+        key: 무효화할 캐시 키
+    """
+    session = object_session(target)
+    if session is None:
+        invalidate({key})
+        return
+    pending = session.info.setdefault(_PENDING_INVALIDATIONS, {})
+    pending.setdefault(invalidate, set()).add(key)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_pending_invalidations(session):
+    # SAVEPOINT 커밋(begin_nested)은 아직 다른 트랜잭션에 보이지 않음 → 최상위 커밋까지 보류
+    if session.in_nested_transaction():
+        return
+    for invalidate, keys in session.info.pop(_PENDING_INVALIDATIONS, {}).items():
+        invalidate(keys)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_pending_invalidations(session, transaction):
+    # 커밋 없이 끝난 최상위 트랜잭션(롤백/close)의 키는 버림 (커밋이면 after_commit에서 이미 처리)
+    # SAVEPOINT 롤백은 남겨 둠 → 무효화가 남는 쪽으로
+    if transaction.parent is None:
+        session.info.pop(_PENDING_INVALIDATIONS, None)
@@ -0,0 +1,164 @@
+# backend/domains/auth/principal.py
+"""
+인증된 사용자 정보(principal) 캐시
+
+- get_current_user는 인증 요청마다 users 테이블을 조회 → 라우트에 필요한 필드만 짧은 TTL로 캐시
+- 키: (user_id, 토큰 iat) → 같은 토큰의 반복 요청은 DB 조회 없음, 새로 로그인/재발급한 토큰은 새 항목
+- 값: user_id, deleted_at, onboarding_completed_at (ORM 객체가 아니므로 수정용으로 쓰지 않음)
+- 무효화: 로그아웃에서 invalidate_user 호출, ORM으로 User를 수정/삭제하면 커밋 후 자동 무효화
+  (탈퇴 처리, 온보딩 완료, 프로필 수정 등)
+    - 사용자별 세대(generation): 무효화마다 증가, 조회 중 무효화된 사용자의 결과는 캐시하지 않음
+    - 무효화는 캐시된 상태만 지움 (토큰 폐기 아님): access token은 만료(exp) 전까지 계속 유효하고,
+      다음 요청에서 DB를 다시 읽어 캐시를 채움 (로그아웃 후에도 기존과 동일, refresh token만 폐기됨)
+    - 이 프로세스의 ORM을 거치지 않는 변경(raw SQL, 다른 인스턴스/스크립트에서의 users 수정)은
+      자동 무효화되지 않음 → TTL(AUTH_PRINCIPAL_CACHE_TTL_SECONDS)이 반영 지연의 유일한 상한
+
+환경 변수:
+- AUTH_PRINCIPAL_CACHE_TTL_SECONDS: 항목 TTL (기본 60)
+- AUTH_PRINCIPAL_CACHE_MAX_ENTRIES: 최대 항목 수 (기본 10000)
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Set, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from backend.core.db import invalidate_after_commit
+from backend.domains.user.models import User
+
+
+class Principal:
+    """인증된 사용자 (라우트에서 필요한 필드만)"""
+
+    __slots__ = ("user_id", "deleted_at", "onboarding_completed_at")
+
+    def __init__(self, user_id, deleted_at: Optional[datetime], onboarding_completed_at: Optional[datetime]):
+        self.user_id = user_id
+        self.deleted_at = deleted_at
+        self.onboarding_completed_at = onboarding_completed_at
+
+    @property
+    def onboarding_completed(self) -> bool:
+        return self.onboarding_completed_at is not None
+
+
+def load_principal(db: Session, user_id: str) -> Optional[Principal]:
+    """users 테이블에서 principal 필드만 조회 (없으면 None)"""
+    row = db.execute(
+        select(User.user_id, User.deleted_at, User.onboarding_completed_at).where(User.user_id == user_id)
+    ).first()
+    if row is None:
+        return None
+    return Principal(row.user_id, row.deleted_at, row.onboarding_completed_at)
+
+
+class PrincipalCache:
+    """(user_id, iat) → Principal (LRU + TTL, 스레드 안전)"""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        # {(user_id, iat): (만료 시각, Principal)}
+        self._entries: "OrderedDict[Tuple[str, Optional[int]], tuple]" = OrderedDict()
+        # user_id → 캐시된 iat 목록 (사용자 단위 무효화용)
+        self._by_user: Dict[str, Set[Optional[int]]] = {}
+        # user_id → 무효화 횟수, _epoch: clear() 횟수
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, db: Session, user_id: str, issued_at: Optional[int]) -> Optional[Principal]:
+        """principal 반환 (캐시에 없으면 DB 조회, 사용자가 없으면 None이며 캐시하지 않음)"""
+        key = (str(user_id), issued_at)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation(key[0])
+
+        principal = load_principal(db, user_id)
+        if principal is not None:
+            self._put(key, principal, generation)
+        return principal
+
+    def _generation(self, user_id: str) -> Tuple[int, int]:
+        # lock 안에서 호출
+        return self._epoch, self._generations.get(user_id, 0)
+
+    def _put(self, key, principal: Principal, generation: Tuple[int, int]):
+        with self._lock:
+            if self._generation(key[0]) != generation:
+                # 조회 중에 무효화됨 → 이전 값일 수 있으므로 캐시하지 않음
+                return
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, principal)
+            self._entries.move_to_end(key)
+            self._by_user.setdefault(key[0], set()).add(key[1])
+            while len(self._entries) > self.max_entries:
+                old_key, _ = self._entries.popitem(last=False)
+                self._forget(old_key)
+
+    def _forget(self, key):
+        issued = self._by_user.get(key[0])
+        if issued is not None:
+            issued.discard(key[1])
+            if not issued:
+                del self._by_user[key[0]]
+
+    def invalidate_user(self, user_id):
+        """사용자의 모든 토큰 항목 제거 (캐시 상태만 제거, 토큰은 exp까지 유효)"""
+        user_id = str(user_id)
+        with self._lock:
+            for issued_at in self._by_user.pop(user_id, ()):
+                self._entries.pop((user_id, issued_at), None)
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+            self._generations.clear()
+            self._epoch += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# 싱글톤 인스턴스
+_principal_cache: Optional[PrincipalCache] = None
+
+
+def get_principal_cache() -> PrincipalCache:
+    """principal 캐시 싱글톤 인스턴스 반환"""
+    global _principal_cache
+    if _principal_cache is None:
+        _principal_cache = PrincipalCache(
+            max_entries=int(os.getenv("AUTH_PRINCIPAL_CACHE_MAX_ENTRIES", 10000)),
+            ttl_seconds=float(os.getenv("AUTH_PRINCIPAL_CACHE_TTL_SECONDS", 60))
+        )
+    return _principal_cache
+
+
+def _invalidate_principals(user_ids):
+    if _principal_cache is not None:
+        for user_id in user_ids:
+            _principal_cache.invalidate_user(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_principal(mapper, connection, target):
+    """ORM으로 사용자가 수정/삭제되면 커밋 후 principal 무효화 (flush 시점에는 user_id만 기록)"""
+    invalidate_after_commit(target, _invalidate_principals, str(target.user_id))
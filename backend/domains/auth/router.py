@@ -9,6 +9,7 @@ from backend.domains.auth.schemas import (
     LoginRequest, LoginResponse, UserResponse,
     RefreshTokenRequest, RefreshTokenResponse
 )
+from backend.domains.auth.principal import get_principal_cache
 from backend.domains.auth.utils import create_access_token, get_current_user, verify_refresh_token
 from backend.utils.password import verify_password
 
@@ -84,6 +85,9 @@ def logout(
     db.add(current_user)
     db.commit()
 
+    # 캐시된 principal 제거 (토큰 폐기 아님 → access token은 만료 전까지 유효)
+    get_principal_cache().invalidate_user(current_user.user_id)
+
     return {"message": "로그아웃 되었습니다."}
 
 
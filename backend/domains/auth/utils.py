@@ -1,6 +1,7 @@
 # backend/domains/auth/utils.py
 
 import os
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -11,6 +12,7 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
 from backend.core.db import get_db
+from backend.domains.auth.principal import Principal, get_principal_cache
 from backend.domains.user.models import User
 
 # ======================================================
@@ -40,7 +42,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         if expires_delta
         else timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     )
-    to_encode.update({"exp": expire})
+    # iat: principal 캐시 키 (같은 토큰의 반복 요청을 구분)
+    to_encode.update({"exp": expire, "iat": int(time.time())})
 
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
@@ -64,13 +67,8 @@ def verify_refresh_token(token: str) -> Optional[str]:
 # ======================================================
 # 현재 로그인된 유저 조회
 # ======================================================
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> User:
-    # -----------------------------
-    # 토큰 디코딩
-    # -----------------------------
+def decode_access_token(token: str) -> dict:
+    """access token을 검증하고 payload를 반환한다. (실패 시 401)"""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except ExpiredSignatureError:
@@ -84,12 +82,23 @@ def get_current_user(
             detail="유효하지 않은 토큰입니다.",
         )
 
-    user_id: str = payload.get("sub")
-    if user_id is None:
+    if payload.get("sub") is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="토큰에 유저 정보가 없습니다.",
         )
+    return payload
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> User:
+    """
+    ORM User 반환 (유저 정보를 수정하는 라우트용, 매 요청 DB 조회)
+    읽기만 하는 라우트는 get_current_principal 사용
+    """
+    user_id: str = decode_access_token(token)["sub"]
 
     # -----------------------------
     # DB에서 유저 조회
@@ -109,3 +118,30 @@ def get_current_user(
         )
 
     return user
+
+
+def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> Principal:
+    """
+    캐시된 principal 반환 (user_id, deleted_at, onboarding_completed_at)
+    - (user_id, iat) 캐시 적중 시 DB 조회 없음 (auth/principal.py)
+    """
+    payload = decode_access_token(token)
+
+    principal = get_principal_cache().get(db, payload["sub"], payload.get("iat"))
+
+    if principal is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="해당 유저를 찾을 수 없습니다.",
+        )
+
+    if principal.deleted_at:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="탈퇴한 유저입니다.",
+        )
+
+    return principal
@@ -0,0 +1,264 @@
+# backend/domains/movie/card_cache.py
+"""
+영화 카드 캐시 (tmdb_id → MovieInfo 필드 dict)
+
+- 영화 메타데이터는 거의 바뀌지 않으므로 /api/recommend 결과(최대 50편)를 매번 DB에서 읽지 않음
+- 조회 순서: 프로세스 내 LRU → (선택) Redis → PostgreSQL (없는 id만 한 번에 조회)
+- 항목별 TTL, 크기 상한(LRU 제거), DB에 없는 tmdb_id도 짧은 TTL로 기억 (AI가 반복 추천하는 누락 영화)
+- 무효화: invalidate(tmdb_ids) / clear(), ORM으로 Movie를 수정·삭제하면 커밋 후 자동 무효화
+    - 영화별 세대(generation): 무효화마다 증가, Redis/DB 조회 중 무효화된 id는 프로세스 내/Redis에 저장하지 않음
+- 반환 dict는 캐시와 공유되므로 호출 측에서 수정하지 않음
+
+환경 변수:
+- MOVIE_CACHE_MAX_ENTRIES: 프로세스 내 최대 항목 수 (기본 20000)
+- MOVIE_CACHE_TTL_SECONDS: 항목 TTL (기본 3600)
+- MOVIE_CACHE_MISS_TTL_SECONDS: DB에 없는 id 기억 시간 (기본 300)
+- MOVIE_CACHE_REDIS: true면 Redis 공유 캐시 사용 (get_redis_client, 기본 false)
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from backend.core.db import invalidate_after_commit
+from backend.domains.movie.models import Movie
+
+logger = logging.getLogger(__name__)
+
+# MovieInfo 응답 필드만 조회 (tag_genome JSONB / release_date 등은 읽지 않음)
+MOVIE_INFO_COLUMNS = (
+    Movie.movie_id,
+    Movie.tmdb_id,
+    Movie.title,
+    Movie.overview,
+    Movie.poster_path,
+    Movie.vote_average,
+    Movie.runtime,
+    Movie.genres,
+    Movie.adult,
+    Movie.popularity,
+)
+
+# DB에 없는 tmdb_id 표시 (Redis에는 저장하지 않음)
+_MISSING = object()
+
+
+class MovieCardCache:
+    """tmdb_id 기준 read-through 카드 캐시 (스레드 안전)"""
+
+    def __init__(
+        self,
+        max_entries: int = 20000,
+        ttl_seconds: float = 3600.0,
+        miss_ttl_seconds: float = 300.0,
+        redis_client=None,
+        key_prefix: str = "movie_card:"
+    ):
+        """
+        Args:
+            max_entries: 프로세스 내 최대 항목 수 (초과 시 가장 오래 안 쓴 항목 제거)
+            ttl_seconds: 항목 TTL (Redis 항목도 같은 TTL)
+            miss_ttl_seconds: DB에 없는 id를 기억하는 시간
+            redis_client: 공유 캐시용 Redis 클라이언트 (None이면 프로세스 내 캐시만)
+            key_prefix: Redis 키 접두사
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.miss_ttl_seconds = miss_ttl_seconds
+        self.redis = redis_client
+        self.key_prefix = key_prefix
+
+        # {tmdb_id: (만료 시각, card 또는 _MISSING)}
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        # tmdb_id → 무효화 횟수, _epoch: clear() 횟수
+        self._generations: Dict[int, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------
+    def get_many(self, db: Session, tmdb_ids: Iterable[int]) -> Dict[int, dict]:
+        """
+        tmdb_id 목록의 카드 반환 (DB에 없는 id는 결과에서 빠짐)
+
+        Returns:
+            {tmdb_id: MovieInfo 필드 dict}
+        """
+        wanted = list(dict.fromkeys(tmdb_ids))
+        # generations: 캐시에 없던 id의 조회 시작 시점 세대 (그 사이 무효화된 id는 저장하지 않음)
+        cards, missing, generations = self._get_local(wanted)
+
+        if missing and self.redis is not None:
+            found = self._get_redis(missing)
+            if found:
+                self._put_local(found, generations)
+                cards.update(found)
+                missing = [mid for mid in missing if mid not in found]
+
+        if missing:
+            found = self._load_db(db, missing)
+            self._put_local(found, generations)
+            self._put_local_missing([mid for mid in missing if mid not in found], generations)
+            self._put_redis(found, generations)
+            cards.update(found)
+
+        return cards
+
+    def get(self, db: Session, tmdb_id: int) -> Optional[dict]:
+        """카드 하나 (DB에 없으면 None)"""
+        return self.get_many(db, [tmdb_id]).get(tmdb_id)
+
+    def _get_local(self, tmdb_ids: List[int]):
+        cards = {}
+        missing = []
+        generations = {}
+        now = time.monotonic()
+        with self._lock:
+            for mid in tmdb_ids:
+                entry = self._entries.get(mid)
+                if entry is None or entry[0] <= now:
+                    missing.append(mid)
+                    generations[mid] = self._generation(mid)
+                    continue
+                self._entries.move_to_end(mid)
+                if entry[1] is not _MISSING:
+                    cards[mid] = entry[1]
+            self.hits += len(tmdb_ids) - len(missing)
+            self.misses += len(missing)
+        return cards, missing, generations
+
+    def _generation(self, tmdb_id: int) -> Tuple[int, int]:
+        # lock 안에서 호출
+        return self._epoch, self._generations.get(tmdb_id, 0)
+
+    def _invalidated(self, generations: Dict[int, Tuple[int, int]], tmdb_ids: Iterable[int]) -> List[int]:
+        # lock 안에서 호출: 조회를 시작한 뒤 무효화된 id
+        return [mid for mid in tmdb_ids if self._generation(mid) != generations[mid]]
+
+    def _get_redis(self, tmdb_ids: List[int]) -> Dict[int, dict]:
+        try:
+            values = self.redis.mget([f"{self.key_prefix}{mid}" for mid in tmdb_ids])
+        except Exception as e:
+            logger.warning("Movie card Redis 조회 실패: %s", e)
+            return {}
+        return {mid: json.loads(value) for mid, value in zip(tmdb_ids, values) if value}
+
+    @staticmethod
+    def _load_db(db: Session, tmdb_ids: List[int]) -> Dict[int, dict]:
+        rows = db.execute(select(*MOVIE_INFO_COLUMNS).where(Movie.tmdb_id.in_(tmdb_ids))).mappings().all()
+        logger.debug("Movie card DB 조회: %d/%d", len(rows), len(tmdb_ids))
+        return {row["tmdb_id"]: dict(row) for row in rows}
+
+    # ------------------------------------------------------------
+    # 저장
+    # ------------------------------------------------------------
+    def _put_local(self, cards: Dict[int, dict], generations: Dict[int, Tuple[int, int]]):
+        self._store(cards, self.ttl_seconds, generations)
+
+    def _put_local_missing(self, tmdb_ids: List[int], generations: Dict[int, Tuple[int, int]]):
+        self._store({mid: _MISSING for mid in tmdb_ids}, self.miss_ttl_seconds, generations)
+
+    def _store(self, values: dict, ttl: float, generations: Dict[int, Tuple[int, int]]):
+        if not values:
+            return
+        expires_at = time.monotonic() + ttl
+        with self._lock:
+            stale = set(self._invalidated(generations, values))
+            for mid, value in values.items():
+                if mid in stale:
+                    continue
+                self._entries[mid] = (expires_at, value)
+                self._entries.move_to_end(mid)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _put_redis(self, cards: Dict[int, dict], generations: Dict[int, Tuple[int, int]]):
+        if self.redis is None:
+            return
+        with self._lock:
+            stale = set(self._invalidated(generations, cards))
+        cards = {mid: card for mid, card in cards.items() if mid not in stale}
+        if not cards:
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for mid, card in cards.items():
+                pipe.set(f"{self.key_prefix}{mid}", json.dumps(card, ensure_ascii=False), ex=int(self.ttl_seconds))
+            pipe.execute()
+            # 저장하는 동안 무효화됐으면 그 DELETE보다 SET이 늦게 도착했을 수 있음 → 다시 제거
+            with self._lock:
+                stale = self._invalidated(generations, cards)
+            if stale:
+                self.redis.delete(*[f"{self.key_prefix}{mid}" for mid in stale])
+        except Exception as e:
+            logger.warning("Movie card Redis 저장 실패: %s", e)
+
+    # ------------------------------------------------------------
+    # 무효화
+    # ------------------------------------------------------------
+    def invalidate(self, tmdb_ids: Iterable[int]):
+        """지정한 영화 카드 제거 (프로세스 내 + Redis)"""
+        tmdb_ids = list(tmdb_ids)
+        with self._lock:
+            for mid in tmdb_ids:
+                self._entries.pop(mid, None)
+                self._generations[mid] = self._generations.get(mid, 0) + 1
+        if self.redis is not None and tmdb_ids:
+            try:
+                self.redis.delete(*[f"{self.key_prefix}{mid}" for mid in tmdb_ids])
+            except Exception as e:
+                logger.warning("Movie card Redis 무효화 실패: %s", e)
+
+    def clear(self):
+        """프로세스 내 캐시 전체 제거 (Redis 항목은 TTL로 만료, 대량 갱신 후에는 invalidate 사용)"""
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._epoch += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# 싱글톤 인스턴스
+_movie_card_cache: Optional[MovieCardCache] = None
+
+
+def get_movie_card_cache() -> MovieCardCache:
+    """영화 카드 캐시 싱글톤 인스턴스 반환"""
+    global _movie_card_cache
+    if _movie_card_cache is None:
+        redis_client = None
+        if os.getenv("MOVIE_CACHE_REDIS", "false").lower() == "true":
+            from backend.utils.redis import get_redis_client
+            redis_client = get_redis_client()
+        _movie_card_cache = MovieCardCache(
+            max_entries=int(os.getenv("MOVIE_CACHE_MAX_ENTRIES", 20000)),
+            ttl_seconds=float(os.getenv("MOVIE_CACHE_TTL_SECONDS", 3600)),
+            miss_ttl_seconds=float(os.getenv("MOVIE_CACHE_MISS_TTL_SECONDS", 300)),
+            redis_client=redis_client
+        )
+    return _movie_card_cache
+
+
+def _invalidate_movie_cards(tmdb_ids):
+    if _movie_card_cache is not None:
+        _movie_card_cache.invalidate(tmdb_ids)
+
+
+@event.listens_for(Movie, "after_update")
+@event.listens_for(Movie, "after_delete")
+def _invalidate_movie_card(mapper, connection, target):
+    """ORM으로 영화가 수정/삭제되면 커밋 후 카드 무효화 (flush 시점에는 tmdb_id만 기록)"""
+    invalidate_after_commit(target, _invalidate_movie_cards, target.tmdb_id)
@@ -3,9 +3,29 @@
 AI 추천 모델 어댑터 - GPU Server HTTP 호출
 """
 
+import asyncio
+import logging
 import os
+import threading
+import time
 import httpx
 from typing import List, Optional
+from starlette.concurrency import run_in_threadpool
+
+try:
+    import h2  # noqa: F401  (httpx[http2])
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+from backend.core.request_log import request_id_var
+from backend.domains.recommendation.balancer import ReplicaBalancer
+from backend.domains.recommendation.resilience import (
+    CircuitOpenError, LatencyTracker, RetryPolicy, hedged
+)
+from backend.domains.recommendation.wire_format import MEDIA_TYPE, decode_recommendations
+
+logger = logging.getLogger(__name__)
 
 
 class AIModelAdapter:
@@ -14,8 +34,85 @@ class AIModelAdapter:
     """
 
     def __init__(self):
-        self.ai_service_url = os.getenv("AI_SERVICE_URL", "http://10.0.35.62:8001")
+        # 레플리카 목록: AI_SERVICE_URLS (쉼표 구분) > AI_SERVICE_URL
+        urls = os.getenv("AI_SERVICE_URLS") or os.getenv("AI_SERVICE_URL", "http://10.0.35.62:8001")
+        self.ai_service_urls = [url.strip() for url in urls.split(",") if url.strip()]
+        self.ai_service_url = self.ai_service_urls[0]
+        self.balancer = ReplicaBalancer(
+            self.ai_service_urls,
+            failure_threshold=int(os.getenv("AI_REPLICA_FAILURES", 3)),
+            eject_seconds=float(os.getenv("AI_REPLICA_EJECT_SECONDS", 30.0)),
+            slow_threshold=float(os.getenv("AI_REPLICA_SLOW_SECONDS", 10.0)),
+            # circuit breaker는 레플리카별 (한 레플리카 장애가 나머지 호출을 막지 않도록)
+            breaker_failures=int(os.getenv("AI_BREAKER_FAILURES", 5)),
+            breaker_reset_seconds=float(os.getenv("AI_BREAKER_RESET_SECONDS", 30.0))
+        )
+        self.health_check_interval = float(os.getenv("AI_HEALTH_CHECK_INTERVAL", 10.0))
+        self._health_task: Optional[asyncio.Task] = None
         self.is_loaded = True  # HTTP 호출이므로 항상 True
+        # 내부 통신 포맷: json (기본) / binary (고정 레이아웃, Accept 헤더로 협상)
+        self.wire_format = os.getenv("AI_WIRE_FORMAT", "json").lower()
+        # 시청 기록 조회 위치: ai (기본, user_id만 전송) / backend (여기서 DB 조회 후 ID 목록 전송)
+        self.history_lookup = os.getenv("AI_HISTORY_LOOKUP", "ai").lower()
+
+        # 커넥션 풀 / 타임아웃 설정 (connect는 짧게, read는 추천 계산 시간만큼)
+        self.connect_timeout = float(os.getenv("AI_HTTP_CONNECT_TIMEOUT", 2.0))
+        self.read_timeout = float(os.getenv("AI_HTTP_READ_TIMEOUT", 30.0))
+        self.max_connections = int(os.getenv("AI_HTTP_MAX_CONNECTIONS", 100))
+        self.max_keepalive_connections = int(os.getenv("AI_HTTP_MAX_KEEPALIVE", 20))
+        self.keepalive_expiry = float(os.getenv("AI_HTTP_KEEPALIVE_EXPIRY", 30.0))
+        # h2 패키지가 있을 때만 HTTP/2 (http:// 에서는 서버가 h2c를 지원하지 않으면 HTTP/1.1로 동작)
+        self.http2 = HTTP2_AVAILABLE and os.getenv("AI_HTTP2", "true").lower() == "true"
+
+        self._client: Optional[httpx.Client] = None
+        self._client_lock = threading.Lock()
+        self._async_client: Optional[httpx.AsyncClient] = None
+
+        # 장애 대응: 레플리카별 circuit breaker(balancer) + 재시도 + (비동기 경로) hedging
+        self.retry = RetryPolicy(
+            max_attempts=int(os.getenv("AI_RETRY_ATTEMPTS", 2)),
+            base_delay=float(os.getenv("AI_RETRY_BASE_DELAY", 0.1))
+        )
+        self.latency = LatencyTracker()
+        self.hedge_enabled = os.getenv("AI_HEDGE", "false").lower() == "true"
+        self.hedge_quantile = float(os.getenv("AI_HEDGE_QUANTILE", 0.95))
+
+        # 회로가 열렸을 때 쓰는 인기도 fallback 결과 캐시 {key: (만료 시각, tmdb_ids)}
+        self.fallback_ttl = float(os.getenv("AI_FALLBACK_TTL_SECONDS", 60.0))
+        self._fallback_cache = {}
+
+    def _client_options(self) -> dict:
+        """httpx Client/AsyncClient 공통 옵션"""
+        return {
+            "timeout": httpx.Timeout(
+                self.read_timeout,
+                connect=self.connect_timeout
+            ),
+            "limits": httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry
+            ),
+            "http2": self.http2,
+        }
+
+    @property
+    def client(self) -> httpx.Client:
+        """keep-alive 커넥션을 재사용하는 장수명 클라이언트 (최초 사용 시 생성)"""
+        if self._client is None or self._client.is_closed:
+            with self._client_lock:
+                if self._client is None or self._client.is_closed:
+                    self._client = httpx.Client(**self._client_options())
+                    logger.info("HTTP client created (http2=%s, max_connections=%d)", self.http2, self.max_connections)
+        return self._client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """비동기 라우트용 클라이언트 (이벤트 루프 안에서 최초 사용 시 생성)"""
+        if self._async_client is None or self._async_client.is_closed:
+            self._async_client = httpx.AsyncClient(**self._client_options())
+            logger.info("Async HTTP client created (http2=%s, max_connections=%d)", self.http2, self.max_connections)
+        return self._async_client
 
     def predict(
         self,
@@ -35,118 +132,293 @@ class AIModelAdapter:
             available_time: 이용 가능한 시간 (분)
             preferred_genres: 선호 장르 리스트
             preferred_otts: 구독 중인 OTT 리스트
-            user_movie_ids: 사용자가 본 영화 ID 리스트
+            user_movie_ids: 사용자가 본 영화 ID 리스트 (None이면 AI_HISTORY_LOOKUP에 따라 조회)
 
         Returns:
             추천된 movie_id 리스트
         """
         try:
-            # 사용자 시청 기록 조회
-            if user_movie_ids is None:
+            # 사용자 시청 기록 조회 (AI Service가 조회하는 경우 생략)
+            if user_movie_ids is None and self.history_lookup == "backend":
                 user_movie_ids = self._get_user_watched_movies(user_id)
 
-            if not user_movie_ids:
-                print(f"[AI Model] No watch history for user {user_id}")
-                user_movie_ids = [550, 27205, 157336]  # 기본값
+            payload = self._build_payload(
+                user_id, user_movie_ids, top_k, available_time, preferred_genres, preferred_otts
+            )
 
-            # AI Service 호출
-            payload = {
-                "user_movie_ids": user_movie_ids,
-                "available_time": available_time,
-                "top_k": top_k,
-                "preferred_genres": preferred_genres,
-                "preferred_otts": preferred_otts
-            }
-
-            print(f"[AI Model] Calling AI Service: {self.ai_service_url}/recommend")
-
-            with httpx.Client(timeout=30.0) as client:
-                response = client.post(
-                    f"{self.ai_service_url}/recommend",
-                    json=payload
-                )
-                response.raise_for_status()
-                result = response.json()
-
-            # 추천 타입 로깅
-            rec_type = 'combination' if available_time >= 420 else 'single'
-            print(f"\n{'='*80}")
-            print(f"[AI Model] 추천 모드: {'🎬 단일 영화 추천' if rec_type == 'single' else '🎞️  영화 조합 추천'}")
-            print(f"[AI Model] 입력 시간: {available_time}분 ({available_time//60}시간 {available_time%60}분)")
-            print(f"[AI Model] 조합 추천 기준: 420분(7시간) 이상")
-            print(f"{'='*80}\n")
-
-            # 결과에서 movie_id 추출
-            movie_ids = []
-
-            track_a = result.get('track_a', {})
-            track_b = result.get('track_b', {})
-
-            # track_a에서 영화 추출
-            if isinstance(track_a, dict):
-                movies_a = track_a.get('movies', [])
-                if isinstance(movies_a, list):
-                    for movie in movies_a:
-                        if isinstance(movie, dict) and 'tmdb_id' in movie:
-                            movie_ids.append(movie['tmdb_id'])
-
-            # track_b에서 영화 추출
-            if isinstance(track_b, dict):
-                movies_b = track_b.get('movies', [])
-                if isinstance(movies_b, list):
-                    for movie in movies_b:
-                        if isinstance(movie, dict) and 'tmdb_id' in movie:
-                            movie_ids.append(movie['tmdb_id'])
-
-            print(f"[AI Model] Recommended {len(movie_ids)} movies")
-            return movie_ids[:top_k]
+            logger.debug("Calling AI Service: %d replica(s)", len(self.ai_service_urls))
 
+            result = self._post_recommend(payload)
+            return self._extract_movie_ids(result, top_k, available_time)
+
+        except CircuitOpenError:
+            logger.warning("Circuit open - AI Service 호출 생략")
         except httpx.HTTPError as e:
-            print(f"[AI Model] HTTP error: {e}")
-            return []
+            logger.warning("HTTP error: %s", e)
         except Exception as e:
-            print(f"[AI Model] Error: {e}")
-            import traceback
-            traceback.print_exc()
-            return []
+            logger.exception("AI Service 호출 오류: %s", e)
+
+        return self._fallback_recommendations(top_k, available_time, preferred_genres)
+
+    async def apredict(
+        self,
+        user_id: str,
+        top_k: int = 20,
+        available_time: int = 180,
+        preferred_genres: Optional[List[str]] = None,
+        preferred_otts: Optional[List[str]] = None,
+        user_movie_ids: Optional[List[int]] = None
+    ) -> List[int]:
+        """
+        predict()의 비동기 버전 (AI 응답 대기 중 스레드를 점유하지 않음)
+
+        - HTTP 호출: httpx.AsyncClient
+        - 시청 기록 DB 조회 (AI_HISTORY_LOOKUP=backend): threadpool로 오프로드 (동기 SQLAlchemy 세션)
+        """
+        try:
+            if user_movie_ids is None and self.history_lookup == "backend":
+                user_movie_ids = await run_in_threadpool(self._get_user_watched_movies, user_id)
+
+            payload = self._build_payload(
+                user_id, user_movie_ids, top_k, available_time, preferred_genres, preferred_otts
+            )
+
+            logger.debug("Calling AI Service (async): %d replica(s)", len(self.ai_service_urls))
+
+            result = await self._apost_recommend(payload)
+            return self._extract_movie_ids(result, top_k, available_time)
+
+        except CircuitOpenError:
+            logger.warning("Circuit open - AI Service 호출 생략")
+        except httpx.HTTPError as e:
+            logger.warning("HTTP error: %s", e)
+        except Exception as e:
+            logger.exception("AI Service 호출 오류: %s", e)
+
+        return await run_in_threadpool(
+            self._fallback_recommendations, top_k, available_time, preferred_genres
+        )
+
+    def _post_recommend(self, payload: dict) -> dict:
+        """circuit breaker + 제한 재시도를 적용한 /recommend 호출"""
+        for attempt in range(self.retry.max_attempts):
+            started = time.perf_counter()
+            try:
+                # 재시도마다 레플리카를 다시 고름 (실패한 레플리카는 outstanding/실패 집계/회로로 회피)
+                # 모든 레플리카의 회로가 열려 있으면 CircuitOpenError (재시도 없음)
+                replica = self.balancer.pick()
+                with self.balancer.track(replica):
+                    response = self.client.post(
+                        f"{replica.url}/recommend", json=payload, headers=self._request_headers()
+                    )
+                    response.raise_for_status()
+            except Exception as e:
+                if not self._record_error(e, attempt):
+                    raise
+                time.sleep(self.retry.delay(attempt))
+                continue
+
+            self.latency.record(time.perf_counter() - started)
+            return self._parse_response(response)
+
+    async def _apost_recommend(self, payload: dict) -> dict:
+        """_post_recommend()의 비동기 버전 (+ p95 초과 시 hedged request)"""
+        async def send():
+            # hedged request는 다른 레플리카로 갈 가능성이 높음 (레플리카마다 자기 breaker 슬롯 점유)
+            replica = self.balancer.pick()
+            with self.balancer.track(replica):
+                response = await self.async_client.post(
+                    f"{replica.url}/recommend", json=payload, headers=self._request_headers()
+                )
+                response.raise_for_status()
+            return response
+
+        for attempt in range(self.retry.max_attempts):
+            # 회로가 closed가 아닌 레플리카가 있으면 hedging 생략 (복구 중인 레플리카에 요청을 겹쳐 보내지 않음)
+            hedge_after = None
+            if self.hedge_enabled and self.balancer.breakers_closed():
+                hedge_after = self.latency.percentile(self.hedge_quantile)
+            started = time.perf_counter()
+            try:
+                response = await hedged(send, hedge_after)
+            except Exception as e:
+                if not self._record_error(e, attempt):
+                    raise
+                await asyncio.sleep(self.retry.delay(attempt))
+                continue
+
+            self.latency.record(time.perf_counter() - started)
+            return self._parse_response(response)
+
+    def _record_error(self, error: Exception, attempt: int) -> bool:
+        """재시도 여부 반환 (breaker 반영은 balancer.track()에서 레플리카별로 처리)"""
+        retry = attempt + 1 < self.retry.max_attempts and self.retry.is_retryable(error)
+        if retry:
+            logger.info("재시도 %d/%d: %r", attempt + 1, self.retry.max_attempts - 1, error)
+        return retry
+
+    def _fallback_recommendations(
+        self,
+        top_k: int,
+        available_time: int,
+        preferred_genres: Optional[List[str]]
+    ) -> List[int]:
+        """AI Service 장애 시 인기도 순 tmdb_id (MockRecommender, 짧은 TTL 캐시)"""
+        runtime_limit = available_time if available_time < 420 else None
+        key = (top_k, runtime_limit, tuple(sorted(preferred_genres or [])))
+
+        cached = self._fallback_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            logger.info("Popularity fallback (cached): %d movies", len(cached[1]))
+            return cached[1]
 
-    def _get_user_watched_movies(self, user_id: str) -> List[int]:
-        """사용자의 시청 기록에서 movie_id 리스트 반환"""
         try:
-            from sqlalchemy import text
             from backend.core.db import SessionLocal
+            from backend.domains.recommendation.mock_ai import MockRecommender
 
             db = SessionLocal()
             try:
-                # movie_logs에서 조회
-                result = db.execute(
-                    text("SELECT movie_id FROM movie_logs WHERE user_id = :uid ORDER BY watched_at DESC LIMIT 50"),
-                    {"uid": user_id}
-                ).fetchall()
+                movie_ids = MockRecommender(db).predict_tmdb_ids(
+                    top_k=top_k,
+                    runtime_limit=runtime_limit,
+                    genre_names=preferred_genres
+                )
+            finally:
+                db.close()
+        except Exception as e:
+            logger.error("Fallback error: %s", e)
+            return []
 
-                if result:
-                    return [row[0] for row in result]
+        if len(self._fallback_cache) > 256:
+            self._fallback_cache.clear()
+        self._fallback_cache[key] = (time.monotonic() + self.fallback_ttl, movie_ids)
 
-                # 온보딩 응답에서 조회
-                result = db.execute(
-                    text("SELECT movie_id FROM user_onboarding_answers WHERE user_id = :uid"),
-                    {"uid": user_id}
-                ).fetchall()
+        logger.info("Popularity fallback: %d movies", len(movie_ids))
+        return movie_ids
 
-                if result:
-                    return [row[0] for row in result]
+    def _build_payload(
+        self,
+        user_id: str,
+        user_movie_ids: Optional[List[int]],
+        top_k: int,
+        available_time: int,
+        preferred_genres: Optional[List[str]],
+        preferred_otts: Optional[List[str]]
+    ) -> dict:
+        """
+        /recommend 요청 body 생성
+        - user_movie_ids가 None이면 user_id만 전송 (AI Service가 시청 기록 조회, 기록이 없으면 추천기 cold-start)
+        """
+        if user_movie_ids is None:
+            history = {"user_id": str(user_id)}
+        else:
+            if not user_movie_ids:
+                logger.info("No watch history for user %s", user_id)
+                user_movie_ids = [550, 27205, 157336]  # 기본값
+            history = {"user_movie_ids": user_movie_ids}
+
+        return {
+            **history,
+            "available_time": available_time,
+            "top_k": top_k,
+            "preferred_genres": preferred_genres,
+            "preferred_otts": preferred_otts,
+            # 영화 정보는 backend DB에서 다시 조회하므로 ID + 점수만 요청
+            "projection": "ids"
+        }
+
+    def _request_headers(self) -> dict:
+        # 같은 X-Request-ID로 AI Service 로그와 연결
+        headers = {"X-Request-ID": request_id_var.get()}
+        if self.wire_format == "binary":
+            headers["Accept"] = f"{MEDIA_TYPE}, application/json;q=0.5"
+        return headers
+
+    def _extract_movie_ids(self, result: dict, top_k: int, available_time: int) -> List[int]:
+        """AI Service 응답에서 track_a → track_b 순서로 movie_id 추출"""
+        # 추천 타입 로깅 (조합 추천 기준: 420분 이상)
+        logger.debug(
+            "추천 모드: %s, 입력 시간: %d분",
+            'combination' if available_time >= 420 else 'single', available_time
+        )
+
+        # 결과에서 movie_id 추출
+        movie_ids = []
+
+        # track_a → track_b 순서
+        # - single: track['movies']
+        # - combination: track['combination']['movies'] (조합이 없으면 combination=None)
+        for track_name in ('track_a', 'track_b'):
+            track = result.get(track_name, {})
+            if not isinstance(track, dict):
+                continue
+
+            movies = track.get('movies', [])
+            combination = track.get('combination')
+            if isinstance(combination, dict):
+                movies = combination.get('movies', [])
+
+            if isinstance(movies, list):
+                for movie in movies:
+                    if isinstance(movie, dict) and 'tmdb_id' in movie:
+                        movie_ids.append(movie['tmdb_id'])
+
+        logger.debug("Recommended %d movies", len(movie_ids))
+        return movie_ids[:top_k]
 
+    def _parse_response(self, response: httpx.Response) -> dict:
+        """Content-Type에 따라 바이너리/JSON 응답 디코딩 (구버전 AI Service는 항상 JSON)"""
+        content_type = response.headers.get("content-type", "")
+        if content_type.startswith(MEDIA_TYPE):
+            return decode_recommendations(response.content)
+        return response.json()
+
+    def _get_user_watched_movies(self, user_id: str) -> List[int]:
+        """사용자의 시청 기록에서 movie_id 리스트 반환 (없으면 온보딩 응답)"""
+        try:
+            from backend.core.db import SessionLocal
+            from backend.domains.recommendation.history import get_watch_history
+
+            db = SessionLocal()
+            try:
+                return get_watch_history(db, user_id)
             finally:
                 db.close()
 
         except Exception as e:
-            print(f"[AI Model] DB query error: {e}")
+            logger.error("DB query error: %s", e)
 
         return []
 
     def close(self):
-        """리소스 정리 (HTTP 클라이언트는 정리 불필요)"""
-        pass
+        """리소스 정리 (커넥션 풀 종료, 앱 lifespan 종료 시 호출)"""
+        with self._client_lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    def start_health_checks(self):
+        """레플리카가 여러 개면 /health 능동 감시 시작 (앱 lifespan 시작 시 호출)"""
+        if len(self.ai_service_urls) < 2 or self._health_task is not None:
+            return
+        self._health_task = asyncio.get_running_loop().create_task(
+            self.balancer.run_health_checks(self.async_client, self.health_check_interval)
+        )
+        logger.info("Health check started: %s", self.ai_service_urls)
+
+    async def aclose(self):
+        """비동기 클라이언트까지 포함한 리소스 정리 (앱 lifespan 종료 시 호출)"""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        self.close()
 
 
 # 싱글톤 인스턴스
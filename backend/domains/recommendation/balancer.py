@@ -0,0 +1,234 @@
+# backend/domains/recommendation/balancer.py
+"""
+AI Service 레플리카 클라이언트 측 로드 밸런싱
+
+- 선택: power-of-two-choices (무작위 2개 중 처리 중 요청 수가 적은 쪽)
+- 수동 감시: 연속 실패 / 느린 응답(EWMA) 레플리카를 일정 시간 제외(eject)
+- 능동 감시: 주기적으로 /health 호출 → 실패하거나 ready(warm-up 완료)=False면 제외
+- 제외 사유별로 복귀 시각을 따로 기록: health check 통과는 health check로 제외된 것만 해제
+  (/health는 /recommend를 실행하지 않으므로 느림/연속 실패 제외는 eject_seconds가 지나야 복귀)
+- 모든 레플리카가 제외되면 가장 먼저 복귀 예정인 레플리카 사용 (요청은 계속 보냄)
+- circuit breaker는 레플리카마다 따로 둠: 한 레플리카의 장애가 정상 레플리카 호출까지 막지 않음
+  (모든 레플리카의 회로가 열려 있을 때만 CircuitOpenError)
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional
+
+import httpx
+
+from backend.domains.recommendation.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+# 제외 사유
+EJECT_FAILURES = "failures"
+EJECT_SLOW = "slow"
+EJECT_HEALTH = "health"
+
+
+class Replica:
+    """AI Service 인스턴스 하나의 상태"""
+
+    def __init__(self, url: str, breaker: CircuitBreaker):
+        self.url = url.rstrip("/")
+        self.breaker = breaker
+        self.outstanding = 0
+        self.ewma_latency = 0.0
+        self.consecutive_failures = 0
+        # 제외 사유 → 복귀 시각 (monotonic)
+        self.ejections = {}
+
+    @property
+    def ejected_until(self) -> float:
+        return max(self.ejections.values(), default=0.0)
+
+    def available(self, now: float) -> bool:
+        return self.ejected_until <= now
+
+    def __repr__(self):
+        return f"Replica({self.url}, outstanding={self.outstanding}, ewma={self.ewma_latency:.3f}s)"
+
+
+class ReplicaBalancer:
+    """레플리카 목록 위의 power-of-two-choices 밸런서"""
+
+    def __init__(
+        self,
+        urls: List[str],
+        failure_threshold: int = 3,
+        eject_seconds: float = 30.0,
+        slow_threshold: float = 10.0,
+        ewma_alpha: float = 0.2,
+        breaker_failures: int = 5,
+        breaker_reset_seconds: float = 30.0
+    ):
+        """
+        Args:
+            urls: 레플리카 base URL 목록
+            failure_threshold: 제외할 연속 실패 횟수
+            eject_seconds: 제외 유지 시간 (초)
+            slow_threshold: EWMA 지연이 이 값(초)을 넘으면 제외
+            ewma_alpha: 지연 EWMA 가중치
+            breaker_failures: 레플리카 회로를 여는 연속 실패 횟수
+            breaker_reset_seconds: 레플리카 회로 open 유지 시간 (초)
+        """
+        if not urls:
+            raise ValueError("AI Service 레플리카 URL이 없습니다")
+
+        self.replicas = [
+            Replica(url, CircuitBreaker(breaker_failures, breaker_reset_seconds, name=url.rstrip("/")))
+            for url in urls
+        ]
+        self.failure_threshold = failure_threshold
+        self.eject_seconds = eject_seconds
+        self.slow_threshold = slow_threshold
+        self.ewma_alpha = ewma_alpha
+        self._lock = threading.Lock()
+
+    def pick(self) -> Replica:
+        """
+        요청을 보낼 레플리카 선택 (선택한 레플리카의 breaker 슬롯 점유 → 반드시 track()과 함께 사용)
+
+        Raises:
+            CircuitOpenError: 모든 레플리카의 회로가 열려 있음 (half-open 시험 슬롯도 사용 중)
+        """
+        now = time.monotonic()
+        with self._lock:
+            candidates = [r for r in self.replicas if r.breaker.state != CircuitBreaker.OPEN]
+            while candidates:
+                replica = self._choose(candidates, now)
+                if replica.breaker.allow_request():
+                    return replica
+                # half-open 시험 슬롯을 다른 요청이 사용 중 → 나머지 중에서 다시 선택
+                candidates.remove(replica)
+        raise CircuitOpenError()
+
+    @staticmethod
+    def _choose(candidates: List[Replica], now: float) -> Replica:
+        # lock 안에서 호출
+        available = [r for r in candidates if r.available(now)]
+        if not available:
+            return min(candidates, key=lambda r: r.ejected_until)
+        if len(available) == 1:
+            return available[0]
+
+        # 동률이면 무작위 순서의 앞쪽 (지연 기준으로 깨면 가장 빠른 레플리카로 몰림)
+        a, b = random.sample(available, 2)
+        return b if b.outstanding < a.outstanding else a
+
+    def breakers_closed(self) -> bool:
+        """모든 레플리카의 회로가 closed인지 (hedging 허용 조건)"""
+        return all(r.breaker.state == CircuitBreaker.CLOSED for r in self.replicas)
+
+    @contextmanager
+    def track(self, replica: Replica):
+        """요청 수명 동안 outstanding 집계 + 결과를 밸런서/breaker에 반영 (예외는 그대로 전달)"""
+        with self._lock:
+            replica.outstanding += 1
+        started = time.perf_counter()
+        latency = None
+        failed = False
+        try:
+            yield replica
+            latency = time.perf_counter() - started
+        except Exception as e:
+            # 4xx 등 서버 상태와 무관한 오류는 실패로 세지 않음
+            failed = RetryPolicy.counts_as_failure(e)
+            raise
+        finally:
+            if failed:
+                replica.breaker.record_failure()
+            elif latency is None:
+                # 4xx 등 / hedging으로 취소된 요청: 성공·실패로 세지 않고 half-open 슬롯만 반환
+                replica.breaker.release_probe()
+            else:
+                replica.breaker.record_success()
+            # hedging으로 취소된 요청은 outstanding만 반환
+            self._finish(replica, latency, failed)
+
+    def _finish(self, replica: Replica, latency: Optional[float], failed: bool):
+        with self._lock:
+            replica.outstanding -= 1
+
+            if failed:
+                replica.consecutive_failures += 1
+                if replica.consecutive_failures >= self.failure_threshold:
+                    self._eject(replica, EJECT_FAILURES, f"연속 실패 {replica.consecutive_failures}회")
+                return
+
+            if latency is None:
+                return
+
+            replica.consecutive_failures = 0
+            if replica.ewma_latency == 0.0:
+                replica.ewma_latency = latency
+            else:
+                replica.ewma_latency += self.ewma_alpha * (latency - replica.ewma_latency)
+
+            if replica.ewma_latency > self.slow_threshold and len(self.replicas) > 1:
+                self._eject(replica, EJECT_SLOW, f"느린 응답 (EWMA {replica.ewma_latency:.2f}s)")
+                # 복귀 후 이전 지연 기록으로 바로 다시 제외되지 않도록 초기화
+                replica.ewma_latency = 0.0
+
+    def _eject(self, replica: Replica, kind: str, reason: str):
+        # lock 안에서 호출
+        now = time.monotonic()
+        if replica.available(now):
+            logger.warning("%s 제외 (%ss): %s", replica.url, self.eject_seconds, reason)
+        replica.ejections[kind] = now + self.eject_seconds
+
+    def _mark_health(self, replica: Replica, healthy: bool):
+        with self._lock:
+            if healthy:
+                # health check로 제외된 것만 해제 (느림/연속 실패 제외는 자기 복귀 시각까지 유지)
+                if replica.ejections.pop(EJECT_HEALTH, None) is not None:
+                    if replica.available(time.monotonic()):
+                        logger.info("%s 복귀 (health check 통과)", replica.url)
+            else:
+                self._eject(replica, EJECT_HEALTH, "health check 실패")
+
+    async def check_health(self, client: httpx.AsyncClient, timeout: float = 2.0):
+        """모든 레플리카의 /health를 동시에 확인"""
+        async def probe(replica: Replica):
+            try:
+                response = await client.get(f"{replica.url}/health", timeout=timeout)
+                body = response.json() if response.status_code == 200 else {}
+                # ready: warm-up 완료 여부 (구버전 AI Service는 model_loaded만 제공)
+                healthy = response.status_code == 200 and body.get("ready", body.get("model_loaded", True))
+            except Exception:
+                healthy = False
+            self._mark_health(replica, healthy)
+
+        await asyncio.gather(*(probe(replica) for replica in self.replicas))
+
+    async def run_health_checks(self, client: httpx.AsyncClient, interval: float = 10.0):
+        """interval초마다 health check (앱 lifespan 동안 백그라운드 태스크로 실행)"""
+        while True:
+            try:
+                await self.check_health(client)
+            except Exception as e:
+                logger.error("health check error: %s", e)
+            await asyncio.sleep(interval)
+
+    def snapshot(self) -> List[dict]:
+        """레플리카 상태 (디버깅/모니터링용)"""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "url": r.url,
+                    "available": r.available(now),
+                    "breaker": r.breaker.state,
+                    "ejected_for": sorted(kind for kind, until in r.ejections.items() if until > now),
+                    "outstanding": r.outstanding,
+                    "ewma_latency": r.ewma_latency,
+                    "consecutive_failures": r.consecutive_failures
+                }
+                for r in self.replicas
+            ]
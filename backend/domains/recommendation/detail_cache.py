@@ -0,0 +1,247 @@
+# backend/domains/recommendation/detail_cache.py
+"""
+영화 상세 응답 캐시 (/api/movies/{movie_id})
+
+- 조립이 끝난 MovieDetailResponse를 JSON bytes로 직렬화해 보관 → 재조회 시 쿼리 2개 + 직렬화 생략
+- ETag: 본문 해시 (If-None-Match가 같으면 라우터에서 304)
+- stale-while-revalidate:
+    - fresh_seconds 이내: 그대로 반환
+    - 이후 stale_seconds 동안: 기존 본문을 바로 반환하고 백그라운드에서 새로 조립
+      (공유 스레드 풀 refresh_workers개, 영화당 동시에 1개 → 갱신이 요청 핸들러의 DB 풀을 소진하지 않음)
+    - 그 이후: 요청 경로에서 다시 조립
+- 없는 movie_id도 짧은 TTL(miss_seconds)로 기억 (404 반복 조회)
+- 무효화: invalidate(movie_id) / clear(), ORM으로 Movie/MovieOttMap을 수정·삭제하면 커밋 후 자동 무효화
+    - 영화별 세대(generation): 무효화마다 증가, 조립을 시작할 때의 세대가 바뀌었으면 결과를 캐시하지 않음
+      (무효화 전에 읽은 이전 값이 요청 경로/백그라운드 갱신에서 뒤늦게 설치되지 않도록)
+
+환경 변수:
+- MOVIE_DETAIL_CACHE_MAX_ENTRIES: 최대 항목 수 (기본 5000)
+- MOVIE_DETAIL_FRESH_SECONDS: fresh 구간 (기본 300)
+- MOVIE_DETAIL_STALE_SECONDS: stale 허용 구간 (기본 3600)
+- MOVIE_DETAIL_MISS_SECONDS: 없는 영화 기억 시간 (기본 60)
+- MOVIE_DETAIL_REFRESH_WORKERS: 백그라운드 갱신 스레드 수 (기본 2)
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from backend.core.db import SessionLocal, invalidate_after_commit
+from backend.domains.movie.models import Movie, MovieOttMap
+from . import schema
+
+logger = logging.getLogger(__name__)
+
+OTT_QUERY = text("""
+    SELECT
+        p.provider_id,
+        p.provider_name,
+        m.link_url
+    FROM movie_ott_map m
+    JOIN ott_providers p ON m.provider_id = p.provider_id
+    WHERE m.movie_id = :mid
+""")
+
+
+class MovieDetail:
+    """직렬화된 상세 응답 (body=None이면 없는 영화)"""
+
+    __slots__ = ("body", "etag", "built_at")
+
+    def __init__(self, body: Optional[bytes]):
+        self.body = body
+        self.etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"' if body is not None else None
+        self.built_at = time.monotonic()
+
+
+def build_movie_detail(db: Session, movie_id: int) -> MovieDetail:
+    """DB에서 상세 응답을 조립해 JSON bytes로 직렬화"""
+    movie = db.query(Movie).filter(Movie.movie_id == movie_id).first()
+    if not movie:
+        return MovieDetail(None)
+
+    ott_rows = db.execute(OTT_QUERY, {"mid": movie_id}).fetchall()
+
+    detail = schema.MovieDetailResponse(
+        info=schema.MovieInfo.model_validate(movie),
+        otts=[
+            schema.OttInfo(
+                provider_id=row.provider_id,
+                provider_name=row.provider_name,
+                url=row.link_url,
+            )
+            for row in ott_rows
+        ],
+        tag_genome=movie.tag_genome,
+    )
+    return MovieDetail(detail.model_dump_json().encode("utf-8"))
+
+
+class MovieDetailCache:
+    """movie_id → MovieDetail (LRU + stale-while-revalidate, 스레드 안전)"""
+
+    def __init__(
+        self,
+        max_entries: int = 5000,
+        fresh_seconds: float = 300.0,
+        stale_seconds: float = 3600.0,
+        miss_seconds: float = 60.0,
+        refresh_workers: int = 2,
+        session_factory=SessionLocal
+    ):
+        """
+        Args:
+            max_entries: 최대 항목 수 (초과 시 가장 오래 안 쓴 항목 제거)
+            fresh_seconds: 이 시간 안의 항목은 그대로 반환
+            stale_seconds: fresh 이후 stale 본문을 반환하며 백그라운드 갱신하는 구간
+            miss_seconds: 없는 영화(404)를 기억하는 시간
+            refresh_workers: 백그라운드 갱신 스레드 수 (동시에 쓰는 DB 세션 상한)
+            session_factory: 백그라운드 갱신용 세션 생성자 (요청 세션은 응답 후 닫히므로)
+        """
+        self.max_entries = max_entries
+        self.fresh_seconds = fresh_seconds
+        self.stale_seconds = stale_seconds
+        self.miss_seconds = miss_seconds
+        self.session_factory = session_factory
+
+        self._entries: "OrderedDict[int, MovieDetail]" = OrderedDict()
+        self._refreshing = set()
+        # movie_id → 무효화 횟수, _epoch: clear() 횟수
+        self._generations: Dict[int, int] = {}
+        self._epoch = 0
+        self._executor = ThreadPoolExecutor(max_workers=max(1, refresh_workers), thread_name_prefix="movie-detail")
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def get(self, db: Session, movie_id: int) -> MovieDetail:
+        """상세 응답 (없는 영화면 body=None)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(movie_id)
+            if entry is not None:
+                age = now - entry.built_at
+                if entry.body is None:
+                    fresh, usable = age < self.miss_seconds, False
+                else:
+                    fresh, usable = age < self.fresh_seconds, age < self.fresh_seconds + self.stale_seconds
+                if fresh:
+                    self._entries.move_to_end(movie_id)
+                    self.hits += 1
+                    return entry
+                if usable:
+                    self._entries.move_to_end(movie_id)
+                    self.stale_hits += 1
+                    self._schedule_refresh(movie_id)
+                    return entry
+            self.misses += 1
+            generation = self._generation(movie_id)
+
+        entry = build_movie_detail(db, movie_id)
+        self._put(movie_id, entry, generation)
+        return entry
+
+    def _generation(self, movie_id: int) -> tuple:
+        # lock 안에서 호출
+        return self._epoch, self._generations.get(movie_id, 0)
+
+    def _put(self, movie_id: int, entry: MovieDetail, generation: tuple):
+        with self._lock:
+            if self._generation(movie_id) != generation:
+                # 조립 중에 무효화됨 → 이전 값일 수 있으므로 설치하지 않음
+                return
+            self._entries[movie_id] = entry
+            self._entries.move_to_end(movie_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _schedule_refresh(self, movie_id: int):
+        """백그라운드 갱신 예약 (_lock 보유 상태에서 호출, 영화당 동시에 1개, 초과분은 풀 큐에서 대기)"""
+        if movie_id in self._refreshing:
+            return
+        self._refreshing.add(movie_id)
+        try:
+            self._executor.submit(self._refresh, movie_id, self._generation(movie_id))
+        except RuntimeError:
+            # shutdown 이후 → 갱신 생략 (stale 구간이 끝나면 요청 경로에서 재조립)
+            self._refreshing.discard(movie_id)
+
+    def _refresh(self, movie_id: int, generation: tuple):
+        db = self.session_factory()
+        try:
+            self._put(movie_id, build_movie_detail(db, movie_id), generation)
+        except Exception as e:
+            # 실패하면 stale 본문을 계속 사용 (stale 구간이 끝나면 요청 경로에서 재조립)
+            logger.warning("Movie detail refresh 실패 (movie_id=%s): %s", movie_id, e)
+        finally:
+            db.close()
+            with self._lock:
+                self._refreshing.discard(movie_id)
+
+    def invalidate(self, movie_id: int):
+        """영화 상세 캐시 제거 (다음 조회 때 DB에서 다시 조립)"""
+        with self._lock:
+            self._entries.pop(movie_id, None)
+            self._generations[movie_id] = self._generations.get(movie_id, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._epoch += 1
+
+    def shutdown(self):
+        """갱신 스레드 풀 종료 (대기 중인 갱신은 취소)"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+            }
+
+
+# 싱글톤 인스턴스
+_movie_detail_cache: Optional[MovieDetailCache] = None
+
+
+def get_movie_detail_cache() -> MovieDetailCache:
+    """영화 상세 캐시 싱글톤 인스턴스 반환"""
+    global _movie_detail_cache
+    if _movie_detail_cache is None:
+        _movie_detail_cache = MovieDetailCache(
+            max_entries=int(os.getenv("MOVIE_DETAIL_CACHE_MAX_ENTRIES", 5000)),
+            fresh_seconds=float(os.getenv("MOVIE_DETAIL_FRESH_SECONDS", 300)),
+            stale_seconds=float(os.getenv("MOVIE_DETAIL_STALE_SECONDS", 3600)),
+            miss_seconds=float(os.getenv("MOVIE_DETAIL_MISS_SECONDS", 60)),
+            refresh_workers=int(os.getenv("MOVIE_DETAIL_REFRESH_WORKERS", 2))
+        )
+    return _movie_detail_cache
+
+
+def _invalidate_movie_details(movie_ids):
+    if _movie_detail_cache is not None:
+        for movie_id in movie_ids:
+            _movie_detail_cache.invalidate(movie_id)
+
+
+@event.listens_for(Movie, "after_update")
+@event.listens_for(Movie, "after_delete")
+@event.listens_for(MovieOttMap, "after_insert")
+@event.listens_for(MovieOttMap, "after_update")
+@event.listens_for(MovieOttMap, "after_delete")
+def _invalidate_movie_detail(mapper, connection, target):
+    """ORM으로 영화/OTT 링크가 바뀌면 커밋 후 상세 캐시 무효화 (flush 시점에는 movie_id만 기록)"""
+    invalidate_after_commit(target, _invalidate_movie_details, target.movie_id)
@@ -0,0 +1,40 @@
+# backend/domains/recommendation/history.py
+"""
+추천 입력용 사용자 시청 기록 조회
+
+- movie_logs 최근 limit개 (watched_at 내림차순), 없으면 온보딩 응답 → 쿼리 1번
+- movie_logs는 ix_movie_logs_user_watched_at (user_id, watched_at DESC) INCLUDE (movie_id)
+  커버링 인덱스로 index-only scan, 온보딩은 ix_user_onboarding_answers_user_id
+  (database/migrations/20261019_watch_history_indexes.sql)
+- 같은 쿼리 사본: ai/inference/history_store.py HISTORY_QUERY (배포 단위가 달라 공유 불가)
+  → 변경 시 두 쿼리와 위 커버링 인덱스 마이그레이션을 함께 수정
+"""
+
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+HISTORY_LIMIT = 50
+
+# logs CTE는 두 번 참조되므로 한 번만 계산 (인덱스 스캔 1회)
+WATCH_HISTORY_SQL = text("""
+    WITH logs AS (
+        SELECT movie_id, watched_at
+        FROM movie_logs
+        WHERE user_id = :uid
+        ORDER BY watched_at DESC
+        LIMIT :limit
+    )
+    SELECT movie_id, watched_at FROM logs
+    UNION ALL
+    SELECT movie_id, NULL FROM user_onboarding_answers
+    WHERE user_id = :uid AND NOT EXISTS (SELECT 1 FROM logs)
+    ORDER BY watched_at DESC NULLS LAST
+""")
+
+
+def get_watch_history(db: Session, user_id: str, limit: int = HISTORY_LIMIT) -> List[int]:
+    """사용자 시청 기록 movie_id (최신순, 기록이 없으면 온보딩 응답, 둘 다 없으면 빈 리스트)"""
+    rows = db.execute(WATCH_HISTORY_SQL, {"uid": user_id, "limit": limit}).fetchall()
+    return [row[0] for row in rows]
@@ -30,6 +30,38 @@ class MockRecommender:
         )
         return [m.movie_id for m in movies]
 
+    def predict_tmdb_ids(
+        self,
+        top_k: int = 20,
+        runtime_limit: Optional[int] = None,
+        genre_names: Optional[List[str]] = None
+    ) -> List[int]:
+        """
+        인기도 순 tmdb_id 반환 (AI Service 장애 시 fallback 용)
+        - AIModelAdapter.predict()와 같은 tmdb_id 기준으로 반환
+        - genre_names: AI 요청과 같은 영문 장르 이름
+
+        Args:
+            top_k: 반환할 영화 개수
+            runtime_limit: 최대 러닝타임(분)
+            genre_names: 하나라도 포함되면 통과
+        """
+        query = self.db.query(Movie.tmdb_id).filter(Movie.adult == False)
+
+        if runtime_limit:
+            query = query.filter(Movie.runtime > 0, Movie.runtime <= runtime_limit)
+
+        if genre_names:
+            query = query.filter(or_(*[Movie.genres.any(g) for g in genre_names]))
+
+        movies = (
+            query
+            .order_by(Movie.popularity.desc().nullslast())
+            .limit(top_k)
+            .all()
+        )
+        return [m.tmdb_id for m in movies]
+
     def recommend_with_filters(
         self,
         runtime_limit: Optional[int] = None,
@@ -1,6 +1,6 @@
 # backend/domains/recommendation/models.py
 
-from sqlalchemy import Column, Integer, TIMESTAMP, ForeignKey
+from sqlalchemy import Column, Index, Integer, TIMESTAMP, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from backend.core.db import Base
@@ -11,6 +11,17 @@ class MovieLog(Base):
     movie_id = Column(Integer, primary_key=True)
     watched_at = Column(TIMESTAMP, server_default=func.now())
 
+    # 시청 기록 조회 (history.py) / AI Service 증분 갱신
+    # 운영 DB: database/migrations/20261019_watch_history_indexes.sql
+    __table_args__ = (
+        Index(
+            "ix_movie_logs_user_watched_at",
+            user_id, watched_at.desc(),
+            postgresql_include=["movie_id"]
+        ),
+        Index("ix_movie_logs_watched_at", watched_at),
+    )
+
 class MovieClick(Base):
     __tablename__ = "movie_clicks"
     id = Column(Integer, primary_key=True, index=True)
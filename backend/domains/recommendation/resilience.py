@@ -0,0 +1,193 @@
+# backend/domains/recommendation/resilience.py
+"""
+AI Service 호출 보호 장치
+
+- CircuitBreaker: 연속 실패 시 회로를 열어 호출 차단 → 일정 시간 뒤 half-open으로 소수 요청만 시험
+- RetryPolicy: 일시적 오류(연결/타임아웃/5xx)만 제한 횟수 재시도 (full jitter 지수 백오프)
+- LatencyTracker: 최근 응답 시간의 p95 추적 (hedging 기준)
+- hedged(): 첫 요청이 p95를 넘기면 같은 요청을 하나 더 보내 먼저 끝난 쪽 사용
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """회로가 열려 있어 호출을 보내지 않음"""
+
+
+class CircuitBreaker:
+    """closed → (연속 실패) → open → (recovery_timeout 경과) → half_open → closed/open"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        name: str = "AI Service"
+    ):
+        """
+        Args:
+            failure_threshold: 회로를 여는 연속 실패 횟수
+            recovery_timeout: open 상태 유지 시간 (초), 이후 half-open
+            half_open_max_calls: half-open 상태에서 동시에 허용할 시험 호출 수
+            name: 로그에 표시할 호출 대상
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.name = name
+
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def _refresh(self):
+        # lock 안에서 호출
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._half_open_calls = 0
+
+    def allow_request(self) -> bool:
+        """호출 가능 여부 (half-open이면 시험 호출 슬롯을 하나 점유)"""
+        with self._lock:
+            self._refresh()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("%s 복구 확인 → closed", self.name)
+            self._state = self.CLOSED
+            self._failures = 0
+            self._half_open_calls = 0
+
+    def release_probe(self):
+        """성공/실패로 세지 않는 결과 (예: 요청 자체의 4xx) → half-open 시험 슬롯만 반환"""
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._half_open_calls > 0:
+                self._half_open_calls -= 1
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning("%s 연속 실패 %d회 → open (%ss)", self.name, self._failures, self.recovery_timeout)
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._half_open_calls = 0
+
+
+class RetryPolicy:
+    """일시적 오류에 대한 제한 재시도 (full jitter)"""
+
+    RETRYABLE_STATUS = (502, 503, 504)
+
+    def __init__(self, max_attempts: int = 2, base_delay: float = 0.1, max_delay: float = 1.0):
+        """
+        Args:
+            max_attempts: 최초 호출 포함 최대 시도 횟수
+            base_delay: 첫 재시도 대기 상한 (초), 시도마다 2배
+            max_delay: 대기 상한 (초)
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        """attempt번째(0부터) 실패 후 대기 시간"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    @classmethod
+    def is_retryable(cls, error: Exception) -> bool:
+        """연결 실패/타임아웃/게이트웨이 오류만 재시도 (4xx는 재시도해도 같은 결과)"""
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in cls.RETRYABLE_STATUS
+        return isinstance(error, httpx.TransportError)
+
+    @classmethod
+    def counts_as_failure(cls, error: Exception) -> bool:
+        """circuit breaker 실패로 셀 오류 (서버 상태와 무관한 4xx/디코딩 오류 제외)"""
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code >= 500
+        return isinstance(error, httpx.TransportError)
+
+
+class LatencyTracker:
+    """최근 N개 성공 응답의 지연 시간 분위수"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """q 분위수 (샘플이 부족하면 None)"""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def hedged(send: Callable[[], Awaitable], hedge_after: Optional[float]):
+    """
+    hedge_after초 안에 끝나지 않으면 같은 요청을 하나 더 보내고 먼저 성공한 결과 반환
+
+    Args:
+        send: 요청 코루틴 팩토리 (호출할 때마다 새 요청)
+        hedge_after: hedging 시작 지연 (None이면 hedging 없이 한 번만)
+    """
+    if hedge_after is None:
+        return await send()
+
+    first = asyncio.ensure_future(send())
+    done, _ = await asyncio.wait({first}, timeout=hedge_after)
+    if done:
+        return first.result()
+
+    second = asyncio.ensure_future(send())
+    pending = {first, second}
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
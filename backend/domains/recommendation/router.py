@@ -1,14 +1,17 @@
 # backend/domains/recommendation/router.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
 from backend.core.db import get_db
-from backend.domains.auth.utils import get_current_user
-from backend.domains.user.models import User
+from backend.domains.auth.principal import Principal
+from backend.domains.auth.utils import get_current_principal
 from . import service, schema
 from .ai_model import get_ai_model
+from .detail_cache import get_movie_detail_cache
 
 # AI 모델 로딩 (싱글톤)
 # 서버 시작 시 한 번만 로드됨
@@ -17,13 +20,13 @@ ai_model = get_ai_model()
 router = APIRouter(tags=["recommendation"])
 
 @router.post("/api/recommend", response_model=schema.RecommendationResponse)
-def recommend_movies(
+async def recommend_movies(
     req: schema.RecommendationRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    # service에 ai_model 인스턴스 전달
-    results = service.get_hybrid_recommendations(db, str(current_user.user_id), req, ai_model)
+    # AI 응답 대기 중에는 스레드를 점유하지 않음 (DB 조회만 threadpool 사용)
+    results = await service.aget_hybrid_recommendations(db, str(current_user.user_id), req, ai_model)
     return {"results": results}
 
 @router.post("/api/movies/{movie_id}/play")
@@ -31,7 +34,7 @@ def click_ott(
     movie_id: int,
     req: schema.ClickLogRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     service.log_click(db, str(current_user.user_id), movie_id, req.provider_id)
     
@@ -51,7 +54,7 @@ def click_ott(
 def mark_watched(
     movie_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     service.mark_watched(db, str(current_user.user_id), movie_id)
     return {"status": "success"}
@@ -60,39 +63,21 @@ def mark_watched(
 @router.get("/api/movies/{movie_id}", response_model=schema.MovieDetailResponse)
 def get_movie_detail(
     movie_id: int,
+    if_none_match: Optional[str] = Header(default=None),
     db: Session = Depends(get_db),
 ):
-    """영화 상세 정보 조회 (로그인 불필요)"""
-    from backend.domains.movie.models import Movie
-    
-    movie = db.query(Movie).filter(Movie.movie_id == movie_id).first()
-    
-    if not movie:
+    """
+    영화 상세 정보 조회 (로그인 불필요)
+    - 직렬화된 응답을 캐시에서 그대로 반환 (detail_cache)
+    - If-None-Match가 ETag와 같으면 304 (본문 없음)
+    """
+    detail = get_movie_detail_cache().get(db, movie_id)
+
+    if detail.body is None:
         raise HTTPException(status_code=404, detail="Movie not found")
-    
-    # OTT 정보 조회
-    ott_rows = db.execute(
-        text("""
-            SELECT
-                p.provider_id,
-                p.provider_name,
-                m.link_url
-            FROM movie_ott_map m
-            JOIN ott_providers p ON m.provider_id = p.provider_id
-            WHERE m.movie_id = :mid
-        """),
-        {"mid": movie_id}
-    ).fetchall()
-    
-    return {
-        "info": movie, # SQLAlchemy 객체 그대로 반환 (Pydantic이 변환)
-        "otts": [
-            {
-                "provider_id": row.provider_id,
-                "provider_name": row.provider_name,
-                "url": row.link_url,
-            }
-            for row in ott_rows
-        ],
-        "tag_genome": movie.tag_genome,
-    }
\ No newline at end of file
+
+    headers = {"ETag": detail.etag, "Cache-Control": "no-cache"}
+    # If-None-Match는 약한 비교 (W/ 접두사 무시)
+    if if_none_match and detail.etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=detail.body, media_type="application/json", headers=headers)
@@ -1,13 +1,19 @@
 # backend/domains/recommendation/service.py
 
+import logging
+
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
 
 # [중요] 타 도메인 모델 Import
 from backend.domains.movie.models import Movie, MovieOttMap, OttProvider
+from backend.domains.movie.card_cache import get_movie_card_cache
 from backend.domains.recommendation.models import MovieLog, MovieClick
 from . import schema
 
+logger = logging.getLogger(__name__)
+
 def get_hybrid_recommendations(db: Session, user_id: str, req: schema.RecommendationRequest, model_instance):
     """
     1. AI 모델(LightGCN) -> ID 리스트 추출
@@ -25,55 +31,57 @@ def get_hybrid_recommendations(db: Session, user_id: str, req: schema.Recommenda
             preferred_otts=None  # OTT 필터링은 추후 구현 예정
         )
     except Exception as e:
-        print(f"AI Model Error: {e}")
+        logger.error("AI Model Error: %s", e)
+        recommended_movie_ids = []
+
+    return _load_recommended_movies(db, recommended_movie_ids, req)
+
+
+async def aget_hybrid_recommendations(db: Session, user_id: str, req: schema.RecommendationRequest, model_instance):
+    """
+    get_hybrid_recommendations()의 비동기 버전
+    - AI 호출은 await (스레드 점유 없음)
+    - 동기 DB 조회만 threadpool로 오프로드
+    """
+    try:
+        recommended_movie_ids = await model_instance.apredict(
+            user_id,
+            top_k=50,
+            available_time=req.available_time,
+            preferred_genres=req.genres if req.genres else None,
+            preferred_otts=None  # OTT 필터링은 추후 구현 예정
+        )
+    except Exception as e:
+        logger.error("AI Model Error: %s", e)
         recommended_movie_ids = []
 
+    return await run_in_threadpool(_load_recommended_movies, db, recommended_movie_ids, req)
+
+
+def _load_recommended_movies(db: Session, recommended_movie_ids: list, req: schema.RecommendationRequest):
+    """
+    AI 추천 ID 순서대로 영화 정보 조회 + 성인 콘텐츠 필터링
+    - 영화 카드 캐시에서 조회 (캐시에 없는 id만 MovieInfo 컬럼으로 DB 조회)
+    - 카드는 요청 조건과 무관하게 캐시하므로 성인 필터는 여기서 적용
+    """
     if not recommended_movie_ids:
         return []
 
-    # 2. DB 조회 (CRUD 역할)
     # AI 모델은 tmdb_id를 반환하므로 tmdb_id로 조회
-    movies = db.query(Movie).filter(Movie.tmdb_id.in_(recommended_movie_ids)).all()
-
-    # 순서 보정 (AI가 추천한 순서대로 정렬) - tmdb_id 기준
-    movies_map = {m.tmdb_id: m for m in movies}
-    results = []
-    
-    # 필터링 통계
-    filtered_counts = {
-        'total': len(recommended_movie_ids),
-        'not_in_db': 0,
-        'adult': 0,
-        'passed': 0
-    }
-    
-    for mid in recommended_movie_ids:
-        if mid not in movies_map:
-            filtered_counts['not_in_db'] += 1
-            continue
-            
-        m = movies_map[mid]
-        
-        # 성인 콘텐츠만 필터링 (AI 모델이 이미 장르/시간 고려함)
-        if req.exclude_adult and m.adult:
-            filtered_counts['adult'] += 1
-            continue
-        
-        # ❌ 제거: 런타임 필터링 (AI 모델이 이미 처리)
-        # ❌ 제거: 장르 필터링 (Track B는 장르 무시해야 함)
-        
-        results.append(m)
-        filtered_counts['passed'] += 1
-    
-    # 필터링 통계 출력
-    print(f"\n{'='*80}")
-    print(f"[Backend Filter] AI 추천: {filtered_counts['total']}개")
-    print(f"[Backend Filter] DB 없음: {filtered_counts['not_in_db']}개")
-    print(f"[Backend Filter] 성인 제외: {filtered_counts['adult']}개")
-    print(f"[Backend Filter] ✅ 최종 결과: {filtered_counts['passed']}개")
-    print(f"[Backend Filter] ℹ️  런타임/장르 필터링은 AI 모델에서 처리됨")
-    print(f"{'='*80}\n")
-            
+    cards = get_movie_card_cache().get_many(db, recommended_movie_ids)
+
+    # 순서 보정 (AI가 추천한 순서대로 정렬) + 성인 콘텐츠만 필터링
+    # (런타임/장르는 AI 모델이 이미 처리, Track B는 장르 무시)
+    results = [
+        cards[mid] for mid in recommended_movie_ids
+        if mid in cards and not (req.exclude_adult and cards[mid]["adult"])
+    ]
+
+    logger.info(
+        "AI 추천 %d개 → DB 없음/성인 제외 %d, 최종 %d",
+        len(recommended_movie_ids), len(recommended_movie_ids) - len(results), len(results)
+    )
+
     return results
 
 def log_click(db: Session, user_id: str, movie_id: int, provider_id: int):
@@ -0,0 +1,74 @@
+# backend/domains/recommendation/wire_format.py
+"""
+AI Service 바이너리 추천 응답 디코더
+
+- 인코더: ai/wire_format.py (레이아웃/버전 정의는 양쪽이 동일해야 함)
+- 레이아웃 (little-endian)
+    header : magic(4s) 'MSRC' | version(uint16) | rec_type(uint16) | count(uint32) | elapsed(float32)
+    record : tmdb_id(int32) | score(float32) | track(uint8)   × count
+- 디코딩 결과는 JSON 응답(projection='ids')과 같은 모양의 dict
+"""
+
+import struct
+
+MEDIA_TYPE = "application/x-moviesir-reco"
+MAGIC = b"MSRC"
+SUPPORTED_VERSIONS = (1,)
+
+HEADER = struct.Struct("<4sHHIf")
+RECORD = struct.Struct("<ifB")
+
+REC_TYPES = ('single', 'combination')
+TRACKS = ('track_a', 'track_b')
+
+
+class WireFormatError(ValueError):
+    """바이너리 응답 형식 오류"""
+
+
+def decode_recommendations(payload: bytes) -> dict:
+    """
+    바이너리 응답을 JSON 응답과 같은 dict로 변환
+
+    Returns:
+        {'track_a': {...}, 'track_b': {...}, 'elapsed_time': float}
+        - single: track['movies'] = [{'tmdb_id', 'hybrid_score'}, ...]
+        - combination: track['combination'] = {'combination_score', 'movies': [{'tmdb_id'}, ...]}
+    """
+    if len(payload) < HEADER.size:
+        raise WireFormatError("응답이 헤더보다 짧습니다")
+
+    magic, version, rec_type, count, elapsed = HEADER.unpack_from(payload, 0)
+    if magic != MAGIC:
+        raise WireFormatError(f"잘못된 magic: {magic!r}")
+    if version not in SUPPORTED_VERSIONS:
+        raise WireFormatError(f"지원하지 않는 버전: {version}")
+    if rec_type >= len(REC_TYPES):
+        raise WireFormatError(f"알 수 없는 추천 타입: {rec_type}")
+
+    body = memoryview(payload)[HEADER.size:]
+    if len(body) != count * RECORD.size:
+        raise WireFormatError(f"레코드 길이 불일치: {len(body)} bytes, count={count}")
+
+    tracks = {name: [] for name in TRACKS}
+    scores = {}
+    for tmdb_id, score, track in RECORD.iter_unpack(body):
+        if track >= len(TRACKS):
+            raise WireFormatError(f"알 수 없는 트랙: {track}")
+        tracks[TRACKS[track]].append({'tmdb_id': tmdb_id, 'hybrid_score': score})
+        scores[TRACKS[track]] = score
+
+    result = {'elapsed_time': elapsed}
+    if REC_TYPES[rec_type] == 'single':
+        for name in TRACKS:
+            result[name] = {'movies': tracks[name]}
+    else:
+        for name in TRACKS:
+            movies = tracks[name]
+            result[name] = {
+                'combination': {
+                    'combination_score': scores[name],
+                    'movies': [{'tmdb_id': m['tmdb_id']} for m in movies]
+                } if movies else None
+            }
+    return result
@@ -2,7 +2,7 @@
 
 from uuid import uuid4
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, String, func
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, String, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -103,3 +103,8 @@ class UserOnboardingAnswer(Base):
 
     user = relationship("User", back_populates="onboarding_answers")
     movie = relationship("Movie", back_populates="onboarding_answers")
+
+    # 시청 기록이 없을 때 온보딩 응답 fallback (recommendation/history.py)
+    __table_args__ = (
+        Index("ix_user_onboarding_answers_user_id", "user_id", postgresql_include=["movie_id"]),
+    )
@@ -4,9 +4,16 @@ from dotenv import load_dotenv
 # 환경변수 로드 (.env) - 모든 import 전에 먼저 로드해야 함
 load_dotenv()
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
+from backend.core.request_log import configure_logging, start_request
+
+# LOG_LEVEL / LOG_DEBUG_SAMPLE_RATE
+configure_logging()
+
 # 모든 모델 로드 (SQLAlchemy relationship 해결을 위해 필요)
 import backend.domains  # noqa: F401
 
@@ -14,8 +21,31 @@ from backend.domains.auth.router import router as auth_router
 from backend.domains.registration.router import router as registration_router
 from backend.domains.onboarding.router import router as onboarding_router
 from backend.domains.recommendation.router import router as recommendation_router
+from backend.domains.recommendation.ai_model import get_ai_model
+from backend.domains.recommendation.detail_cache import get_movie_detail_cache
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # AI Service 레플리카 health check 시작 (AI_SERVICE_URLS에 여러 개일 때)
+    get_ai_model().start_health_checks()
+    yield
+    # 종료 시 AI Service 커넥션 풀 정리 (동기/비동기 클라이언트 모두)
+    await get_ai_model().aclose()
+    # 영화 상세 캐시 백그라운드 갱신 스레드 풀 종료
+    get_movie_detail_cache().shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
+
 
-app = FastAPI()
+@app.middleware("http")
+async def request_context(request: Request, call_next):
+    """요청마다 correlation id 설정 (X-Request-ID 헤더가 있으면 그대로 사용)"""
+    request_id = start_request(request.headers.get("X-Request-ID"))
+    response = await call_next(request)
+    response.headers["X-Request-ID"] = request_id
+    return response
 
 # CORS 설정
 app.add_middleware(
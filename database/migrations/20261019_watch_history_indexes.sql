@@ -0,0 +1,22 @@
+-- 시청 기록 조회 인덱스
+-- - backend/domains/recommendation/history.py (추천 입력 시청 기록, 쿼리 1번)
+-- - ai/inference/history_store.py (같은 조회 + watched_at 기준 증분 갱신)
+--
+-- CONCURRENTLY: 운영 중 쓰기를 막지 않음 (트랜잭션 블록 밖에서 실행)
+--   psql -U moviesir -d moviesir -f database/migrations/20261019_watch_history_indexes.sql
+
+-- 사용자별 최근 시청 기록: (user_id, watched_at DESC) 범위 스캔 + movie_id 포함 → index-only scan
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_movie_logs_user_watched_at
+    ON movie_logs (user_id, watched_at DESC) INCLUDE (movie_id);
+
+-- AI Service 증분 갱신 (watched_at > 워터마크)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_movie_logs_watched_at
+    ON movie_logs (watched_at);
+
+-- 온보딩 응답 fallback
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_user_onboarding_answers_user_id
+    ON user_onboarding_answers (user_id) INCLUDE (movie_id);
+
+-- index-only scan은 visibility map이 최신이어야 힙 접근을 건너뜀
+VACUUM (ANALYZE) movie_logs;
+VACUUM (ANALYZE) user_onboarding_answers;